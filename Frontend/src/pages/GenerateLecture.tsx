@@ -35,7 +35,32 @@ const GenerateLecture = () => {
         throw new Error(`HTTP error! status: ${response.status}`);
       }
 
-      const data = await response.json();
+      let data = await response.json();
+
+      // The backend queues the job and returns its ID; poll until it finishes
+      if (data.job_id) {
+        const stageCount = 8;
+        while (true) {
+          await new Promise((resolve) => setTimeout(resolve, 2000));
+          const jobResponse = await fetch(`http://localhost:5000/jobs/${data.job_id}`);
+          if (!jobResponse.ok) {
+            throw new Error(`HTTP error! status: ${jobResponse.status}`);
+          }
+          const job = await jobResponse.json();
+          const finishedStages = Object.values(job.stages || {}).filter(
+            (stage: any) => stage.status === 'done'
+          ).length;
+          setProgress(Math.min(95, Math.round((finishedStages / stageCount) * 100)));
+          if (job.status === 'done') {
+            data = job.result;
+            break;
+          }
+          if (job.status === 'failed') {
+            throw new Error(job.error || 'Generation failed');
+          }
+        }
+      }
+
       console.log('API Response:', data);
       setGeneratedAssets(data);
 
@@ -260,7 +285,7 @@ const GenerateLecture = () => {
                 </div>
                 <button
                   onClick={() => {
-                    const filename = generatedAssets.slides_path.split('/').pop();
+                    const filename = generatedAssets.slides_path.replace(/^output\//, '');
                     window.open(`http://localhost:5000/download/${filename}`, '_blank');
                   }}
                   className="w-full py-2 bg-[#E63946] text-white rounded-xl hover:bg-[#d32f3b] transition-all duration-300 flex items-center justify-center gap-2"
@@ -1,49 +1,84 @@
-from flask import Flask, jsonify, request, send_from_directory
-from controllers.generate_controller import generate_assets
-import requests
+from flask import Flask, jsonify, send_from_directory
+from config.config import STORAGE_X_SENDFILE
+from services.warmup_service import start_warmup, get_state, is_ready
+from utils.workspace_utils import start_janitor
 from flask_cors import CORS
 
+# Controllers are imported inside their routes: they pull in python-pptx,
+# Pillow, gTTS and the OpenAI SDK, which /health and /ready do not need.
+# The warm-up loads them ahead of the first request.
+
 app = Flask(__name__)
 CORS(app, resources={r"/*": {"origins": "http://localhost:5173"}})
+app.config["USE_X_SENDFILE"] = STORAGE_X_SENDFILE
+start_janitor()
+start_warmup()
 
 @app.route("/summarize", methods=["POST"])
 def summarize():
-    summarizer_url = "https://pdf-summarizer-service-1.onrender.com/summarize_notes"
-    
-    try:
-        if 'file' in request.files:
-            files = {'file': (request.files['file'].filename, request.files['file'].stream, request.files['file'].mimetype)}
-            response = requests.post(summarizer_url, files=files)
-            response.raise_for_status()
-            return jsonify(response.json()), response.status_code
-
-        elif request.is_json:
-            data = request.get_json()
-            # The external service expects multipart/form-data for both file and text
-            files = {'notes_text': (None, data.get('notes_text'))}
-            response = requests.post(summarizer_url, files=files)
-            response.raise_for_status()
-            return jsonify(response.json()), response.status_code
-            
-        return jsonify({"error": "Invalid request"}), 400
-    except requests.exceptions.RequestException as e:
-        return jsonify({"error": f"Error contacting summarizer service: {e}"}), 500
+    from controllers.summarize_controller import summarize_notes
+    return summarize_notes()
 
 @app.route("/generate", methods=["OPTIONS"])
 def handle_options():
     return '', 200
 
-@app.route("/download/<filename>", methods=["GET"])
+@app.route("/download/<path:filename>", methods=["GET"])
 def download_file(filename):
     return send_from_directory('output', filename, as_attachment=True)
 
+@app.route("/files/<name>", methods=["GET"])
+def stored_file(name):
+    from controllers.storage_controller import serve_stored_file
+    return serve_stored_file(name)
+
 @app.route("/health", methods=["GET"])
 def health_check():
     return jsonify({"status": "ok", "message": "Server is running"})
 
+@app.route("/ready", methods=["GET"])
+def ready_check():
+    return jsonify(get_state()), 200 if is_ready() else 503
+
+@app.route("/metrics", methods=["GET"])
+def metrics():
+    from controllers.metrics_controller import get_metrics
+    return get_metrics()
+
 @app.route("/generate", methods=["POST"])
 def generate():
-    return generate_assets()
+    from controllers.generate_controller import submit_generate_job
+    return submit_generate_job()
+
+@app.route("/generate/stream", methods=["GET"])
+def generate_stream():
+    from controllers.generate_controller import stream_generation
+    return stream_generation()
+
+@app.route("/generate/batch", methods=["POST"])
+def generate_batch():
+    from controllers.batch_controller import submit_batch
+    return submit_batch()
+
+@app.route("/generate/batch/<batch_id>", methods=["GET"])
+def batch_status(batch_id):
+    from controllers.batch_controller import get_batch_status
+    return get_batch_status(batch_id)
+
+@app.route("/generate/batch/<batch_id>/stream", methods=["GET"])
+def batch_stream(batch_id):
+    from controllers.batch_controller import stream_batch
+    return stream_batch(batch_id)
+
+@app.route("/jobs/<job_id>", methods=["GET"])
+def job_status(job_id):
+    from controllers.generate_controller import get_job_status
+    return get_job_status(job_id)
+
+@app.route("/lectures/<lecture_id>/slides/<int:number>", methods=["POST"])
+def update_slide(lecture_id, number):
+    from controllers.lecture_controller import update_lecture_slide
+    return update_lecture_slide(lecture_id, number)
 
 if __name__ == "__main__":
     app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
@@ -0,0 +1,320 @@
+"""
+End-to-end benchmark of the generation pipeline with offline stubs.
+
+The lecture is the mock lecture from ai_service scaled to N slides, gTTS is
+replaced by a stub that writes fixed-length silent MP3s, and uploads go to
+a local fake Cloudinary (benchmarks.fake_cloudinary). ffmpeg runs for real
+when it is installed; otherwise the video stage is stubbed and the results
+are flagged with "video_stubbed".
+
+Everything runs in a scratch directory, so output/, cache/ and storage/
+start empty. For every deck size and concurrency level the pipeline is run
+--runs times; the benchmark reports throughput, p50/p95 latency overall and
+per stage, peak RSS of the process tree and the bytes written to disk, and
+saves the results as JSON so runs can be compared with --compare.
+
+Usage (from backend/):
+    python -m benchmarks.bench_pipeline --sizes 1 10 50 200 --concurrency 1 2 4 --runs 4
+"""
+import argparse
+import datetime
+import json
+import math
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fake_cloudinary import FakeCloudinary
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(BACKEND_DIR, "benchmarks", "results")
+
+# One MPEG-1 Layer III frame: 128 kbit/s, 44.1 kHz, mono, all-zero (silent) payload
+MP3_FRAME = b"\xff\xfb\x90\xc0" + bytes(413)
+MP3_FRAME_SECONDS = 1152 / 44100
+
+
+def silent_mp3(seconds):
+    return MP3_FRAME * max(1, round(seconds / MP3_FRAME_SECONDS))
+
+
+def silent_track(slides, seconds, rate=44100):
+    """An AudioTrack of `slides` silent clips, standing in for decoded voiceovers."""
+    import numpy as np
+    from services.audio_service import AudioTrack, frame_boundaries
+
+    boundaries = frame_boundaries([round(seconds * rate)] * slides, rate)
+    return AudioTrack(np.zeros(boundaries[-1], dtype="<i2"), rate, boundaries)
+
+
+def scaled_lecture(mock_lecture, slides, tag=""):
+    """The mock lecture with its slide repeated to the requested deck size."""
+    lecture = json.loads(mock_lecture)
+    template = lecture["slides"][0]
+    lecture["slides"] = [
+        {
+            "title": f"{template['title']} ({i + 1}/{slides}){tag}",
+            "content": [f"{point} ({i + 1})" for point in template["content"]],
+            "script": f"Part {i + 1}{tag}. {template['script']}"
+        }
+        for i in range(slides)
+    ]
+    return json.dumps(lecture)
+
+
+def _install_stubs(args, deck):
+    """Replace the LLM, TTS and (without ffmpeg) the encoder with offline stubs."""
+    import controllers.generate_controller as generate_controller
+    import services.ai_service as ai_service
+    import services.video_service as video_service
+    import services.voice_service as voice_service
+    from utils.metrics_utils import timed
+
+    def lecture_text(prompt):
+        # Cold runs get unique content per run so no cache can serve them
+        return scaled_lecture(ai_service.MOCK_LECTURE, deck["slides"], "" if args.warm else f" [{prompt}]")
+
+    def fake_lecture_stream(prompt, chunk_size=64):
+        text = lecture_text(prompt)
+        for start in range(0, len(text), chunk_size):
+            yield text[start:start + chunk_size]
+
+    @timed("generate_voiceover")
+    def fake_voiceover(script_text, path, lang="en", slow=False):
+        time.sleep(args.tts_latency)
+        with open(path, "wb") as f:
+            f.write(silent_mp3(args.clip_seconds))
+        return path
+
+    generate_controller.generate_lecture = lecture_text
+    generate_controller.generate_lecture_stream = fake_lecture_stream
+    voice_service.generate_voiceover = fake_voiceover
+
+    if shutil.which("ffmpeg") is None:
+        def fake_video(output_path):
+            with open(output_path, "wb") as f:
+                f.write(bytes(1024))
+            return video_service.upload_video(output_path)
+
+        generate_controller.create_video_single_pass = lambda images, audio, durations, output_path: fake_video(output_path)
+        generate_controller.create_video_segmented = lambda images, audio, durations, output_path, **kwargs: fake_video(output_path)
+        generate_controller.create_video = lambda images, audio, durations=None, output_path=None: fake_video(output_path)
+        generate_controller.create_video_from_frames = lambda frames, audio, durations, output_path: fake_video(output_path)
+        generate_controller.combine_audio = lambda audio_paths, output_path: output_path
+        generate_controller.assemble_audio = lambda clip_paths: silent_track(len(clip_paths), args.clip_seconds)
+        return True
+    return False
+
+
+def _tree_rss(pid):
+    """Resident memory of a process and all its descendants, in bytes (Linux)."""
+    total = 0
+    try:
+        with open(f"/proc/{pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    total += int(line.split()[1]) * 1024
+                    break
+        for tid in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{tid}/children") as f:
+                for child in f.read().split():
+                    total += _tree_rss(int(child))
+    except OSError:
+        pass
+    return total
+
+
+class PeakRSS:
+    """Samples the RSS of this process tree on a background thread."""
+
+    def __init__(self, interval=0.05):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+
+    def _sample(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, _tree_rss(os.getpid()))
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        if not self.peak:
+            # No /proc: fall back to the lifetime maxima (kilobytes on Linux, bytes on macOS)
+            scale = 1 if sys.platform == "darwin" else 1024
+            self.peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss) * scale
+
+
+def dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def percentile(values, p):
+    """Nearest-rank percentile."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return round(ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)], 3)
+
+
+def run_config(args, deck, slides, concurrency, fake, scratch):
+    from controllers.generate_controller import run_pipeline
+
+    deck["slides"] = slides
+    disk_before = dir_size(scratch)
+    uploaded_before = fake.bytes_received
+
+    def one_run(k):
+        start = time.perf_counter()
+        result = run_pipeline(f"benchmark {slides}x{concurrency} run {k}", args.theme)
+        return time.perf_counter() - start, result["timings"]
+
+    latencies, stages, errors = [], {}, 0
+    with PeakRSS() as rss:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [executor.submit(one_run, k) for k in range(args.runs)]
+            for future in futures:
+                try:
+                    latency, timings = future.result()
+                except Exception as e:
+                    print(f"  run failed: {e}")
+                    errors += 1
+                    continue
+                latencies.append(latency)
+                for stage, seconds in timings.items():
+                    stages.setdefault(stage, []).append(seconds)
+        wall = time.perf_counter() - start
+
+    return {
+        "slides": slides,
+        "concurrency": concurrency,
+        "runs": args.runs,
+        "errors": errors,
+        "wall_seconds": round(wall, 3),
+        "lectures_per_min": round(len(latencies) / wall * 60, 2) if wall else None,
+        "latency": {"p50": percentile(latencies, 50), "p95": percentile(latencies, 95)},
+        "stages": {stage: {"p50": percentile(values, 50), "p95": percentile(values, 95)}
+                   for stage, values in stages.items()},
+        "peak_rss_bytes": rss.peak,
+        "disk_bytes": dir_size(scratch) - disk_before,
+        "uploaded_bytes": fake.bytes_received - uploaded_before
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=BACKEND_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(previous_path, results):
+    with open(previous_path) as f:
+        previous = {(r["slides"], r["concurrency"]): r for r in json.load(f)["results"]}
+    print(f"\nCompared with {previous_path}:")
+    for result in results:
+        old = previous.get((result["slides"], result["concurrency"]))
+        if not old or not old["lectures_per_min"] or not old["latency"]["p95"]:
+            continue
+        print(f"  {result['slides']:>4} slides x{result['concurrency']:<3}"
+              f" throughput {result['lectures_per_min'] / old['lectures_per_min']:5.2f}x"
+              f"  p95 {result['latency']['p95'] / old['latency']['p95']:5.2f}x")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 50, 200])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--runs", type=int, default=4, help="Pipeline runs per size and concurrency")
+    parser.add_argument("--theme", default="Minimalist")
+    parser.add_argument("--tts-latency", type=float, default=0.0, help="Seconds the TTS stub sleeps per clip")
+    parser.add_argument("--clip-seconds", type=float, default=5.0, help="Length of each silent clip")
+    parser.add_argument("--upload-latency", type=float, default=0.0, help="Seconds the fake Cloudinary adds per upload")
+    parser.add_argument("--storage", default="cloudinary", choices=["cloudinary", "local"])
+    parser.add_argument("--warm", action="store_true", help="Repeat identical lectures so caches can hit")
+    parser.add_argument("--output", help="Results file (default: benchmarks/results/pipeline-<time>.json)")
+    parser.add_argument("--compare", help="Previous results file to compare against")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output or os.path.join(
+        RESULTS_DIR, f"pipeline-{datetime.datetime.now():%Y%m%d-%H%M%S}.json"))
+    compare_path = os.path.abspath(args.compare) if args.compare else None
+
+    fake = FakeCloudinary(latency=args.upload_latency).start()
+    scratch = tempfile.mkdtemp(prefix="bench-pipeline-")
+    # Configuration is read from the environment at import time
+    os.environ.update({
+        "CLOUDINARY_API_BASE": fake.base_url,
+        "CLOUDINARY_DELIVERY_BASE": fake.base_url,
+        "STORAGE_BACKEND": args.storage,
+        "STORAGE_LOCAL_DIR": os.path.join(scratch, "storage"),
+        "TTS_CACHE_ENABLED": "true" if args.warm else "false",
+        "LECTURE_CACHE_ENABLED": "false",
+        "JOB_WORKERS": "0",
+    })
+    os.chdir(scratch)
+
+    deck = {"slides": 1}
+    video_stubbed = _install_stubs(args, deck)
+    if video_stubbed:
+        print("ffmpeg not found, the video stage is stubbed")
+
+    results = []
+    try:
+        for slides in args.sizes:
+            for concurrency in args.concurrency:
+                result = run_config(args, deck, slides, concurrency, fake, scratch)
+                results.append(result)
+                print(f"{slides:>4} slides x{concurrency:<3} {result['lectures_per_min']:>8} lectures/min"
+                      f"  p50 {result['latency']['p50']}s  p95 {result['latency']['p95']}s"
+                      f"  rss {result['peak_rss_bytes'] / 1024 ** 2:.0f}MB"
+                      f"  disk {result['disk_bytes'] / 1024 ** 2:.1f}MB")
+    finally:
+        fake.stop()
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    report = {
+        "benchmark": "pipeline",
+        "created_at": datetime.datetime.now().isoformat(timespec="seconds"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "video_stubbed": video_stubbed,
+        "args": {key: value for key, value in vars(args).items() if key not in ("output", "compare")},
+        "results": results
+    }
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+
+    if compare_path:
+        compare(compare_path, results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark the batched voiceover stage against the old serial loop.
+
+gTTS and ffprobe are replaced by stubs that sleep for a fixed latency, so
+the numbers measure scheduling only and need no network access.
+
+Usage (from backend/):
+    python -m benchmarks.bench_voice --slides 15 --tts-latency 0.8 --probe-latency 0.05
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import services.video_service as video_service
+import services.voice_service as voice_service
+
+
+def _install_stubs(tts_latency, probe_latency):
+    def fake_voiceover(script_text, path, lang="en", slow=False):
+        time.sleep(tts_latency)
+        with open(path, "wb") as f:
+            f.write(script_text.encode("utf-8"))
+        return path
+
+    def fake_duration(file_path):
+        time.sleep(probe_latency)
+        return 10.0
+
+    voice_service.generate_voiceover = fake_voiceover
+    video_service.get_media_duration = fake_duration
+    # Measure scheduling only; cache hits would hide the TTS latency
+    voice_service.TTS_CACHE_ENABLED = False
+
+
+def serial_voiceovers(scripts, output_dir):
+    """The per-slide loop generate_assets used before the batched stage."""
+    voice_paths = []
+    durations = []
+    for i, script in enumerate(scripts):
+        voice_path = os.path.join(output_dir, f"voiceover_{i}.mp3")
+        voice_service.generate_voiceover(script, voice_path)
+        voice_paths.append(voice_path)
+        durations.append(video_service.get_media_duration(voice_path))
+    return voice_paths, durations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--slides", type=int, default=15)
+    parser.add_argument("--tts-latency", type=float, default=0.8)
+    parser.add_argument("--probe-latency", type=float, default=0.05)
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[2, 4, 8])
+    args = parser.parse_args()
+
+    _install_stubs(args.tts_latency, args.probe_latency)
+    scripts = [f"Narration for slide {i}" for i in range(args.slides)]
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        start = time.perf_counter()
+        expected = serial_voiceovers(scripts, output_dir)
+        serial = time.perf_counter() - start
+        print(f"serial         {serial:7.2f}s")
+
+        for workers in args.concurrency:
+            start = time.perf_counter()
+            result = voice_service.generate_voiceovers(scripts, output_dir, max_workers=workers)
+            elapsed = time.perf_counter() - start
+            assert result == expected, "batched stage changed clip order or durations"
+            print(f"batched x{workers:<5} {elapsed:7.2f}s  ({serial / elapsed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""
+A local stand-in for Cloudinary's upload and delivery APIs.
+
+Understands just enough of the protocol used by services/upload_service:
+signed multipart uploads on /v1_1/<cloud>/<type>/upload (including
+chunked uploads with X-Unique-Upload-Id and Content-Range) and HEAD/GET
+on the delivery URL of an uploaded asset. Assets are kept in memory.
+
+Usage (from backend/):
+    python -m benchmarks.fake_cloudinary --port 8765
+then run the backend with
+    CLOUDINARY_API_BASE=http://127.0.0.1:8765 CLOUDINARY_DELIVERY_BASE=http://127.0.0.1:8765
+"""
+import argparse
+import json
+import re
+import threading
+import time
+from email import policy
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+UPLOAD_PATH = re.compile(r"^/v1_1/(?P<cloud>[^/]+)/(?P<type>[^/]+)/upload$")
+RANGE = re.compile(r"bytes (\d+)-(\d+)/(\d+)")
+
+
+class FakeCloudinary:
+    """In-memory asset store served over HTTP on a background thread."""
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0):
+        self.latency = latency
+        self.assets = {}
+        self.uploads = 0
+        self.bytes_received = 0
+        self._partial = {}
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handler(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_HEAD(self):
+                self._deliver(send_body=False)
+
+            def do_GET(self):
+                self._deliver(send_body=True)
+
+            def _deliver(self, send_body):
+                # Delivery URLs are /<cloud>/<type>/upload/<public_id><ext>
+                public_id = re.sub(r"\.[A-Za-z0-9]+$", "", self.path.split("/upload/", 1)[-1])
+                data = fake.assets.get(public_id)
+                if data is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                if send_body:
+                    self.wfile.write(data)
+
+            def do_POST(self):
+                match = UPLOAD_PATH.match(self.path)
+                if not match:
+                    self._json(404, {"error": {"message": "Not found"}})
+                    return
+                form, filename = self._form()
+                public_id = form["public_id"].decode("utf-8")
+                data = form["file"]
+                ext = re.search(r"\.[A-Za-z0-9]+$", filename or "")
+                if fake.latency:
+                    time.sleep(fake.latency)
+
+                with fake._lock:
+                    fake.bytes_received += len(data)
+                    content_range = self.headers.get("Content-Range")
+                    if content_range:
+                        start, end, total = (int(x) for x in RANGE.match(content_range).groups())
+                        upload_id = self.headers.get("X-Unique-Upload-Id")
+                        buffer = fake._partial.setdefault(upload_id, bytearray(total))
+                        buffer[start:end + 1] = data
+                        if end + 1 < total:
+                            self._json(200, {"done": False})
+                            return
+                        data = bytes(fake._partial.pop(upload_id))
+                    fake.assets[public_id] = data
+                    fake.uploads += 1
+
+                host = self.headers.get("Host")
+                url = f"http://{host}/{match['cloud']}/{match['type']}/upload/{public_id}{ext[0] if ext else ''}"
+                self._json(200, {"public_id": public_id, "secure_url": url, "bytes": len(data)})
+
+            def _form(self):
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                head = f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode("latin-1")
+                message = BytesParser(policy=policy.HTTP).parsebytes(head + body)
+                fields, filename = {}, None
+                for part in message.iter_parts():
+                    fields[part.get_param("name", header="content-disposition")] = part.get_payload(decode=True)
+                    filename = part.get_filename() or filename
+                return fields, filename
+
+            def _json(self, status, payload):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every upload")
+    args = parser.parse_args()
+
+    fake = FakeCloudinary(args.host, args.port, args.latency)
+    print(f"Fake Cloudinary listening on {fake.base_url}")
+    try:
+        fake.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
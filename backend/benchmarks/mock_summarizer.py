@@ -0,0 +1,116 @@
+"""
+A local stand-in for the external notes summarizer behind /summarize.
+
+Accepts the same multipart/form-data POST (a "file" part or a
+"notes_text" field) and answers in the service's format: a "result" whose
+"raw_output" holds fenced JSON with summary, flashcards, glossary and
+concept_map. --fail-every makes every Nth request answer 500, to exercise
+the circuit breaker.
+
+Usage (from backend/):
+    python -m benchmarks.mock_summarizer --port 8766
+then run the backend with
+    SUMMARIZER_URL=http://127.0.0.1:8766/summarize_notes
+"""
+import argparse
+import hashlib
+import json
+import threading
+import time
+from email import policy
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class MockSummarizer:
+    """Summarizer double served over HTTP on a background thread."""
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, fail_every=0):
+        self.latency = latency
+        self.fail_every = fail_every
+        self.requests = 0
+        self.bytes_received = 0
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), self._handler())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/summarize_notes"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def _handler(self):
+        mock = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                if self.path != "/summarize_notes":
+                    self._json(404, {"detail": "Not Found"})
+                    return
+                body = self.rfile.read(int(self.headers["Content-Length"]))
+                with mock._lock:
+                    mock.requests += 1
+                    mock.bytes_received += len(body)
+                    failing = mock.fail_every and mock.requests % mock.fail_every == 0
+                if mock.latency:
+                    time.sleep(mock.latency)
+                if failing:
+                    self._json(500, {"detail": "Internal Server Error"})
+                    return
+
+                head = f"Content-Type: {self.headers['Content-Type']}\r\n\r\n".encode("latin-1")
+                message = BytesParser(policy=policy.HTTP).parsebytes(head + body)
+                fields = {part.get_param("name", header="content-disposition"): part.get_payload(decode=True)
+                          for part in message.iter_parts()}
+                notes = fields.get("file") or fields.get("notes_text") or b""
+                digest = hashlib.sha256(notes).hexdigest()[:12]
+                result = {
+                    "summary": [f"Summary of {len(notes)} bytes of notes ({digest})"],
+                    "flashcards": [{"question": "What was summarized?", "answer": f"Notes {digest}"}],
+                    "glossary": [{"term": "Notes", "definition": "The uploaded material"}],
+                    "concept_map": [{"concept": "Notes", "related": ["Summary"]}]
+                }
+                self._json(200, {"result": {"raw_output": f"```json\n{json.dumps(result)}\n```"}})
+
+            def _json(self, status, payload):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every request")
+    parser.add_argument("--fail-every", type=int, default=0, help="Answer 500 to every Nth request")
+    args = parser.parse_args()
+
+    mock = MockSummarizer(args.host, args.port, args.latency, args.fail_every)
+    print(f"Mock summarizer listening on {mock.url}")
+    try:
+        mock.server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
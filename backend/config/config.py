@@ -1,6 +1,193 @@
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
 
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+
+# ==== Job queue ====
+# Number of worker processes running the generation pipeline.
+# 0 runs the pipeline inline inside the request (legacy behaviour).
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+# Maximum number of jobs waiting for a free worker before /generate answers 429.
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "8"))
+# Seconds a finished job stays available on /jobs/<id>.
+JOB_RESULT_TTL = int(os.getenv("JOB_RESULT_TTL", "3600"))
+# Multiprocessing start method for the worker pool (spawn, forkserver or fork).
+JOB_START_METHOD = os.getenv("JOB_START_METHOD", "spawn")
+
+# ==== Workspaces ====
+# Every pipeline run writes into its own output/workspaces/<id> directory.
+# Workspaces older than WORKSPACE_TTL seconds are removed, and the oldest
+# finished ones are evicted while the total exceeds WORKSPACE_MAX_BYTES.
+WORKSPACE_TTL = int(os.getenv("WORKSPACE_TTL", str(24 * 3600)))
+WORKSPACE_MAX_BYTES = int(os.getenv("WORKSPACE_MAX_BYTES", str(5 * 1024 ** 3)))
+WORKSPACE_JANITOR_INTERVAL = int(os.getenv("WORKSPACE_JANITOR_INTERVAL", "600"))
+
+# ==== Voiceover ====
+# Maximum number of slide voiceovers synthesized at the same time.
+VOICE_CONCURRENCY = int(os.getenv("VOICE_CONCURRENCY", "4"))
+# Extra attempts for a slide whose synthesis fails (with exponential backoff).
+VOICE_RETRIES = int(os.getenv("VOICE_RETRIES", "2"))
+
+# Text-to-speech engine: "gtts" (Google, online, MP3), "piper" (offline
+# neural voices, WAV) or "espeak" (offline espeak-ng, WAV).
+TTS_ENGINE = os.getenv("TTS_ENGINE", "gtts").lower()
+# piper binary and the .onnx voice it loads (its .onnx.json must sit next to it).
+PIPER_BINARY = os.getenv("PIPER_BINARY", "piper")
+PIPER_MODEL = os.getenv("PIPER_MODEL", "")
+ESPEAK_BINARY = os.getenv("ESPEAK_BINARY", "espeak-ng")
+# espeak-ng voice; empty uses the requested language.
+ESPEAK_VOICE = os.getenv("ESPEAK_VOICE", "")
+
+# ==== TTS cache ====
+# Synthesized clips are cached on disk by hash of (text, lang, slow, engine).
+TTS_CACHE_ENABLED = os.getenv("TTS_CACHE_ENABLED", "true").lower() == "true"
+TTS_CACHE_DIR = os.getenv("TTS_CACHE_DIR", "cache/tts")
+TTS_CACHE_MAX_BYTES = int(os.getenv("TTS_CACHE_MAX_BYTES", str(1024 ** 3)))
+
+# ==== Audio assembly ====
+# Decode the voiceover clips to PCM in memory, lay them out on exact sample
+# boundaries and pipe the narration to the encoder (no concatenated audio
+# file). The segmented encode always uses the track, whatever this is set to.
+AUDIO_PCM = os.getenv("AUDIO_PCM", "true").lower() == "true"
+# Sample rate of the assembled track; WAV clips that all share one rate keep it.
+AUDIO_SAMPLE_RATE = int(os.getenv("AUDIO_SAMPLE_RATE", "44100"))
+# Silence appended after every slide's narration, in seconds.
+AUDIO_SLIDE_PADDING = float(os.getenv("AUDIO_SLIDE_PADDING", "0"))
+# Bring every clip to AUDIO_TARGET_DBFS (RMS) without peaks above AUDIO_PEAK_DBFS.
+AUDIO_NORMALIZE = os.getenv("AUDIO_NORMALIZE", "true").lower() == "true"
+AUDIO_TARGET_DBFS = float(os.getenv("AUDIO_TARGET_DBFS", "-20"))
+AUDIO_PEAK_DBFS = float(os.getenv("AUDIO_PEAK_DBFS", "-1"))
+
+# ==== Video encoding ====
+# Render the video in one ffmpeg pass straight from the per-slide clips,
+# without first concatenating them into one voiceover file.
+VIDEO_SINGLE_PASS = os.getenv("VIDEO_SINGLE_PASS", "true").lower() == "true"
+VIDEO_FPS = int(os.getenv("VIDEO_FPS", "10"))
+VIDEO_PRESET = os.getenv("VIDEO_PRESET", "veryfast")
+VIDEO_TUNE = os.getenv("VIDEO_TUNE", "stillimage")
+VIDEO_CRF = int(os.getenv("VIDEO_CRF", "28"))
+# ffmpeg encoder threads; 0 splits the cores evenly between the JOB_WORKERS
+# concurrent jobs so parallel encodes fill the host without oversubscribing it.
+VIDEO_THREADS = int(os.getenv("VIDEO_THREADS", "0"))
+# Encode every slide as its own video-only segment, several at a time, and join
+# the segments with stream copy, adding the narration in that final pass.
+# Takes precedence over VIDEO_SINGLE_PASS.
+VIDEO_SEGMENTED = os.getenv("VIDEO_SEGMENTED", "false").lower() == "true"
+# Encoder threads per segment; segments run in parallel within the job's
+# share of the cores (VIDEO_THREADS, or cores / JOB_WORKERS).
+VIDEO_SEGMENT_THREADS = int(os.getenv("VIDEO_SEGMENT_THREADS", "1"))
+# Encoded segments are cached by hash of (image, frame count, encoder
+# settings), so identical slides are reused across lectures.
+SEGMENT_CACHE_ENABLED = os.getenv("SEGMENT_CACHE_ENABLED", "true").lower() == "true"
+SEGMENT_CACHE_DIR = os.getenv("SEGMENT_CACHE_DIR", "cache/segments")
+SEGMENT_CACHE_MAX_BYTES = int(os.getenv("SEGMENT_CACHE_MAX_BYTES", str(2 * 1024 ** 3)))
+# Draw slides in memory and pipe them to ffmpeg as raw RGB frames instead of
+# encoding from PNG files; slide PNGs are then only rendered for requests that
+# ask for slide images. Ignored by the segmented encode.
+VIDEO_FRAME_PIPE = os.getenv("VIDEO_FRAME_PIPE", "false").lower() == "true"
+# Host-wide cap on ffmpeg encoder threads across all processes (0 = CPU count),
+# enforced with flock'ed slot files in ENCODE_SLOTS_DIR.
+ENCODE_THREAD_BUDGET = int(os.getenv("ENCODE_THREAD_BUDGET", "0"))
+ENCODE_SLOTS_DIR = os.getenv("ENCODE_SLOTS_DIR", os.path.join(tempfile.gettempdir(), "shikshaflow-encode-slots"))
+
+# ==== LLM ====
+# Stream the lecture from the model and start each slide's voiceover as soon
+# as the slide has been generated.
+LLM_STREAMING = os.getenv("LLM_STREAMING", "true").lower() == "true"
+
+# ==== Lecture cache ====
+# Validated lecture JSON is cached by normalized prompt + model + temperature.
+LECTURE_CACHE_ENABLED = os.getenv("LECTURE_CACHE_ENABLED", "true").lower() == "true"
+LECTURE_CACHE_DIR = os.getenv("LECTURE_CACHE_DIR", "cache/lectures")
+LECTURE_CACHE_TTL = int(os.getenv("LECTURE_CACHE_TTL", str(7 * 24 * 3600)))
+LECTURE_CACHE_MAX_ENTRIES = int(os.getenv("LECTURE_CACHE_MAX_ENTRIES", "5000"))
+# Cosine similarity needed for a near-duplicate prompt to hit; 0 disables the tier.
+LECTURE_CACHE_SIMILARITY = float(os.getenv("LECTURE_CACHE_SIMILARITY", "0"))
+
+# ==== Slide rendering ====
+# Processes used to draw slide images; decks smaller than
+# RENDER_PARALLEL_MIN_SLIDES are drawn inline.
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", str(min(4, os.cpu_count() or 1))))
+RENDER_PARALLEL_MIN_SLIDES = int(os.getenv("RENDER_PARALLEL_MIN_SLIDES", "8"))
+# Rendered slides are cached by content hash (title, bullets, theme).
+RENDER_CACHE_DIR = os.getenv("RENDER_CACHE_DIR", "cache/slides")
+RENDER_CACHE_MAX_BYTES = int(os.getenv("RENDER_CACHE_MAX_BYTES", str(512 * 1024 ** 2)))
+
+# ==== Cloudinary ====
+CLOUDINARY_CLOUD_NAME = os.getenv("CLOUDINARY_CLOUD_NAME", "darxayoxh")
+CLOUDINARY_API_KEY = os.getenv("CLOUDINARY_API_KEY", "361159848575877")
+CLOUDINARY_API_SECRET = os.getenv("CLOUDINARY_API_SECRET", "o8yxsgWi3M0-7eleAiScnvCUIvQ")
+# Point these at a local stand-in server for testing.
+CLOUDINARY_API_BASE = os.getenv("CLOUDINARY_API_BASE", "https://api.cloudinary.com")
+CLOUDINARY_DELIVERY_BASE = os.getenv("CLOUDINARY_DELIVERY_BASE", "https://res.cloudinary.com")
+
+# ==== Uploads ====
+UPLOAD_CONCURRENCY = int(os.getenv("UPLOAD_CONCURRENCY", "4"))
+UPLOAD_RETRIES = int(os.getenv("UPLOAD_RETRIES", "3"))
+UPLOAD_TIMEOUT = float(os.getenv("UPLOAD_TIMEOUT", "60"))
+# Files larger than this are sent in UPLOAD_CHUNK_SIZE chunks.
+UPLOAD_CHUNK_THRESHOLD = int(os.getenv("UPLOAD_CHUNK_THRESHOLD", str(20 * 1024 ** 2)))
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(20 * 1024 ** 2)))
+# Folder holding content-addressed uploads.
+UPLOAD_FOLDER = os.getenv("UPLOAD_FOLDER", "shikshaflow")
+
+# ==== Storage ====
+# Where generated artifacts are published: "cloudinary", "local" or "s3".
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "cloudinary").lower()
+# Local backend: files are kept under STORAGE_LOCAL_DIR and served on /files/<name>.
+STORAGE_LOCAL_DIR = os.getenv("STORAGE_LOCAL_DIR", "storage")
+STORAGE_LOCAL_BASE_URL = os.getenv("STORAGE_LOCAL_BASE_URL", "http://localhost:5000/files")
+# Internal nginx location mapped to STORAGE_LOCAL_DIR (e.g. "/protected/").
+# When set, /files hands the transfer to nginx with X-Accel-Redirect.
+STORAGE_ACCEL_REDIRECT = os.getenv("STORAGE_ACCEL_REDIRECT", "")
+# Let Apache/lighttpd send files with X-Sendfile instead.
+STORAGE_X_SENDFILE = os.getenv("STORAGE_X_SENDFILE", "false").lower() == "true"
+# S3-compatible backend (AWS S3, or a local stand-in such as MinIO; needs boto3).
+S3_ENDPOINT_URL = os.getenv("S3_ENDPOINT_URL")
+S3_BUCKET = os.getenv("S3_BUCKET", "shikshaflow")
+S3_REGION = os.getenv("S3_REGION", "us-east-1")
+S3_ACCESS_KEY = os.getenv("S3_ACCESS_KEY")
+S3_SECRET_KEY = os.getenv("S3_SECRET_KEY")
+# Base URL objects are served from; defaults to the path-style endpoint URL.
+S3_PUBLIC_BASE_URL = os.getenv("S3_PUBLIC_BASE_URL")
+
+# ==== Metrics ====
+# Include a per-request breakdown of span/stage timings in /generate results.
+# Inline runs (JOB_WORKERS=0) serving concurrent requests may see each other's spans.
+METRICS_RESPONSE_TIMINGS = os.getenv("METRICS_RESPONSE_TIMINGS", "false").lower() == "true"
+
+# ==== Batch generation ====
+# Maximum number of prompts accepted by one POST /generate/batch.
+BATCH_MAX_PROMPTS = int(os.getenv("BATCH_MAX_PROMPTS", "100"))
+# Lectures of a batch requested from the LLM at the same time, ahead of the media stages.
+BATCH_LLM_CONCURRENCY = int(os.getenv("BATCH_LLM_CONCURRENCY", "4"))
+# Queue slots batch jobs may occupy; the rest stay free for interactive requests.
+BATCH_MAX_QUEUED = int(os.getenv("BATCH_MAX_QUEUED", str(max(1, JOB_QUEUE_SIZE // 2))))
+
+# ==== Summarizer ====
+# External notes summarizer proxied by /summarize.
+SUMMARIZER_URL = os.getenv("SUMMARIZER_URL", "https://pdf-summarizer-service-1.onrender.com/summarize_notes")
+SUMMARIZER_CONNECT_TIMEOUT = float(os.getenv("SUMMARIZER_CONNECT_TIMEOUT", "5"))
+# The hosted service can take a while to wake up and summarize a long PDF.
+SUMMARIZER_READ_TIMEOUT = float(os.getenv("SUMMARIZER_READ_TIMEOUT", "120"))
+# After this many consecutive failures /summarize fails fast with 503 for
+# SUMMARIZER_RESET_TIMEOUT seconds, then lets one trial request through.
+SUMMARIZER_FAILURE_THRESHOLD = int(os.getenv("SUMMARIZER_FAILURE_THRESHOLD", "5"))
+SUMMARIZER_RESET_TIMEOUT = float(os.getenv("SUMMARIZER_RESET_TIMEOUT", "30"))
+# Summaries are cached on disk by hash of the uploaded file or text.
+SUMMARY_CACHE_ENABLED = os.getenv("SUMMARY_CACHE_ENABLED", "true").lower() == "true"
+SUMMARY_CACHE_DIR = os.getenv("SUMMARY_CACHE_DIR", "cache/summaries")
+SUMMARY_CACHE_MAX_BYTES = int(os.getenv("SUMMARY_CACHE_MAX_BYTES", str(100 * 1024 ** 2)))
+
+# ==== Warm-up ====
+# Load fonts, theme styles, the heavy libraries and the SDK clients before
+# the first request instead of during it (/ready reports when it finished):
+#   off        - load everything lazily on first use
+#   background - warm up on a thread after startup (single-process servers)
+#   blocking   - warm up while the app is imported; with gunicorn --preload
+#                this runs once in the master and the forked workers share
+#                the loaded pages copy-on-write
+WARMUP = os.getenv("WARMUP", "background").lower()
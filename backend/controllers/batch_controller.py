@@ -0,0 +1,81 @@
+from flask import request, jsonify, Response, stream_with_context
+from services.batch_service import get_batch_manager
+from config.config import BATCH_MAX_PROMPTS
+import json
+import queue
+
+DEFAULT_PAGE_SIZE = 20
+
+def _format_sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def submit_batch():
+    """
+    Queue one lecture per prompt of a course.
+    Expects a JSON body {"prompts": [...], "theme": "..."}; answers 202 with
+    the batch ID and where to follow it.
+    """
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Request must be JSON"}), 400
+
+    prompts = data.get("prompts")
+    theme = data.get("theme", "Minimalist")
+    if not isinstance(prompts, list) or not prompts:
+        return jsonify({"error": "'prompts' must be a non-empty list"}), 400
+    if not all(isinstance(prompt, str) and prompt.strip() for prompt in prompts):
+        return jsonify({"error": "Every prompt must be a non-empty string"}), 400
+    if len(prompts) > BATCH_MAX_PROMPTS:
+        return jsonify({"error": f"At most {BATCH_MAX_PROMPTS} prompts per batch"}), 400
+
+    summary = get_batch_manager().submit(prompts, theme)
+    print(f"Batch {summary['batch_id']}: {summary['total']} prompts, {summary['unique']} unique")
+    batch_id = summary["batch_id"]
+    return jsonify({
+        **summary,
+        "status": "running",
+        "status_url": f"/generate/batch/{batch_id}",
+        "stream_url": f"/generate/batch/{batch_id}/stream"
+    }), 202
+
+def get_batch_status(batch_id):
+    """Return one page of the batch manifest (query parameters offset and limit)."""
+    try:
+        offset = max(0, int(request.args.get("offset", 0)))
+        limit = min(max(1, int(request.args.get("limit", DEFAULT_PAGE_SIZE))), BATCH_MAX_PROMPTS)
+    except ValueError:
+        return jsonify({"error": "offset and limit must be integers"}), 400
+
+    page = get_batch_manager().get(batch_id, offset=offset, limit=limit)
+    if page is None:
+        return jsonify({"error": "Batch not found"}), 404
+    return jsonify(page)
+
+def stream_batch(batch_id):
+    """
+    Stream the batch manifest as Server-Sent Events: one "item" event per
+    finished prompt (in completion order), then "done" with the totals.
+    """
+    manager = get_batch_manager()
+    events = manager.subscribe(batch_id)
+    if events is None:
+        return jsonify({"error": "Batch not found"}), 404
+
+    def generate():
+        try:
+            while True:
+                try:
+                    item = events.get(timeout=15)
+                except queue.Empty:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ": keep-alive\n\n"
+                    continue
+                if item is None:
+                    break
+                event, data = item
+                yield _format_sse(event, data)
+        finally:
+            manager.unsubscribe(batch_id, events)
+
+    return Response(stream_with_context(generate()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
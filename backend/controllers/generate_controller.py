@@ -1,138 +1,448 @@
-from flask import request, jsonify
-from services.ai_service import generate_lecture
+from flask import request, jsonify, Response, stream_with_context
+from services.ai_service import generate_lecture, generate_lecture_stream, get_lecture_cache, openai_available, MOCK_LECTURE
 from services.slide_service import generate_slides
-from services.voice_service import generate_voiceover, combine_audio
-from services.video_service import create_video, get_media_duration
+from services.voice_service import VoiceoverBatch, combine_audio, voiceover_ext
+from services.audio_service import assemble_audio
+from services.video_service import (create_video, create_video_single_pass, create_video_segmented,
+                                    create_video_from_frames)
 from services.quiz_service import generate_quiz
-from utils.file_utils import convert_pptx_to_images
+from services.job_service import get_job_manager, QueueFullError
+from services.lecture_service import create_manifest
+from services.render_service import render_slides, slide_frames
+from models.lecture_model import Lecture
+from models.slide_model import Slide
+from utils.file_utils import upload_images
+from utils.json_utils import SlideStreamParser
+from utils.pipeline_utils import Pipeline, Stage
+from utils import metrics_utils
+from utils.workspace_utils import create_workspace, release_workspace, workspace_id
+from config.config import (JOB_WORKERS, VIDEO_SINGLE_PASS, VIDEO_SEGMENTED, VIDEO_FRAME_PIPE, AUDIO_PCM,
+                           LLM_STREAMING, METRICS_RESPONSE_TIMINGS)
 import json
 import os
+import queue
+import threading
+
+# The video is encoded from frames drawn in memory rather than from the slide PNGs
+FRAME_PIPE = VIDEO_FRAME_PIPE and not VIDEO_SEGMENTED
+
+def _parse_generate_request():
+    """
+    Validate the /generate request body.
+
+    Returns:
+        tuple: (prompt, theme, slide_images, None) on success or
+            (None, None, None, error_response)
+    """
+    # Check if request has JSON data
+    if not request.is_json:
+        print("Request is not JSON")
+        return None, None, None, (jsonify({"error": "Request must be JSON"}), 400)
+
+    data = request.get_json()
+    print(f"Request data: {data}")
+
+    if data is None:
+        print("Invalid JSON data")
+        return None, None, None, (jsonify({"error": "Invalid JSON data"}), 400)
+
+    prompt = data.get("prompt")
+    theme = data.get("theme", "Minimalist")
+    slide_images = data.get("slide_images", True)
+    print(f"Prompt: {prompt}, Theme: {theme}")
+
+    if not prompt:
+        print("Prompt is required")
+        return None, None, None, (jsonify({"error": "Prompt is required"}), 400)
+    if not isinstance(slide_images, bool):
+        return None, None, None, (jsonify({"error": "slide_images must be a boolean"}), 400)
+
+    return prompt, theme, slide_images, None
+
+def _report(progress, stage, status):
+    if progress:
+        progress(stage, status)
+
+def _emit(progress, event, data):
+    """Publish a partial result (status "data") as soon as it is available."""
+    if progress:
+        progress(event, "data", data)
+
+def run_pipeline(prompt, theme, progress=None, lecture=None, slide_images=True):
+    """
+    Run the full generation pipeline for one prompt.
+
+    Args:
+        prompt (str): Lecture topic / instructions
+        theme (str): Visual theme name
+        progress (callable, optional): Called as progress(stage, status)
+            with status "running" or "done" as each stage starts and ends,
+            and as progress(event, "data", payload) for partial results
+        lecture (list, optional): Lecture generated ahead of time, as
+            Lecture.to_compact(); the model is not called
+        slide_images (bool): Whether to render and upload slide images.
+            With VIDEO_FRAME_PIPE the video does not need them, so no PNG
+            is written when this is False
+
+    Returns:
+        dict: Generated asset paths, URLs and quiz
+
+    Raises:
+        ValueError: If the AI service returns unusable content
+    """
+    # Every run gets its own scratch directory so concurrent runs never share files
+    workspace = create_workspace()
+    print(f"Workspace: {workspace}")
+    try:
+        return _run_stages(prompt, theme, workspace, progress, lecture, slide_images)
+    finally:
+        release_workspace(workspace)
+
+def _parse_lecture(ai_output_str):
+    """Validate the AI output string into a Lecture."""
+    print(f"AI output string: {ai_output_str}")
+
+    if not ai_output_str:
+        print("Failed to generate AI content")
+        raise ValueError("Failed to generate AI content")
+
+    lecture = Lecture.parse(ai_output_str)
+    print(f"Parsed lecture: {len(lecture.slides)} slides, {len(lecture.quiz)} quiz questions")
+    return lecture
+
+def _generate_content(prompt, progress, on_slide, lecture=None):
+    """
+    Generate the lecture. When streaming, on_slide(index, slide) is called
+    for every slide as soon as the model has finished writing it.
+    A lecture generated ahead of time (Lecture.to_compact()) or a validated
+    one from the lecture cache is used instead of calling the model.
+    """
+    cache = get_lecture_cache() if openai_available() else None
+    cached = lecture if lecture is not None else (cache.get(prompt) if cache else None)
+    if cached is not None:
+        print("Using pre-generated lecture" if lecture is not None else "Lecture cache hit")
+        lecture = Lecture.from_compact(cached)
+        for i, slide in enumerate(lecture.slides):
+            on_slide(i, slide)
+        return lecture
+
+    if not LLM_STREAMING:
+        raw_output = generate_lecture(prompt)
+        lecture = _parse_lecture(raw_output)
+    else:
+        parser = SlideStreamParser()
+        with metrics_utils.span("generate_lecture"):
+            for chunk in generate_lecture_stream(prompt):
+                for index, slide in parser.feed(chunk):
+                    print(f"Streamed slide {index}: {slide.get('title')}")
+                    _emit(progress, "slide", {"index": index, "slide": slide})
+                    try:
+                        on_slide(index, Slide.from_dict(slide))
+                    except ValueError as e:
+                        # The full parse below decides what happens to this slide
+                        print(f"Not voicing streamed slide {index} yet: {e}")
+        raw_output = "".join(parser.text)
+        lecture = _parse_lecture(raw_output)
+
+    # Never cache the mock lecture returned when the OpenAI call failed
+    if cache and raw_output != MOCK_LECTURE:
+        cache.put(prompt, lecture.to_compact())
+    # Slides dropped by validation shift later indices; changed scripts are re-voiced
+    for i, slide in enumerate(lecture.slides):
+        on_slide(i, slide)
+    return lecture
+
+def prefetch_lecture(prompt):
+    """
+    Generate the lecture for prompt ahead of its pipeline run (and store it
+    in the lecture cache when enabled).
+
+    Returns:
+        list: The lecture as Lecture.to_compact(), to pass on to
+            run_pipeline() or the job queue, or None if OpenAI is
+            unavailable or failed
+    """
+    if not openai_available():
+        return None
+    cache = get_lecture_cache()
+    cached = cache.get(prompt) if cache else None
+    if cached is not None:
+        return Lecture.from_compact(cached).to_compact()
+    raw_output = generate_lecture(prompt)
+    # Never cache the mock lecture returned when the OpenAI call failed
+    if raw_output == MOCK_LECTURE:
+        return None
+    lecture = _parse_lecture(raw_output)
+    if cache:
+        cache.put(prompt, lecture.to_compact())
+    return lecture.to_compact()
+
+def _stage_lecture(prompt, progress, voice_batch, pregenerated):
+    print("Generating AI content...")
+    lecture = _generate_content(prompt, progress,
+                                on_slide=lambda i, slide: voice_batch.submit(i, slide.script),
+                                lecture=pregenerated)
+    _emit(progress, "lecture", {"slides": lecture.slide_dicts()})
+    return lecture
+
+def _stage_quiz(lecture, progress):
+    # Cheap, so clients get it before the media stages
+    print("Generating quiz...")
+    quiz_data = generate_quiz(lecture.quiz)
+    print(f"Quiz data: {quiz_data}")
+    _emit(progress, "quiz", {"quiz": quiz_data})
+    return quiz_data
+
+def _stage_pptx(lecture, theme, workspace, progress):
+    print("Generating slides...")
+    slides_path = generate_slides(lecture.slide_dicts(), theme, output_dir=workspace)
+    print(f"Slides path: {slides_path}")
+    metrics_utils.record_bytes("pptx", [slides_path])
+    _emit(progress, "pptx", {"slides_path": slides_path})
+    return slides_path
+
+def _stage_images(lecture, theme, workspace, slide_images):
+    if FRAME_PIPE and not slide_images:
+        return []
+    # Rendered from the slide data, so this does not wait for the PPTX
+    print("Rendering slide images...")
+    slide_images = render_slides(lecture.slide_dicts(), theme, workspace)
+    print(f"Slide images (local): {slide_images}")
+    metrics_utils.record_bytes("slide_image", slide_images)
+    return slide_images
+
+def _stage_uploads(images, progress):
+    # Runs alongside the video encode
+    slide_images_cloud = upload_images(
+        images,
+        on_image=lambda i, path, url: _emit(progress, "slide_image", {"index": i, "path": path, "url": url})
+    )["cloud_urls"]
+    print(f"Slide images (cloud): {slide_images_cloud}")
+    return slide_images_cloud
+
+def _stage_voices(lecture, voice_batch):
+    print("Generating voiceovers...")
+    voice_paths, durations = voice_batch.results(len(lecture.slides))
+    metrics_utils.record_bytes("voiceover", voice_paths)
+    return {"paths": voice_paths, "durations": durations}
+
+def _stage_durations(voices, workspace):
+    if AUDIO_PCM or VIDEO_SEGMENTED:
+        # Slide lengths come from the decoded samples and the track is piped to the encoder
+        # (the segmented encode always takes it, its segments carry no audio)
+        track = assemble_audio(voices["paths"])
+        return {"durations": track.durations, "voice_path": None, "audio": track}
+
+    durations = [duration if duration else 25 for duration in voices["durations"]]
+
+    # Combine voiceovers into a single file (the single-pass encode reads the clips directly)
+    full_voice_path = None
+    if FRAME_PIPE or not VIDEO_SINGLE_PASS:
+        full_voice_path = os.path.join(workspace, f"voiceover{voiceover_ext()}")
+        combine_audio(voices["paths"], full_voice_path)
+        print(f"Combined voice path: {full_voice_path}")
+    return {"durations": durations, "voice_path": full_voice_path}
+
+def _stage_video(voices, durations, workspace, progress, images=None, lecture=None, theme=None):
+    print("Creating video with custom durations...")
+    video_output = os.path.join(workspace, "lecture.mp4")
+    track = durations.get("audio")
+    segments = None
+    if FRAME_PIPE:
+        audio = track if track is not None else durations["voice_path"]
+        video_result = create_video_from_frames(slide_frames(lecture.slide_dicts(), theme), audio,
+                                                durations["durations"], video_output)
+    elif VIDEO_SEGMENTED:
+        # Kept in the workspace and recorded in the manifest, so the first edit reuses them
+        segments = [os.path.join(workspace, f"segment_{i}.mp4") for i in range(len(images))]
+        video_result = create_video_segmented(images, track, durations["durations"], video_output,
+                                              segment_paths=segments)
+    elif VIDEO_SINGLE_PASS:
+        audio = track if track is not None else voices["paths"]
+        video_result = create_video_single_pass(images, audio, durations["durations"], video_output)
+    else:
+        audio = track if track is not None else durations["voice_path"]
+        video_result = create_video(images, audio, durations=durations["durations"], output_path=video_output)
+
+    if isinstance(video_result, dict):
+        video_path = video_result["cloud_url"]
+        video_local_path = video_result["local_path"]
+    else:
+        video_path = video_result
+        video_local_path = video_result
+    print(f"Video path: {video_path}")
+    metrics_utils.record_bytes("video", [video_local_path])
+    _emit(progress, "video", {"video_path": video_path, "video_local_path": video_local_path})
+    return {"video_path": video_path, "video_local_path": video_local_path, "segments": segments}
+
+# Each stage runs as soon as the stages named in its inputs have finished
+GENERATION_PIPELINE = Pipeline([
+    Stage("lecture", _stage_lecture, inputs=("prompt", "progress", "voice_batch", "pregenerated")),
+    Stage("quiz", _stage_quiz, inputs=("lecture", "progress")),
+    Stage("pptx", _stage_pptx, inputs=("lecture", "theme", "workspace", "progress")),
+    Stage("images", _stage_images, inputs=("lecture", "theme", "workspace", "slide_images")),
+    Stage("uploads", _stage_uploads, inputs=("images", "progress")),
+    Stage("voices", _stage_voices, inputs=("lecture", "voice_batch")),
+    Stage("durations", _stage_durations, inputs=("voices", "workspace")),
+    # Piped frames are drawn from the lecture, so the encode does not wait for the PNGs
+    Stage("video", _stage_video, inputs=(("lecture", "theme") if FRAME_PIPE else ("images",)) +
+          ("voices", "durations", "workspace", "progress")),
+])
+
+def _run_stages(prompt, theme, workspace, progress, pregenerated=None, slide_images=True):
+    # Voiceovers start as soon as each slide's script is known
+    voice_batch = VoiceoverBatch(
+        workspace,
+        on_clip=lambda i, path, duration: _emit(progress, "voice_clip",
+                                                {"index": i, "path": path, "duration": duration})
+    )
+    before = metrics_utils.snapshot()
+    try:
+        values, timings = GENERATION_PIPELINE.run(
+            {"prompt": prompt, "theme": theme, "workspace": workspace,
+             "progress": progress, "voice_batch": voice_batch, "pregenerated": pregenerated,
+             "slide_images": slide_images},
+            on_stage=lambda stage, status: _report(progress, stage, status)
+        )
+    finally:
+        # No-op once the voices stage has collected every clip
+        voice_batch.close()
+    print(f"Stage timings: {timings}")
+    for stage, seconds in timings.items():
+        metrics_utils.STAGE_SECONDS.observe(seconds, stage=stage)
+    recorded = metrics_utils.diff(before, metrics_utils.snapshot())
+    metrics_utils.JOB_SUBPROCESSES.observe(sum(recorded.get(metrics_utils.SUBPROCESSES.name, {}).values()))
+
+    lecture, video, durations = values["lecture"], values["video"], values["durations"]
+
+    # Record per-slide artifacts so later edits only rebuild what changed
+    create_manifest(workspace, theme, lecture.slide_dicts(), values["quiz"], values["pptx"],
+                    values["images"], values["uploads"], values["voices"]["paths"], durations["durations"],
+                    video["video_local_path"], video["video_path"], segment_paths=video["segments"])
+
+    result = {
+        "workspace_id": workspace_id(workspace),
+        "lecture_id": workspace_id(workspace),
+        "slides_path": values["pptx"],
+        "voice_path": durations["voice_path"],
+        "video_path": video["video_path"],
+        "video_local_path": video["video_local_path"],
+        "slide_images": values["uploads"],
+        "quiz": values["quiz"],
+        "timings": timings
+    }
+    if METRICS_RESPONSE_TIMINGS:
+        result["timing_breakdown"] = metrics_utils.breakdown(metrics_utils.diff(before, metrics_utils.snapshot()))
+    print(f"Returning result: {result}")
+    return result
 
 def generate_assets():
+    """Run the pipeline inside the current request and return the result."""
     try:
         print("Received request to generate assets")
-        
-        # Check if request has JSON data
-        if not request.is_json:
-            print("Request is not JSON")
-            return jsonify({"error": "Request must be JSON"}), 400
-            
-        data = request.get_json()
-        print(f"Request data: {data}")
-        
-        if data is None:
-            print("Invalid JSON data")
-            return jsonify({"error": "Invalid JSON data"}), 400
-            
-        prompt = data.get("prompt")
-        theme = data.get("theme", "Minimalist")
-        print(f"Prompt: {prompt}, Theme: {theme}")
-
-        if not prompt:
-            print("Prompt is required")
-            return jsonify({"error": "Prompt is required"}), 400
-
-        # 1. Generate AI content
-        print("Generating AI content...")
-        ai_output_str = generate_lecture(prompt)
-        print(f"AI output string: {ai_output_str}")
-        
-        if not ai_output_str:
-            print("Failed to generate AI content")
-            return jsonify({"error": "Failed to generate AI content"}), 500
-            
-        # Clean the AI output string to ensure it's valid JSON
-        # Remove any markdown code block markers if present
-        ai_output_str = ai_output_str.strip()
-        if ai_output_str.startswith("```json"):
-            ai_output_str = ai_output_str[7:]
-        if ai_output_str.startswith("```"):
-            ai_output_str = ai_output_str[3:]
-        if ai_output_str.endswith("```"):
-            ai_output_str = ai_output_str[:-3]
-        ai_output_str = ai_output_str.strip()
-        
-        print(f"Cleaned AI output string: {ai_output_str}")
-        
-        ai_output = json.loads(ai_output_str)
-        print(f"Parsed AI output: {ai_output}")
-        
-        # Ensure required keys exist
-        if "slides" not in ai_output:
-            print("Missing 'slides' in AI output")
-            return jsonify({"error": "Missing 'slides' in AI output"}), 500
-            
-        if "quiz" not in ai_output:
-            print("Missing 'quiz' in AI output")
-            return jsonify({"error": "Missing 'quiz' in AI output"}), 500
-            
-        slides = ai_output["slides"]
-        quiz = ai_output["quiz"]
-
-        # 2. Generate slides
-        print("Generating slides...")
-        slides_path = generate_slides(slides, theme)
-        print(f"Slides path: {slides_path}")
-
-        # 3. Generate voiceover for each slide
-        print("Generating voiceovers...")
-        voice_paths = []
-        durations = []
-        for i, s in enumerate(slides):
-            slide_script = s["script"]
-            voice_path = f"output/voiceover_{i}.mp3"
-            generate_voiceover(slide_script, voice_path)
-            voice_paths.append(voice_path)
-            # Get duration of each voiceover
-            duration = get_media_duration(voice_path)
-            durations.append(duration if duration else 25)
-
-        # Combine voiceovers into a single file
-        full_voice_path = "output/voiceover.mp3"
-        combine_audio(voice_paths, full_voice_path)
-        print(f"Combined voice path: {full_voice_path}")
 
-        # 4. Convert slides to images for video creation
-        print("Converting slides to images...")
-        slide_images_result = convert_pptx_to_images(slides_path)
-        slide_images_local = slide_images_result["local_paths"]
-        slide_images_cloud = slide_images_result["cloud_urls"]
-        print(f"Slide images (local): {slide_images_local}")
-        print(f"Slide images (cloud): {slide_images_cloud}")
-
-        # 5. Generate video with custom durations
-        print("Creating video with custom durations...")
-        video_result = create_video(slide_images_local, full_voice_path, durations=durations)
-        
-        if isinstance(video_result, dict):
-            video_path = video_result["cloud_url"]
-            video_local_path = video_result["local_path"]
-        else:
-            video_path = video_result
-            video_local_path = video_result
-        print(f"Video path: {video_path}")
-
-        # 6. Generate quiz
-        print("Generating quiz...")
-        quiz_data = generate_quiz(quiz)
-        print(f"Quiz data: {quiz_data}")
-
-        # 7. Return final result
-        result = {
-            "slides_path": slides_path,
-            "voice_path": full_voice_path,
-            "video_path": video_path,
-            "video_local_path": video_local_path if 'video_local_path' in locals() else video_path,
-            "slide_images": slide_images_cloud,
-            "quiz": quiz_data
-        }
-        print(f"Returning result: {result}")
-        return jsonify(result)
-    except json.JSONDecodeError as e:
-        print(f"JSON decode error: {e}")
-        return jsonify({"error": f"Invalid JSON from AI service: {str(e)}"}), 500
+        prompt, theme, slide_images, error = _parse_generate_request()
+        if error:
+            return error
+
+        return jsonify(run_pipeline(prompt, theme, slide_images=slide_images))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 500
     except Exception as e:
         print(f"Error in generate_assets: {e}")
         import traceback
         traceback.print_exc()
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
+
+def submit_generate_job():
+    """
+    Queue a generation job and return its ID immediately.
+    Falls back to the synchronous pipeline when JOB_WORKERS is 0.
+    """
+    if JOB_WORKERS <= 0:
+        return generate_assets()
+
+    print("Received request to queue generation job")
+    prompt, theme, slide_images, error = _parse_generate_request()
+    if error:
+        return error
+
+    try:
+        job_id = get_job_manager().submit(prompt, theme, slide_images=slide_images)
+    except QueueFullError as e:
+        response = jsonify({"error": str(e)})
+        response.headers["Retry-After"] = "30"
+        return response, 429
+
+    print(f"Queued job {job_id}")
+    return jsonify({"job_id": job_id, "status": "queued", "status_url": f"/jobs/{job_id}"}), 202
+
+def get_job_status(job_id):
+    """Return the progress and, once finished, the result of a job."""
+    job = get_job_manager().get(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job)
+
+def _format_sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def stream_generation():
+    """
+    Run the pipeline and stream its progress as Server-Sent Events.
+
+    Query parameters: prompt (required), theme and slide_images ("false"
+    to skip slide images). Emits "stage" events for
+    stage transitions, one event per partial result (lecture, quiz, pptx,
+    voice_clip, slide_image, video) and finally "result" or "error".
+    """
+    prompt = request.args.get("prompt")
+    theme = request.args.get("theme", "Minimalist")
+    slide_images = request.args.get("slide_images", "true").lower() != "false"
+    if not prompt:
+        return jsonify({"error": "Prompt is required"}), 400
+
+    events = queue.Queue()
+    job_id = None
+    if JOB_WORKERS > 0:
+        try:
+            job_id = get_job_manager().submit(prompt, theme, listener=events, slide_images=slide_images)
+        except QueueFullError as e:
+            response = jsonify({"error": str(e)})
+            response.headers["Retry-After"] = "30"
+            return response, 429
+    else:
+        def worker():
+            try:
+                result = run_pipeline(prompt, theme, slide_images=slide_images,
+                                      progress=lambda stage, status, data=None: events.put((stage, status, data)))
+                events.put(("result", "done", result))
+            except Exception as e:
+                events.put(("error", "failed", {"error": str(e)}))
+            events.put(None)
+        threading.Thread(target=worker, daemon=True).start()
+
+    def generate():
+        try:
+            if job_id:
+                yield _format_sse("job", {"job_id": job_id, "status": "queued"})
+            while True:
+                try:
+                    item = events.get(timeout=15)
+                except queue.Empty:
+                    # Comment line keeps proxies from closing an idle stream
+                    yield ": keep-alive\n\n"
+                    continue
+                if item is None:
+                    break
+                event, status, data = item
+                if status == "data" or event in ("result", "error"):
+                    yield _format_sse(event, data)
+                else:
+                    yield _format_sse("stage", {"stage": event, "status": status})
+        finally:
+            if job_id:
+                get_job_manager().unsubscribe(job_id, events)
+
+    return Response(stream_with_context(generate()), mimetype="text/event-stream",
+                    headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
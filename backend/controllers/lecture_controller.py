@@ -0,0 +1,33 @@
+from flask import request, jsonify
+from services.lecture_service import update_slide, LectureNotFoundError, EDITABLE_FIELDS
+
+def update_lecture_slide(lecture_id, number):
+    """
+    Edit one slide of a generated lecture and re-render only the dirty parts.
+    Expects a JSON body with any of "title", "content" and "script".
+    """
+    try:
+        data = request.get_json(silent=True)
+        if not isinstance(data, dict):
+            return jsonify({"error": "Request must be JSON"}), 400
+
+        changes = {field: data[field] for field in EDITABLE_FIELDS if field in data}
+        if not changes:
+            return jsonify({"error": f"Nothing to update, expected one of {list(EDITABLE_FIELDS)}"}), 400
+        if "content" in changes and not isinstance(changes["content"], list):
+            return jsonify({"error": "'content' must be a list of bullet points"}), 400
+        for field in ("title", "script"):
+            if field in changes and not isinstance(changes[field], str):
+                return jsonify({"error": f"'{field}' must be a string"}), 400
+
+        print(f"Updating slide {number} of lecture {lecture_id}: {changes}")
+        return jsonify(update_slide(lecture_id, number, changes))
+    except LectureNotFoundError as e:
+        return jsonify({"error": str(e)}), 404
+    except IndexError as e:
+        return jsonify({"error": str(e)}), 400
+    except Exception as e:
+        print(f"Error in update_lecture_slide: {e}")
+        import traceback
+        traceback.print_exc()
+        return jsonify({"error": str(e)}), 500
@@ -0,0 +1,6 @@
+from flask import Response
+from utils.metrics_utils import render
+
+def get_metrics():
+    """Expose every recorded metric in the Prometheus text format."""
+    return Response(render(), mimetype="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,37 @@
+import os
+from flask import Response, jsonify, send_file
+from config.config import STORAGE_ACCEL_REDIRECT
+from services.storage_service import get_storage, CONTENT_TYPES
+
+# Stored names are content hashes, so a stored file never changes
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+def serve_stored_file(name):
+    """
+    Serve an artifact of the local storage backend.
+
+    With STORAGE_ACCEL_REDIRECT set the body is left to nginx; otherwise the
+    file is sent by Werkzeug, which answers Range and If-None-Match requests
+    and hands the file to the server's sendfile via wsgi.file_wrapper.
+    """
+    path = get_storage().local_path(name)
+    if path is None:
+        return jsonify({"error": "File not found"}), 404
+
+    # The name is the content hash, which makes a strong ETag
+    etag = os.path.splitext(name)[0]
+    mimetype = CONTENT_TYPES.get(os.path.splitext(name)[1].lower(), "application/octet-stream")
+
+    if STORAGE_ACCEL_REDIRECT:
+        response = Response(mimetype=mimetype)
+        response.headers["X-Accel-Redirect"] = STORAGE_ACCEL_REDIRECT.rstrip("/") + "/" + name
+        response.set_etag(etag)
+        response.cache_control.public = True
+        response.cache_control.max_age = IMMUTABLE_MAX_AGE
+        response.cache_control.immutable = True
+        return response
+
+    response = send_file(path, mimetype=mimetype, etag=etag, conditional=True, max_age=IMMUTABLE_MAX_AGE)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
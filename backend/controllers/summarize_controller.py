@@ -0,0 +1,32 @@
+from flask import request, jsonify, Response, stream_with_context
+from services.summarizer_service import get_summarizer, CircuitOpenError, SummarizerError
+import requests
+
+def summarize_notes():
+    """
+    Proxy notes to the external summarizer: a PDF upload in the "file"
+    field, or JSON {"notes_text": "..."}. Repeated files and texts are
+    answered from the summary cache.
+    """
+    summarizer = get_summarizer()
+    try:
+        if 'file' in request.files:
+            upload = request.files['file']
+            body, content_type, cached = summarizer.summarize_file(upload.stream, upload.filename, upload.mimetype)
+        elif request.is_json:
+            data = request.get_json(silent=True) or {}
+            notes_text = data.get('notes_text')
+            if not isinstance(notes_text, str) or not notes_text.strip():
+                return jsonify({"error": "'notes_text' must be a non-empty string"}), 400
+            body, content_type, cached = summarizer.summarize_text(notes_text)
+        else:
+            return jsonify({"error": "Invalid request"}), 400
+    except CircuitOpenError as e:
+        return jsonify({"error": str(e)}), 503, {"Retry-After": str(round(e.retry_after))}
+    except (requests.exceptions.RequestException, SummarizerError) as e:
+        return jsonify({"error": f"Error contacting summarizer service: {e}"}), 500
+
+    headers = {"X-Cache": "HIT" if cached else "MISS"}
+    if cached:
+        return Response(body, content_type=content_type, headers=headers)
+    return Response(stream_with_context(body), content_type=content_type, headers=headers)
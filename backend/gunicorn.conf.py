@@ -0,0 +1,21 @@
+# gunicorn -c gunicorn.conf.py app:app
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:5000")
+# One worker process: jobs, batches and their event subscribers live in the
+# memory of the process that accepted them (JobManager, BatchManager), so a
+# poll or stream served by another worker would get a 404, and the job queue
+# bound behind the 429 would apply per worker. Concurrency comes from threads;
+# the heavy work already runs in the job and render process pools and in
+# ffmpeg and TTS subprocesses.
+workers = int(os.getenv("GUNICORN_WORKERS", "1"))
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+# Streaming endpoints keep requests open for minutes
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "600"))
+
+# Import the app once in the master before forking. With WARMUP=blocking the
+# warm-up runs there too, so fonts, templates and libraries are loaded once
+# and shared copy-on-write by every worker.
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true"
+if preload_app:
+    os.environ.setdefault("WARMUP", "blocking")
@@ -0,0 +1,87 @@
+from models.quiz_model import Quiz
+from models.slide_model import Slide
+from utils.json_utils import loads_lenient
+
+# Bump when the compact layout changes; older payloads are re-validated
+COMPACT_VERSION = 1
+
+
+class Lecture:
+    """
+    Validated slides and quiz of one lecture.
+
+    Built once from the LLM reply by parse() and handed between pipeline
+    stages as is. to_compact()/from_compact() store it in the lecture cache
+    as positional lists, which load without validating again.
+    """
+
+    __slots__ = ("slides", "quiz")
+
+    def __init__(self, slides, quiz):
+        self.slides = slides
+        self.quiz = quiz
+
+    @classmethod
+    def parse(cls, text):
+        """
+        Decode and validate an LLM reply. Markdown fences and surrounding
+        prose are ignored, a truncated reply is cut back to its last
+        complete element, and invalid slides and quiz questions are dropped.
+
+        Raises:
+            ValueError: If no usable slide remains
+        """
+        try:
+            data = loads_lenient(text)
+        except ValueError as e:
+            raise ValueError(f"Invalid JSON from AI service: {e}")
+        return cls.from_dict(data)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Validate decoded lecture JSON; see parse()."""
+        if not isinstance(data, dict) or not isinstance(data.get("slides"), list):
+            raise ValueError("Missing 'slides' in AI output")
+        slides = _valid(Slide, data["slides"], "slide")
+        if not slides:
+            raise ValueError("No valid slides in AI output")
+        quiz = data.get("quiz")
+        if not isinstance(quiz, list):
+            print("Missing 'quiz' in AI output, continuing without one")
+            quiz = []
+        return cls(slides, _valid(Quiz, quiz, "quiz question"))
+
+    def slide_dicts(self):
+        return [slide.to_dict() for slide in self.slides]
+
+    def quiz_dicts(self):
+        return [question.to_dict() for question in self.quiz]
+
+    def to_compact(self):
+        """Return the lecture as JSON-serialisable positional lists."""
+        return [
+            COMPACT_VERSION,
+            [[slide.title, slide.content, slide.script] for slide in self.slides],
+            [[question.question, question.options, question.answer] for question in self.quiz]
+        ]
+
+    @classmethod
+    def from_compact(cls, value):
+        """
+        Rebuild a lecture stored by to_compact(). Entries in another layout
+        (including the {"slides", "quiz"} dicts cached by earlier versions)
+        are validated like fresh LLM output.
+        """
+        if isinstance(value, list) and value and value[0] == COMPACT_VERSION:
+            return cls([Slide(*slide) for slide in value[1]], [Quiz(*question) for question in value[2]])
+        return cls.from_dict(value)
+
+
+def _valid(model, items, label):
+    valid = []
+    for item in items:
+        try:
+            valid.append(model.from_dict(item))
+        except ValueError as e:
+            print(f"Skipping invalid {label}: {e}")
+    return valid
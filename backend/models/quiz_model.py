@@ -1,5 +1,89 @@
+import re
+
+# "B", "b)", "(C)", "D.", "Option A"
+LETTER_ANSWER = re.compile(r"^(?:option\s*)?\(?([a-z])\)?[.:]?$")
+# "B) Chloroplasts", "c. Nucleus"
+LETTERED_OPTION = re.compile(r"^\(?([a-z])[).:]\s*(.+)$")
+
+
+def _normalize(text):
+    return " ".join(str(text).lower().split()).rstrip(".")
+
+
 class Quiz:
+    """A multiple-choice question; `answer` is the index of the correct option."""
+
+    __slots__ = ("question", "options", "answer")
+
     def __init__(self, question, options, answer):
         self.question = question
         self.options = options
         self.answer = answer
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Validate one quiz question of LLM output, resolving its answer to an
+        option index (see resolve_answer).
+
+        Raises:
+            ValueError: If the question is malformed or the answer matches no option
+        """
+        if not isinstance(data, dict):
+            raise ValueError(f"Quiz question must be an object, got {type(data).__name__}")
+        question = data.get("question")
+        options = data.get("options")
+        if not isinstance(question, str) or not question.strip():
+            raise ValueError(f"Quiz question without text: {data}")
+        if not isinstance(options, list) or len(options) < 2:
+            raise ValueError(f"Quiz question needs at least two options: {question!r}")
+        options = [str(option) for option in options]
+        answer = data["answer"] if "answer" in data else data.get("correct")
+        if answer is None:
+            raise ValueError(f"Quiz question without an answer: {question!r}")
+        return cls(question, options, resolve_answer(answer, options))
+
+    def to_dict(self):
+        """The quiz entry returned to clients."""
+        return {"question": self.question, "options": self.options, "correct": self.answer}
+
+
+def resolve_answer(answer, options):
+    """
+    Return the index of the option an answer refers to. Tried in order: a
+    0-based index, the exact option text, the option text ignoring case,
+    spacing and a trailing period (also with "A) "-style prefixes removed
+    from either side), and a bare option letter.
+
+    Raises:
+        ValueError: If the answer matches no option
+    """
+    if isinstance(answer, int) and not isinstance(answer, bool):
+        if 0 <= answer < len(options):
+            return answer
+        raise ValueError(f"Answer index {answer} out of range")
+    if not isinstance(answer, str):
+        raise ValueError(f"Unusable answer: {answer!r}")
+
+    for i, option in enumerate(options):
+        if option == answer:
+            return i
+
+    lookup = {}
+    for i, option in enumerate(options):
+        normalized = _normalize(option)
+        lookup.setdefault(normalized, i)
+        lettered = LETTERED_OPTION.match(normalized)
+        if lettered:
+            lookup.setdefault(lettered.group(2), i)
+
+    normalized = _normalize(answer)
+    if normalized in lookup:
+        return lookup[normalized]
+    lettered = LETTERED_OPTION.match(normalized)
+    if lettered and lettered.group(2) in lookup:
+        return lookup[lettered.group(2)]
+    letter = LETTER_ANSWER.match(normalized)
+    if letter and ord(letter.group(1)) - ord("a") < len(options):
+        return ord(letter.group(1)) - ord("a")
+    raise ValueError(f"Answer {answer!r} matches none of the options")
@@ -1,5 +1,32 @@
 class Slide:
+    __slots__ = ("title", "content", "script")
+
     def __init__(self, title, content, script):
         self.title = title
         self.content = content
         self.script = script
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Validate one slide of LLM output. A single bullet given as a string
+        is wrapped in a list and a missing title becomes "".
+
+        Raises:
+            ValueError: If the slide has no script or malformed content
+        """
+        if not isinstance(data, dict):
+            raise ValueError(f"Slide must be an object, got {type(data).__name__}")
+        title = data.get("title") or ""
+        content = data.get("content", [])
+        script = data.get("script")
+        if isinstance(content, str):
+            content = [content]
+        if not isinstance(title, str) or not isinstance(content, list):
+            raise ValueError(f"Malformed slide: {data}")
+        if not isinstance(script, str) or not script.strip():
+            raise ValueError(f"Slide without a script: {title!r}")
+        return cls(title, [str(point) for point in content], script)
+
+    def to_dict(self):
+        return {"title": self.title, "content": self.content, "script": self.script}
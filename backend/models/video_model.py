@@ -1,4 +1,6 @@
 class Video:
+    __slots__ = ("audio_path", "slides_path", "output_path")
+
     def __init__(self, audio_path, slides_path, output_path):
         self.audio_path = audio_path
         self.slides_path = slides_path
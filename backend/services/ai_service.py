@@ -1,38 +1,14 @@
-import openai
-from config.config import OPENAI_API_KEY
+import threading
+from config.config import (OPENAI_API_KEY, LECTURE_CACHE_ENABLED, LECTURE_CACHE_DIR, LECTURE_CACHE_TTL,
+                           LECTURE_CACHE_MAX_ENTRIES, LECTURE_CACHE_SIMILARITY)
+from utils.cache_utils import LectureCache
+from utils.metrics_utils import timed
 
-# Initialize the OpenAI client
-try:
-    client = openai.OpenAI(api_key=OPENAI_API_KEY)
-    openai_available = True
-except Exception as e:
-    print(f"OpenAI not configured: {e}")
-    openai_available = False
+MODEL = "gpt-4o-mini"
+TEMPERATURE = 0.8
 
-def generate_lecture(prompt):
-    """Generates structured lecture JSON from prompt."""
-    if not openai_available:
-        # Return properly formatted mock data for testing
-        return '''{
-    "slides": [
-        {
-            "title": "Introduction to Photosynthesis",
-            "content": ["Photosynthesis converts light energy to chemical energy", "It occurs in chloroplasts of plant cells", "It produces glucose and oxygen"],
-            "script": "Photosynthesis is the process by which plants convert light energy into chemical energy. This process occurs in the chloroplasts of plant cells and produces glucose and oxygen."
-        }
-    ],
-    "quiz": [
-        {
-            "question": "Where does photosynthesis occur?",
-            "options": ["Mitochondria", "Chloroplasts", "Nucleus", "Cell membrane"],
-            "answer": "Chloroplasts"
-        }
-    ]
-}'''
-    
-    try:
-        system_prompt = """
-You are an educational content generator. 
+SYSTEM_PROMPT = """
+You are an educational content generator.
 Given a topic, target audience, and duration, produce:
 1. A structured slide outline with detailed content (title, comprehensive bullet points with explanations, detailed narration script). The narration script for each slide should be long enough to be read in approximately 25 seconds at a normal speaking pace.
 2. 3 multiple-choice quiz questions with explanations.
@@ -55,20 +31,8 @@ Format output in valid JSON with detailed content.
 }
 """
 
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.8
-        )
-
-        return response.choices[0].message.content
-    except Exception as e:
-        print(f"Error generating lecture: {e}")
-        # Return mock data as fallback
-        return '''{
+# Returned when OpenAI is unavailable, properly formatted for testing
+MOCK_LECTURE = '''{
     "slides": [
         {
             "title": "Introduction to Photosynthesis",
@@ -83,4 +47,103 @@ Format output in valid JSON with detailed content.
             "answer": "Chloroplasts"
         }
     ]
-}'''
\ No newline at end of file
+}'''
+
+_client = None
+_client_state = None
+_client_lock = threading.Lock()
+
+def get_client():
+    """Build the OpenAI client on first use; returns None when OpenAI is not configured."""
+    global _client, _client_state
+    with _client_lock:
+        if _client_state is None:
+            try:
+                import openai
+                _client = openai.OpenAI(api_key=OPENAI_API_KEY)
+                _client_state = "ready"
+            except Exception as e:
+                print(f"OpenAI not configured: {e}")
+                _client_state = "unavailable"
+        return _client
+
+def openai_available():
+    return get_client() is not None
+
+_lecture_cache = None
+_lecture_cache_lock = threading.Lock()
+
+def get_lecture_cache():
+    """Return the process-wide lecture cache, or None when disabled."""
+    global _lecture_cache
+    if not LECTURE_CACHE_ENABLED:
+        return None
+    with _lecture_cache_lock:
+        if _lecture_cache is None:
+            _lecture_cache = LectureCache(
+                LECTURE_CACHE_DIR, SYSTEM_PROMPT, MODEL, TEMPERATURE,
+                ttl=LECTURE_CACHE_TTL,
+                max_entries=LECTURE_CACHE_MAX_ENTRIES,
+                similarity=LECTURE_CACHE_SIMILARITY
+            )
+        return _lecture_cache
+
+def _messages(prompt):
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+@timed("generate_lecture")
+def generate_lecture(prompt):
+    """Generates structured lecture JSON from prompt."""
+    if not openai_available():
+        return MOCK_LECTURE
+
+    try:
+        response = get_client().chat.completions.create(
+            model=MODEL,
+            messages=_messages(prompt),
+            temperature=TEMPERATURE
+        )
+
+        return response.choices[0].message.content
+    except Exception as e:
+        print(f"Error generating lecture: {e}")
+        # Return mock data as fallback
+        return MOCK_LECTURE
+
+def generate_lecture_stream(prompt, chunk_size=64):
+    """
+    Generates structured lecture JSON from prompt, yielding text chunks as
+    the model produces them.
+
+    Falls back to the mock lecture when OpenAI is unavailable or the request
+    fails before any text was received; a failure mid-stream is re-raised.
+    """
+    if not openai_available():
+        for start in range(0, len(MOCK_LECTURE), chunk_size):
+            yield MOCK_LECTURE[start:start + chunk_size]
+        return
+
+    received = False
+    try:
+        stream = get_client().chat.completions.create(
+            model=MODEL,
+            messages=_messages(prompt),
+            temperature=TEMPERATURE,
+            stream=True
+        )
+        for chunk in stream:
+            if not chunk.choices:
+                continue
+            text = chunk.choices[0].delta.content
+            if text:
+                received = True
+                yield text
+    except Exception as e:
+        if received:
+            raise
+        print(f"Error streaming lecture: {e}")
+        # Return mock data as fallback
+        yield MOCK_LECTURE
@@ -0,0 +1,214 @@
+import math
+import os
+import subprocess
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+from config.config import (VIDEO_FPS, AUDIO_SAMPLE_RATE, AUDIO_SLIDE_PADDING, AUDIO_NORMALIZE,
+                           AUDIO_TARGET_DBFS, AUDIO_PEAK_DBFS)
+from utils import metrics_utils
+from utils.audio_utils import read_wav
+from utils.metrics_utils import timed
+
+# Clips decoded by one ffmpeg process, each through its own pipe
+DECODE_BATCH = 32
+# Seconds of silence for a slide whose clip could not be decoded
+DEFAULT_DURATION = 25
+
+
+class AudioTrack:
+    """
+    Narration of a whole lecture as mono 16-bit PCM in memory.
+
+    Slide i is heard from sample boundaries[i] to boundaries[i + 1]; every
+    boundary falls on a video frame, so slide changes stay in sync with
+    the audio however long the deck is.
+    """
+
+    __slots__ = ("samples", "rate", "boundaries")
+
+    def __init__(self, samples, rate, boundaries):
+        self.samples = samples
+        self.rate = rate
+        self.boundaries = boundaries
+
+    def __len__(self):
+        return len(self.boundaries) - 1
+
+    @property
+    def durations(self):
+        """Length of every slide in seconds."""
+        return [(end - start) / self.rate for start, end in zip(self.boundaries, self.boundaries[1:])]
+
+    def input_args(self, pipe="pipe:0"):
+        """ffmpeg options reading this track as raw PCM from `pipe`."""
+        return ["-f", "s16le", "-ar", str(self.rate), "-ac", "1", "-i", pipe]
+
+    def buffer(self):
+        """The samples as a byte view, written to the encoder without a copy."""
+        return memoryview(self.samples).cast("B")
+
+
+def _decode_with_ffmpeg(paths, rate):
+    """
+    Decode audio files to float32 mono PCM with one ffmpeg process.
+
+    Every file gets its own output, written to a pipe inherited by ffmpeg
+    and drained by a reader thread, so no decoded audio touches the disk.
+    """
+    import numpy as np
+
+    cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error", "-nostdin"]
+    for path in paths:
+        cmd += ["-i", path]
+    pipes = [os.pipe() for _ in paths]
+    for i, (_, write_fd) in enumerate(pipes):
+        cmd += ["-map", f"{i}:a:0", "-f", "s16le", "-ac", "1", "-ar", str(rate), f"pipe:{write_fd}"]
+
+    metrics_utils.SUBPROCESSES.inc(command="ffmpeg")
+    try:
+        process = subprocess.Popen(cmd, pass_fds=[write_fd for _, write_fd in pipes],
+                                   stdin=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    except BaseException:
+        for read_fd, write_fd in pipes:
+            os.close(read_fd)
+            os.close(write_fd)
+        raise
+    # Only ffmpeg writes now, so each reader sees EOF when ffmpeg is done with its output
+    for _, write_fd in pipes:
+        os.close(write_fd)
+
+    def drain(read_fd):
+        with open(read_fd, "rb") as f:
+            return f.read()
+
+    with ThreadPoolExecutor(max_workers=len(pipes)) as executor:
+        outputs = list(executor.map(drain, [read_fd for read_fd, _ in pipes]))
+    _, stderr = process.communicate()
+    if process.returncode != 0:
+        raise RuntimeError(f"ffmpeg could not decode the voiceovers: {stderr.decode(errors='replace')[:500]}")
+    return [np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768 for data in outputs]
+
+
+def _resample(samples, rate, target_rate):
+    import numpy as np
+
+    if rate == target_rate or not len(samples):
+        return samples
+    count = int(round(len(samples) * target_rate / rate))
+    positions = np.arange(count, dtype=np.float64) * (rate / target_rate)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+
+@timed("decode_clips")
+def decode_clips(paths, rate=AUDIO_SAMPLE_RATE):
+    """
+    Decode voiceover clips to float32 mono NumPy arrays.
+
+    WAV clips are read in-process; the rest (gTTS MP3s) are decoded by
+    ffmpeg, DECODE_BATCH clips per process. If every clip is a WAV of the
+    same rate, that rate is kept instead of `rate`.
+
+    Returns:
+        tuple: (clips, rate) where a clip is None if it could not be decoded
+    """
+    clips = [None] * len(paths)
+    native = {}
+    for i, path in enumerate(paths):
+        if path and os.path.splitext(path)[1].lower() == ".wav" and os.path.exists(path):
+            try:
+                native[i] = read_wav(path)
+            except (wave.Error, EOFError) as e:
+                print(f"Could not read {path} natively ({e}), decoding with ffmpeg")
+
+    rates = {clip_rate for _, clip_rate in native.values()}
+    if len(native) == len(paths) and len(rates) == 1:
+        rate = rates.pop()
+    for i, (samples, clip_rate) in native.items():
+        clips[i] = _resample(samples, clip_rate, rate)
+
+    pending = [i for i, path in enumerate(paths) if i not in native and path and os.path.exists(path)]
+    for start in range(0, len(pending), DECODE_BATCH):
+        batch = pending[start:start + DECODE_BATCH]
+        try:
+            for i, samples in zip(batch, _decode_with_ffmpeg([paths[i] for i in batch], rate)):
+                clips[i] = samples
+        except (OSError, RuntimeError) as e:
+            print(f"Voiceover decode failed: {e}")
+    return clips, rate
+
+
+def normalize_loudness(samples, target_dbfs=AUDIO_TARGET_DBFS, peak_dbfs=AUDIO_PEAK_DBFS):
+    """
+    Scale a clip to an RMS level of target_dbfs, lowering the gain as far as
+    needed to keep its peak at or below peak_dbfs. Silent clips are unchanged.
+    """
+    import numpy as np
+
+    if not len(samples):
+        return samples
+    rms = float(np.sqrt(np.mean(np.square(samples, dtype=np.float64))))
+    peak = float(np.max(np.abs(samples)))
+    if rms <= 1e-6:
+        return samples
+    gain = min(10 ** (target_dbfs / 20) / rms, 10 ** (peak_dbfs / 20) / peak)
+    return samples * np.float32(gain)
+
+
+def frame_boundaries(lengths, rate, fps=VIDEO_FPS):
+    """
+    Sample offsets at which each slide starts, plus the end of the track.
+
+    Each slide lasts the fewest whole video frames that hold its `length`
+    samples, and every boundary is the sample nearest to a frame start, so
+    rounding never accumulates along the deck.
+    """
+    boundaries = [0]
+    frames = 0
+    for length in lengths:
+        end = boundaries[-1] + length
+        frames = max(frames + 1, math.ceil(end * fps / rate))
+        boundary = round(frames * rate / fps)
+        if boundary < end:
+            frames += 1
+            boundary = round(frames * rate / fps)
+        boundaries.append(boundary)
+    return boundaries
+
+
+@timed("assemble_audio")
+def assemble_audio(clip_paths, rate=AUDIO_SAMPLE_RATE, fps=VIDEO_FPS, padding=AUDIO_SLIDE_PADDING,
+                   normalize=AUDIO_NORMALIZE):
+    """
+    Lay the voiceover clips of a deck out as one PCM track.
+
+    Replaces combine_audio(): clips are decoded rather than stream-copied,
+    so slide lengths are counted in samples (MP3 frame padding included)
+    instead of trusting header durations.
+
+    Args:
+        clip_paths (list): Voiceover clip of each slide, in slide order
+        rate (int): Sample rate of the track (see decode_clips)
+        fps (int): Video frame rate the slide boundaries are aligned to
+        padding (float): Seconds of silence after every clip
+        normalize (bool): Whether to normalize the loudness of every clip
+
+    Returns:
+        AudioTrack: The narration and its per-slide boundaries
+    """
+    import numpy as np
+
+    clips, rate = decode_clips(clip_paths, rate)
+    pad = int(round(padding * rate))
+    lengths = [len(clip) + pad if clip is not None else DEFAULT_DURATION * rate for clip in clips]
+    boundaries = frame_boundaries(lengths, rate, fps)
+
+    # Clips are converted straight into the preallocated track (zeros are silence)
+    samples = np.zeros(boundaries[-1], dtype="<i2")
+    for clip, start in zip(clips, boundaries):
+        if clip is None or not len(clip):
+            continue
+        if normalize:
+            clip = normalize_loudness(clip)
+        samples[start:start + len(clip)] = np.clip(clip * 32767, -32768, 32767)
+    return AudioTrack(samples, rate, boundaries)
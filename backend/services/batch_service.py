@@ -0,0 +1,236 @@
+import queue
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from config.config import JOB_WORKERS, JOB_RESULT_TTL, BATCH_LLM_CONCURRENCY, BATCH_MAX_QUEUED
+from services.job_service import get_job_manager, QueueFullError
+from utils.cache_utils import normalize_prompt
+
+FINISHED = ("done", "failed")
+
+
+class BatchManager:
+    """
+    Runs many prompts as one batch on the shared job queue.
+
+    Identical prompts (after normalisation) are generated once. Lectures are
+    requested from the LLM concurrently ahead of the media stages and handed
+    to the jobs in compact form (and stored in the lecture cache). Jobs are fed to the
+    worker pool as slots free up, never occupying more than `max_queued`
+    queue slots, so a large batch keeps every worker busy without starving
+    interactive /generate requests.
+    """
+
+    def __init__(self, llm_concurrency=BATCH_LLM_CONCURRENCY, max_queued=BATCH_MAX_QUEUED,
+                 result_ttl=JOB_RESULT_TTL):
+        self.llm_concurrency = llm_concurrency
+        self.max_queued = max_queued
+        self.result_ttl = result_ttl
+        self._batches = {}
+        self._lock = threading.Lock()
+
+    def submit(self, prompts, theme):
+        """
+        Start a batch.
+
+        Returns:
+            dict: Summary with batch_id, total and unique prompt counts
+        """
+        items, unique = [], {}
+        for index, prompt in enumerate(prompts):
+            key = normalize_prompt(prompt)
+            item = {"index": index, "prompt": prompt}
+            if key in unique:
+                item["duplicate_of"] = unique[key]
+            else:
+                unique[key] = index
+                item.update(status="pending", job_id=None, result=None, error=None)
+            items.append(item)
+
+        batch_id = uuid.uuid4().hex
+        batch = {
+            "id": batch_id,
+            "theme": theme,
+            "created_at": time.time(),
+            "finished_at": None,
+            "items": items,
+            "listeners": []
+        }
+        with self._lock:
+            self._prune()
+            self._batches[batch_id] = batch
+        threading.Thread(target=self._dispatch, args=(batch,), daemon=True).start()
+        return {"batch_id": batch_id, "total": len(items), "unique": len(unique)}
+
+    def get(self, batch_id, offset=0, limit=None):
+        """
+        Return one page of the batch manifest, or None if the batch is unknown.
+        Duplicate prompts report the status and result of their original.
+        """
+        with self._lock:
+            batch = self._batches.get(batch_id)
+            if batch is None:
+                return None
+            items = batch["items"]
+            end = len(items) if limit is None else min(len(items), offset + limit)
+            page = [self._resolve(batch, item) for item in items[offset:end]]
+            counts = self._counts(batch)
+            return {
+                "batch_id": batch_id,
+                "status": "done" if batch["finished_at"] else "running",
+                "theme": batch["theme"],
+                "total": len(items),
+                **counts,
+                "offset": offset,
+                "items": page,
+                "next_offset": end if end < len(items) else None
+            }
+
+    def subscribe(self, batch_id):
+        """
+        Return a queue receiving ("item", entry) for every finished prompt,
+        including those finished before subscribing, then ("done", summary)
+        and None. Returns None if the batch is unknown.
+        """
+        listener = queue.Queue()
+        with self._lock:
+            batch = self._batches.get(batch_id)
+            if batch is None:
+                return None
+            for item in batch["items"]:
+                entry = self._resolve(batch, item)
+                if entry["status"] in FINISHED:
+                    listener.put(("item", entry))
+            if batch["finished_at"]:
+                listener.put(("done", self._summary(batch)))
+                listener.put(None)
+            else:
+                batch["listeners"].append(listener)
+        return listener
+
+    def unsubscribe(self, batch_id, listener):
+        with self._lock:
+            batch = self._batches.get(batch_id)
+            if batch and listener in batch["listeners"]:
+                batch["listeners"].remove(listener)
+
+    def _dispatch(self, batch):
+        from controllers.generate_controller import prefetch_lecture, run_pipeline
+
+        originals = [item for item in batch["items"] if "duplicate_of" not in item]
+        with ThreadPoolExecutor(max_workers=max(self.llm_concurrency, 1)) as llm:
+            prefetches = [llm.submit(prefetch_lecture, item["prompt"]) for item in originals]
+
+            for item, prefetch in zip(originals, prefetches):
+                lecture = None
+                try:
+                    # Submitting before the lecture exists would generate it twice
+                    lecture = prefetch.result()
+                except Exception as e:
+                    print(f"Lecture prefetch failed for {item['prompt']!r}: {e}")
+
+                if JOB_WORKERS <= 0:
+                    with self._lock:
+                        item["status"] = "running"
+                    try:
+                        self._finish_item(batch, item, {"status": "done", "error": None,
+                                                        "result": run_pipeline(item["prompt"], batch["theme"],
+                                                                               lecture=lecture)})
+                    except Exception as e:
+                        self._finish_item(batch, item, {"status": "failed", "error": str(e), "result": None})
+                    continue
+
+                self._submit_job(batch, item, lecture)
+
+    def _submit_job(self, batch, item, lecture=None):
+        manager = get_job_manager()
+        while True:
+            if manager.stats()["queued"] < self.max_queued:
+                try:
+                    job_id = manager.submit(
+                        item["prompt"], batch["theme"],
+                        on_finish=lambda job_id, job: self._finish_item(batch, item, job),
+                        lecture=lecture
+                    )
+                    break
+                except QueueFullError:
+                    pass
+            time.sleep(0.5)
+        with self._lock:
+            item["job_id"] = job_id
+            if item["status"] == "pending":
+                item["status"] = "queued"
+
+    def _finish_item(self, batch, item, job):
+        with self._lock:
+            item["status"] = job["status"] if job else "failed"
+            item["result"] = job["result"] if job else None
+            item["error"] = job["error"] if job else "Job expired"
+            entries = [self._resolve(batch, other) for other in batch["items"]
+                       if other is item or other.get("duplicate_of") == item["index"]]
+            done = all(other["status"] in FINISHED for other in batch["items"] if "duplicate_of" not in other)
+            if done:
+                batch["finished_at"] = time.time()
+            for listener in batch["listeners"]:
+                for entry in entries:
+                    listener.put(("item", entry))
+                if done:
+                    listener.put(("done", self._summary(batch)))
+                    listener.put(None)
+            if done:
+                batch["listeners"] = []
+
+    def _resolve(self, batch, item):
+        source = batch["items"][item["duplicate_of"]] if "duplicate_of" in item else item
+        status = source["status"]
+        if status == "queued":
+            # Queued on our side; the job manager knows whether it started
+            job = get_job_manager().get(source["job_id"])
+            status = job["status"] if job and job["status"] not in FINISHED else status
+        entry = {
+            "index": item["index"],
+            "prompt": item["prompt"],
+            "status": status,
+            "job_id": source["job_id"],
+            "result": source["result"],
+            "error": source["error"]
+        }
+        if "duplicate_of" in item:
+            entry["duplicate_of"] = item["duplicate_of"]
+        return entry
+
+    def _counts(self, batch):
+        originals = [item for item in batch["items"] if "duplicate_of" not in item]
+        return {
+            "unique": len(originals),
+            "completed": sum(1 for item in originals if item["status"] == "done"),
+            "failed": sum(1 for item in originals if item["status"] == "failed")
+        }
+
+    def _summary(self, batch):
+        return {"batch_id": batch["id"], "total": len(batch["items"]), **self._counts(batch),
+                "elapsed": round((batch["finished_at"] or time.time()) - batch["created_at"], 3)}
+
+    def _prune(self):
+        now = time.time()
+        expired = [
+            batch_id for batch_id, batch in self._batches.items()
+            if batch["finished_at"] is not None and now - batch["finished_at"] > self.result_ttl
+        ]
+        for batch_id in expired:
+            del self._batches[batch_id]
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_batch_manager():
+    """Return the process-wide BatchManager, creating it on first use."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = BatchManager()
+        return _manager
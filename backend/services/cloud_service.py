@@ -1,55 +1,57 @@
-import cloudinary
-import cloudinary.uploader
-import cloudinary.api
 import os
+from config.config import CLOUDINARY_CLOUD_NAME, CLOUDINARY_API_KEY, CLOUDINARY_API_SECRET
+from services.upload_service import get_upload_manager
+from utils.metrics_utils import timed
 
-# Configure Cloudinary with provided credentials
-cloudinary.config(
-    cloud_name="darxayoxh",
-    api_key="361159848575877",
-    api_secret="o8yxsgWi3M0-7eleAiScnvCUIvQ",
-    secure=True
-)
+_sdk_configured = False
 
+def _cloudinary():
+    """Import and configure the Cloudinary SDK on first use."""
+    global _sdk_configured
+    import cloudinary
+    import cloudinary.utils
+
+    if not _sdk_configured:
+        # Configure Cloudinary with provided credentials
+        cloudinary.config(
+            cloud_name=CLOUDINARY_CLOUD_NAME,
+            api_key=CLOUDINARY_API_KEY,
+            api_secret=CLOUDINARY_API_SECRET,
+            secure=True
+        )
+        _sdk_configured = True
+    return cloudinary
+
+@timed("upload_file")
 def upload_file(file_path, resource_type="auto", public_id=None):
     """
     Upload a file to Cloudinary
-    
+
     Args:
         file_path (str): Path to the file to upload
         resource_type (str): Type of resource (image, video, raw)
-        public_id (str, optional): Public ID for the uploaded file
-        
+        public_id (str, optional): Public ID for the uploaded file; defaults
+            to a hash of the file's bytes so identical files upload once
+
     Returns:
         dict: Upload result containing URL and other metadata, or None if failed
     """
-    try:
-        # Upload file to Cloudinary
-        result = cloudinary.uploader.upload(
-            file_path,
-            resource_type=resource_type,
-            public_id=public_id,
-            use_filename=True,
-            unique_filename=False
-        )
-        return result
-    except Exception as e:
-        print(f"Error uploading file to Cloudinary: {e}")
-        return None
+    # Uploads go through the pooled, retrying upload manager
+    return get_upload_manager().upload(file_path, resource_type=resource_type, public_id=public_id)
 
 def get_file_url(public_id, resource_type="auto"):
     """
     Get the URL of a file in Cloudinary
-    
+
     Args:
         public_id (str): Public ID of the file
         resource_type (str): Type of resource (image, video, raw)
-        
+
     Returns:
         str: URL of the file
     """
     try:
-        url = cloudinary.utils.cloudinary_url(public_id, resource_type=resource_type)[0]
+        url = _cloudinary().utils.cloudinary_url(public_id, resource_type=resource_type)[0]
         return url
     except Exception as e:
         print(f"Error getting file URL from Cloudinary: {e}")
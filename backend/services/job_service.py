@@ -0,0 +1,303 @@
+import multiprocessing
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from config.config import JOB_WORKERS, JOB_QUEUE_SIZE, JOB_RESULT_TTL, JOB_START_METHOD, WARMUP
+from utils import metrics_utils
+
+# Progress events queue shared with the worker processes (set by _init_worker)
+_events = None
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue has no free slot for a new job."""
+
+
+def _init_worker(events):
+    global _events
+    _events = events
+    # Spawned workers start from a fresh interpreter; load the pipeline before the first job
+    from services.warmup_service import start_warmup
+    start_warmup(mode="off" if WARMUP == "off" else "blocking")
+
+
+def _run_job(job_id, prompt, theme, lecture=None, slide_images=True):
+    """
+    Entry point executed inside a worker process.
+    Runs the generation pipeline and forwards stage progress to the parent.
+
+    The outcome is sent as the job's last event on the same queue as its
+    progress, so the parent has seen every progress event before it
+    finalizes the job.
+    """
+    from controllers.generate_controller import run_pipeline
+
+    def progress(stage, status, data=None):
+        _events.put((job_id, stage, status, time.time(), data))
+
+    before = metrics_utils.snapshot()
+    progress(None, "running")
+    try:
+        outcome = ("done", {"result": run_pipeline(prompt, theme, progress=progress, lecture=lecture,
+                                                   slide_images=slide_images)})
+    except Exception as e:
+        outcome = ("failed", {"error": str(e)})
+    # Ship what this job recorded so /metrics in the parent covers it
+    progress(None, "metrics", metrics_utils.diff(before, metrics_utils.snapshot()))
+    progress(None, *outcome)
+
+
+class JobManager:
+    """
+    Bounded job queue backed by a pool of worker processes.
+
+    At most `workers` jobs run at the same time and at most `max_queue`
+    more wait for a worker; further submissions raise QueueFullError so
+    the caller can apply backpressure.
+
+    If a worker process dies (killed for memory, crashed in native code)
+    the pool is unusable: the jobs it held fail and a new pool takes its
+    place for the next submissions.
+    """
+
+    def __init__(self, workers=JOB_WORKERS, max_queue=JOB_QUEUE_SIZE,
+                 result_ttl=JOB_RESULT_TTL, start_method=JOB_START_METHOD):
+        self.workers = workers
+        self.max_queue = max_queue
+        self.result_ttl = result_ttl
+        self._jobs = {}
+        self._subscribers = {}
+        self._finish_callbacks = {}
+        self._active = 0
+        self._lock = threading.Lock()
+
+        self._ctx = multiprocessing.get_context(start_method)
+        self._events = self._ctx.Queue()
+        self._executor = self._new_pool()
+        self._listener = threading.Thread(target=self._listen, daemon=True)
+        self._listener.start()
+
+    def submit(self, prompt, theme, listener=None, on_finish=None, lecture=None, slide_images=True):
+        """
+        Queue a generation job.
+
+        Args:
+            prompt (str): Lecture prompt
+            theme (str): Visual theme name
+            listener (queue.Queue, optional): Receives every progress event
+                of the job as (event, status, data), then None once it ends
+            on_finish (callable, optional): Called as on_finish(job_id, job)
+                with a snapshot of the job once it is done or failed
+            lecture (list, optional): Lecture generated ahead of time, as
+                Lecture.to_compact(); the job does not call the model
+            slide_images (bool): Whether the job renders and uploads slide
+                images (see run_pipeline)
+
+        Returns:
+            str: Job ID
+
+        Raises:
+            QueueFullError: If all workers are busy and the queue is full
+        """
+        with self._lock:
+            self._prune()
+            if self._active >= self.workers + self.max_queue:
+                raise QueueFullError("Job queue is full, try again later")
+            self._active += 1
+            job_id = uuid.uuid4().hex
+            self._jobs[job_id] = {
+                "id": job_id,
+                "status": "queued",
+                "prompt": prompt,
+                "theme": theme,
+                "created_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "stages": {},
+                "result": None,
+                "error": None
+            }
+            if listener is not None:
+                self._subscribers[job_id] = [listener]
+            if on_finish is not None:
+                self._finish_callbacks[job_id] = on_finish
+
+        executor = self._executor
+        try:
+            try:
+                future = executor.submit(_run_job, job_id, prompt, theme, lecture, slide_images)
+            except BrokenProcessPool:
+                # A worker died since the last job was finalized
+                self._replace_pool(executor)
+                executor = self._executor
+                future = executor.submit(_run_job, job_id, prompt, theme, lecture, slide_images)
+        except Exception:
+            with self._lock:
+                self._active -= 1
+                del self._jobs[job_id]
+                self._subscribers.pop(job_id, None)
+                self._finish_callbacks.pop(job_id, None)
+            raise
+        future.add_done_callback(lambda f: self._job_done(job_id, executor, f))
+        return job_id
+
+    def _new_pool(self):
+        return ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=self._ctx,
+            initializer=_init_worker,
+            initargs=(self._events,)
+        )
+
+    def _replace_pool(self, broken):
+        """Swap a broken worker pool for a new one, once per broken pool."""
+        with self._lock:
+            if self._executor is not broken:
+                return
+            self._executor = self._new_pool()
+        print("A job worker process died, started a new worker pool")
+        broken.shutdown(wait=False)
+
+    def _job_done(self, job_id, executor, future):
+        # _run_job reports its own outcome; a future that raised means the
+        # worker died (or the job could not be sent) before it could
+        error = future.exception()
+        if error is None:
+            return
+        self._finish(job_id, error=str(error))
+        if isinstance(error, BrokenProcessPool):
+            self._replace_pool(executor)
+
+    def get(self, job_id):
+        """Return a snapshot of the job state, or None if unknown."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            snapshot = dict(job)
+            snapshot["stages"] = {name: dict(info) for name, info in job["stages"].items()}
+            if job["status"] == "queued":
+                snapshot["position"] = sum(
+                    1 for j in self._jobs.values()
+                    if j["status"] == "queued" and j["created_at"] <= job["created_at"]
+                )
+            return snapshot
+
+    def unsubscribe(self, job_id, listener):
+        """Stop delivering events of a job to listener."""
+        with self._lock:
+            listeners = self._subscribers.get(job_id, [])
+            if listener in listeners:
+                listeners.remove(listener)
+
+    def _publish(self, job_id, event):
+        # Caller holds self._lock
+        for listener in self._subscribers.get(job_id, []):
+            listener.put(event)
+
+    def stats(self):
+        """Return queue depth and worker counts."""
+        with self._lock:
+            queued = sum(1 for j in self._jobs.values() if j["status"] == "queued")
+            running = sum(1 for j in self._jobs.values() if j["status"] == "running")
+        return {"workers": self.workers, "max_queue": self.max_queue,
+                "queued": queued, "running": running}
+
+    def shutdown(self, wait=True):
+        self._executor.shutdown(wait=wait)
+
+    def _listen(self):
+        while True:
+            try:
+                job_id, stage, status, ts, data = self._events.get()
+            except (EOFError, OSError):
+                return
+            if status == "metrics":
+                metrics_utils.merge(data)
+                continue
+            if stage is None and status in ("done", "failed"):
+                self._finish(job_id, **data)
+                continue
+            with self._lock:
+                job = self._jobs.get(job_id)
+                if job is None or job["status"] in ("done", "failed"):
+                    continue
+                self._publish(job_id, (stage or "job", status, data))
+                if status == "data":
+                    # Partial result, not a stage transition
+                    continue
+                if stage is None:
+                    job["status"] = status
+                    job["started_at"] = ts
+                    continue
+                info = job["stages"].setdefault(stage, {"status": None, "started_at": None, "finished_at": None})
+                info["status"] = status
+                if status == "running":
+                    info["started_at"] = ts
+                else:
+                    info["finished_at"] = ts
+                    if info["started_at"] is not None:
+                        info["elapsed"] = round(ts - info["started_at"], 3)
+
+    def _finish(self, job_id, result=None, error=None):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            # Finished already (by the worker's outcome event or the future)
+            if job is None or job["status"] in ("done", "failed"):
+                return
+            self._active -= 1
+            job["finished_at"] = time.time()
+            if error is None:
+                job["result"] = result
+                job["status"] = "done"
+                self._publish(job_id, ("result", "done", result))
+            else:
+                print(f"Job {job_id} failed: {error}")
+                job["error"] = error
+                job["status"] = "failed"
+                self._publish(job_id, ("error", "failed", {"error": error}))
+            self._publish(job_id, None)
+            self._subscribers.pop(job_id, None)
+            on_finish = self._finish_callbacks.pop(job_id, None)
+        if on_finish is not None:
+            on_finish(job_id, self.get(job_id))
+
+    def _prune(self):
+        now = time.time()
+        expired = [
+            job_id for job_id, job in self._jobs.items()
+            if job["finished_at"] is not None and now - job["finished_at"] > self.result_ttl
+        ]
+        for job_id in expired:
+            del self._jobs[job_id]
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_job_manager():
+    """Return the process-wide JobManager, creating it on first use."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = JobManager()
+        return _manager
+
+
+def _queue_metrics():
+    # Only report a manager that exists; a scrape must not start the worker pool
+    if _manager is None:
+        return []
+    stats = _manager.stats()
+    return [
+        ("jobs_queued", "Jobs waiting for a worker", {(): stats["queued"]}, ()),
+        ("jobs_running", "Jobs currently running", {(): stats["running"]}, ()),
+        ("job_workers", "Job worker processes", {(): stats["workers"]}, ()),
+    ]
+
+
+metrics_utils.register_collector(_queue_metrics)
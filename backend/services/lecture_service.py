@@ -0,0 +1,236 @@
+import fcntl
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+from services.audio_service import assemble_audio
+from services.slide_service import generate_slides
+from services.voice_service import synthesize_voiceover, voiceover_ext
+from services.video_service import cached_segment, concat_segments, upload_video
+from services.render_service import render_slide
+from utils.cache_utils import content_key
+from utils.file_utils import upload_images
+from utils.workspace_utils import WORKSPACE_ROOT, workspace_id
+
+MANIFEST_NAME = "manifest.json"
+EDITABLE_FIELDS = ("title", "content", "script")
+
+
+class LectureNotFoundError(Exception):
+    """Raised when a lecture ID has no manifest (unknown or evicted)."""
+
+
+def _image_hash(slide, theme):
+    return content_key(slide.get("title", ""), slide.get("content", []), theme)
+
+
+def _audio_hash(slide):
+    return content_key(slide.get("script", ""))
+
+
+def _segment_hash(slide):
+    # Segments are video-only; the narration is added when they are joined
+    return content_key(slide["image_hash"], slide["duration"])
+
+
+def lecture_dir(lecture_id):
+    """Return the workspace directory of a lecture, validating the ID."""
+    if not re.fullmatch(r"[0-9a-f]{32}", lecture_id or ""):
+        raise LectureNotFoundError(f"Invalid lecture ID: {lecture_id}")
+    workspace = os.path.join(WORKSPACE_ROOT, lecture_id)
+    if not os.path.exists(os.path.join(workspace, MANIFEST_NAME)):
+        raise LectureNotFoundError(f"Lecture not found: {lecture_id}")
+    return workspace
+
+
+def write_manifest(workspace, manifest):
+    path = os.path.join(workspace, MANIFEST_NAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, path)
+
+
+def load_manifest(workspace):
+    with open(os.path.join(workspace, MANIFEST_NAME)) as f:
+        return json.load(f)
+
+
+def create_manifest(workspace, theme, slides, quiz, slides_path, image_paths, image_urls,
+                    voice_paths, durations, video_path, video_url, segment_paths=None):
+    """
+    Record the artifacts of a finished pipeline run so the lecture can later
+    be re-rendered incrementally.
+
+    segment_paths are the per-slide segments of a segmented encode. Without
+    them (single-pass and frame-pipe encodes) the first edit of the lecture
+    encodes a segment for every slide, about one slide-length encode each;
+    later edits only re-encode the slides they change.
+
+    Returns:
+        dict: The manifest written to <workspace>/manifest.json
+    """
+    manifest_slides = []
+    for i, slide in enumerate(slides):
+        entry = {
+            "title": slide.get("title", ""),
+            "content": slide.get("content", []),
+            "script": slide.get("script", ""),
+            "image": image_paths[i] if i < len(image_paths) else None,
+            "image_url": image_urls[i] if i < len(image_urls) else None,
+            "audio": voice_paths[i],
+            "duration": durations[i],
+            "segment": None,
+            "segment_hash": None
+        }
+        entry["image_hash"] = _image_hash(entry, theme)
+        entry["audio_hash"] = _audio_hash(entry)
+        segment = segment_paths[i] if segment_paths and i < len(segment_paths) else None
+        if segment and os.path.exists(segment):
+            entry.update(segment=segment, segment_hash=_segment_hash(entry))
+        entry["hash"] = content_key(entry["image_hash"], entry["audio_hash"])
+        manifest_slides.append(entry)
+
+    manifest = {
+        "lecture_id": workspace_id(workspace),
+        "theme": theme,
+        "slides": manifest_slides,
+        "quiz": quiz,
+        "slides_path": slides_path,
+        "video_local_path": video_path,
+        "video_path": video_url
+    }
+    write_manifest(workspace, manifest)
+    return manifest
+
+
+@contextmanager
+def _locked(workspace):
+    """Serialise edits of one lecture across threads and processes."""
+    with open(os.path.join(workspace, ".lock"), "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+
+def _remove_replaced(old_path, new_path):
+    if old_path and old_path != new_path and os.path.exists(old_path):
+        os.remove(old_path)
+
+
+def _rebuild_assets(workspace, index, slide, theme):
+    """Re-render the image and voiceover clip of one slide if stale. Returns True if its image changed."""
+    image_changed = False
+
+    image_hash = _image_hash(slide, theme)
+    if slide.get("image_hash") != image_hash or not slide.get("image") or not os.path.exists(slide["image"]):
+        image = os.path.join(workspace, f"slide_{index + 1}_{image_hash[:8]}.png")
+        render_slide(slide, theme, image)
+        _remove_replaced(slide.get("image"), image)
+        slide.update(image=image, image_url=None, image_hash=image_hash)
+        image_changed = True
+
+    audio_hash = _audio_hash(slide)
+    if slide.get("audio_hash") != audio_hash or not slide.get("audio") or not os.path.exists(slide["audio"]):
+        audio = os.path.join(workspace, f"voiceover_{index}_{audio_hash[:8]}{voiceover_ext()}")
+        synthesize_voiceover(slide["script"], audio)
+        _remove_replaced(slide.get("audio"), audio)
+        slide.update(audio=audio, audio_hash=audio_hash)
+
+    slide["hash"] = content_key(slide["image_hash"], slide["audio_hash"])
+    return image_changed
+
+
+def _rebuild_segment(workspace, index, slide):
+    """Re-encode the video segment of one slide if stale."""
+    segment_hash = _segment_hash(slide)
+    if slide.get("segment_hash") != segment_hash or not slide.get("segment") or not os.path.exists(slide["segment"]):
+        segment = os.path.join(workspace, f"segment_{index}_{segment_hash[:8]}.mp4")
+        cached_segment(slide["image"], slide["duration"], segment)
+        _remove_replaced(slide.get("segment"), segment)
+        slide.update(segment=segment, segment_hash=segment_hash)
+
+
+def update_slide(lecture_id, number, changes):
+    """
+    Apply edits to one slide and rebuild only what changed.
+
+    Slide images, voiceover clips and per-slide video segments are reused
+    whenever their content hash still matches; the final video is stitched
+    from the segments with stream copy and the re-assembled narration.
+
+    Args:
+        lecture_id (str): Lecture (workspace) ID returned by /generate
+        number (int): 1-based slide number
+        changes (dict): New values for any of title, content and script
+
+    Returns:
+        dict: Updated asset paths/URLs plus the numbers of the rebuilt slides
+
+    Raises:
+        LectureNotFoundError: If the lecture does not exist
+        IndexError: If the slide number is out of range
+    """
+    workspace = lecture_dir(lecture_id)
+    with _locked(workspace):
+        manifest = load_manifest(workspace)
+        slides = manifest["slides"]
+        if not 1 <= number <= len(slides):
+            raise IndexError(f"Slide {number} out of range (1-{len(slides)})")
+
+        for field in EDITABLE_FIELDS:
+            if field in changes:
+                slides[number - 1][field] = changes[field]
+
+        theme = manifest["theme"]
+        previous_hashes = [slide.get("hash") for slide in slides]
+        with ThreadPoolExecutor(max_workers=min(4, len(slides))) as executor:
+            image_changes = list(executor.map(
+                lambda item: _rebuild_assets(workspace, item[0], item[1], theme),
+                enumerate(slides)
+            ))
+            # Laid out like the generation pipeline does (normalized, padded and
+            # frame-aligned), so an edited slide sounds and lasts like its neighbours
+            track = assemble_audio([slide["audio"] for slide in slides])
+            for slide, duration in zip(slides, track.durations):
+                slide["duration"] = duration
+            list(executor.map(
+                lambda item: _rebuild_segment(workspace, item[0], item[1]),
+                enumerate(slides)
+            ))
+        rebuilt = [i + 1 for i, slide in enumerate(slides) if slide["hash"] != previous_hashes[i]]
+
+        if any(image_changes):
+            manifest["slides_path"] = generate_slides(slides, theme, output_dir=workspace)
+
+        dirty = [slide for slide, changed in zip(slides, image_changes) if changed]
+        uploaded = upload_images([slide["image"] for slide in dirty])
+        for slide, url in zip(dirty, uploaded["cloud_urls"]):
+            slide["image_url"] = url
+
+        video_key = content_key(*[(slide["segment_hash"], slide["audio_hash"]) for slide in slides])
+        video_local_path = os.path.join(workspace, f"lecture_{video_key[:8]}.mp4")
+        if video_local_path != manifest.get("video_local_path") or not os.path.exists(video_local_path):
+            concat_segments([slide["segment"] for slide in slides], video_local_path, audio=track)
+            _remove_replaced(manifest.get("video_local_path"), video_local_path)
+            video_result = upload_video(video_local_path)
+            manifest["video_local_path"] = video_local_path
+            manifest["video_path"] = video_result["cloud_url"] if isinstance(video_result, dict) else video_result
+
+        write_manifest(workspace, manifest)
+        # Editing keeps the lecture alive for another janitor TTL
+        os.utime(workspace)
+
+    return {
+        "lecture_id": lecture_id,
+        "rebuilt_slides": rebuilt,
+        "slides_path": manifest["slides_path"],
+        "video_path": manifest["video_path"],
+        "video_local_path": manifest["video_local_path"],
+        "slide_images": [slide["image_url"] or slide["image"] for slide in slides],
+        "quiz": manifest["quiz"]
+    }
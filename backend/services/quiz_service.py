@@ -1,16 +1,19 @@
+from models.quiz_model import Quiz
+
 def generate_quiz(quiz_data):
+    """
+    Return the client-facing quiz: question, options and the index of the
+    correct option. quiz_data holds validated Quiz objects or raw question
+    dicts, whose answers are resolved by Quiz.from_dict.
+    """
     quiz_list = []
     for q in quiz_data:
-        try:
-            correct_index = q["options"].index(q["answer"])
-            quiz_list.append({
-                "question": q["question"],
-                "options": q["options"],
-                "correct": correct_index
-            })
-        except ValueError:
-            # If the answer is not in the options, skip this question
-            # This can happen if the AI generates a faulty quiz
-            print(f"Skipping quiz question with invalid answer: {q}")
-            continue
+        if not isinstance(q, Quiz):
+            try:
+                q = Quiz.from_dict(q)
+            except ValueError as e:
+                # This can happen if the AI generates a faulty quiz
+                print(f"Skipping invalid quiz question: {e}")
+                continue
+        quiz_list.append(q.to_dict())
     return quiz_list
@@ -0,0 +1,179 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+from PIL import Image, ImageDraw, ImageFont
+
+from config.config import (RENDER_WORKERS, RENDER_PARALLEL_MIN_SLIDES, RENDER_CACHE_DIR,
+                           RENDER_CACHE_MAX_BYTES, JOB_START_METHOD)
+from utils.cache_utils import FileCache, content_key
+from utils.file_utils import slide_body_lines
+from utils.metrics_utils import timed
+from utils.theme_utils import get_theme_settings
+
+SLIDE_SIZE = (1280, 720)
+# Bump when the drawing code changes so cached images are not reused
+RENDERER_VERSION = 1
+
+# TrueType files tried for each theme font, most specific first
+FONT_FILES = {
+    "Arial": ["arial.ttf", "Arial.ttf", "DejaVuSans.ttf"],
+    "Comic Sans MS": ["comic.ttf", "Comic Sans MS.ttf", "arial.ttf", "DejaVuSans.ttf"],
+    "Calibri": ["calibri.ttf", "Calibri.ttf", "arial.ttf", "DejaVuSans.ttf"],
+}
+
+
+@lru_cache(maxsize=None)
+def get_font(name, size):
+    """Load a font once per process, falling back to Pillow's default font."""
+    for filename in FONT_FILES.get(name, [name, "arial.ttf", "DejaVuSans.ttf"]):
+        try:
+            return ImageFont.truetype(filename, size)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+
+@lru_cache(maxsize=None)
+def _theme_style(theme_name):
+    theme = get_theme_settings(theme_name)
+    return {
+        "background": Image.new("RGB", SLIDE_SIZE, color=tuple(theme["bg_color"])),
+        "title_color": tuple(theme["title_color"]),
+        "font": theme["font"],
+    }
+
+
+def slide_image_key(slide, theme):
+    """Content hash identifying the rendered image of a slide."""
+    return content_key(slide.get("title", ""), slide.get("content", []), theme, RENDERER_VERSION)
+
+
+def draw_slide(title, lines, theme):
+    """
+    Draw one slide from its data.
+
+    Returns:
+        PIL.Image.Image: The 1280x720 RGB slide
+    """
+    style = _theme_style(theme)
+    img = style["background"].copy()
+    draw = ImageDraw.Draw(img)
+    font_title = get_font(style["font"], 36)
+    font_content = get_font(style["font"], 24)
+    color = style["title_color"]
+
+    y_offset = 50
+    title = (title or "").strip()
+    if title:
+        draw.text((50, y_offset), title, fill=color, font=font_title)
+        y_offset += 80
+
+    for line in lines:
+        if not line.strip():
+            continue
+        draw.text((70, y_offset), line, fill=color, font=font_content)
+        y_offset += 40
+    return img
+
+
+def _render_to_file(title, lines, theme, path):
+    # Executed in the render pool; must stay a module-level function.
+    # The path may be a hard link into the render cache, never write through it
+    if os.path.exists(path):
+        os.remove(path)
+    draw_slide(title, lines, theme).save(path, optimize=False, compress_level=1)
+    return path
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=RENDER_WORKERS,
+                                        mp_context=multiprocessing.get_context(JOB_START_METHOD))
+        return _pool
+
+
+_cache = None
+
+
+def get_render_cache():
+    """Return the process-wide rendered slide cache."""
+    global _cache
+    with _pool_lock:
+        if _cache is None:
+            _cache = FileCache(RENDER_CACHE_DIR, RENDER_CACHE_MAX_BYTES, ext=".png")
+        return _cache
+
+
+@timed("render_slides")
+def render_slides(slides, theme, output_dir, workers=RENDER_WORKERS):
+    """
+    Render slide images straight from the slide data.
+
+    Slides whose content hash is already in the render cache are linked from
+    it instead of being drawn again; the rest are drawn across a process pool
+    (inline for small decks, where the IPC overhead isn't worth it).
+
+    Args:
+        slides (list): Slide dicts with "title" and "content"
+        theme (str): Visual theme name
+        output_dir (str): Directory the slide_<n>.png files are written to
+        workers (int): Render processes; 0 or 1 renders inline
+
+    Returns:
+        list: Image paths, in slide order
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    cache = get_render_cache()
+    paths = [os.path.join(output_dir, f"slide_{i + 1}.png") for i in range(len(slides))]
+
+    todo = []
+    for slide, path in zip(slides, paths):
+        key = slide_image_key(slide, theme)
+        if cache.get(key, path) is None:
+            todo.append((key, slide.get("title", ""), slide_body_lines(slide.get("content", [])), path))
+
+    if workers > 1 and len(todo) >= RENDER_PARALLEL_MIN_SLIDES:
+        pool = _get_pool()
+        futures = [pool.submit(_render_to_file, title, lines, theme, path)
+                   for _, title, lines, path in todo]
+        for future in futures:
+            future.result()
+    else:
+        for _, title, lines, path in todo:
+            _render_to_file(title, lines, theme, path)
+
+    for key, _, _, path in todo:
+        cache.put(key, path)
+
+    print(f"Rendered {len(todo)} of {len(slides)} slide images ({len(slides) - len(todo)} cached)")
+    return paths
+
+
+def slide_frames(slides, theme):
+    """
+    Draw slides in memory, one at a time as they are consumed.
+
+    Yields:
+        PIL.Image.Image: The 1280x720 RGB frame of each slide, in order
+    """
+    for slide in slides:
+        yield draw_slide(slide.get("title", ""), slide_body_lines(slide.get("content", [])), theme)
+
+
+def render_slide(slide, theme, path):
+    """Render a single slide to path, reusing the render cache. Returns path."""
+    cache = get_render_cache()
+    key = slide_image_key(slide, theme)
+    if cache.get(key, path) is None:
+        _render_to_file(slide.get("title", ""), slide_body_lines(slide.get("content", [])), theme, path)
+        cache.put(key, path)
+    return path
@@ -1,39 +1,68 @@
+from functools import lru_cache
+from io import BytesIO
 from pptx import Presentation
 from pptx.util import Inches
+from utils.file_utils import slide_body_lines
 from utils.theme_utils import apply_theme
+from utils.metrics_utils import timed
 import os
 
-def generate_slides(slides_data, theme):
-    # Ensure output directory exists
-    output_dir = "output"
-    if not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-        
+# Index of the "Title and Content" layout in the default template
+CONTENT_LAYOUT = 1
+
+@lru_cache(maxsize=16)
+def get_template(theme):
+    """
+    Return an empty deck with the theme applied, saved as bytes.
+    Built once per theme and process; every deck is a clone of it, so the
+    theme is not re-applied per request.
+    """
     prs = Presentation()
     apply_theme(prs, theme)
+    buffer = BytesIO()
+    prs.save(buffer)
+    return buffer.getvalue()
+
+@timed("generate_slides")
+def generate_slides(slides_data, theme, output_dir="output", output=None):
+    """
+    Build the PPTX for a lecture.
+
+    Args:
+        slides_data (list): Slides with title and content
+        theme (str): Theme name
+        output_dir (str): Directory the deck is saved to as slides.pptx
+        output (file, optional): Binary file object (e.g. BytesIO) to save
+            to instead; it is rewound so it can be read right away
+
+    Returns:
+        str | file: Path of the saved deck, or `output`
+    """
+    prs = Presentation(BytesIO(get_template(theme)))
+    slide_layout = prs.slide_layouts[CONTENT_LAYOUT]
 
     for slide in slides_data:
-        slide_layout = prs.slide_layouts[1]
         s = prs.slides.add_slide(slide_layout)
-        
+
         # Set title
         if s.shapes.title and 'title' in slide:
             s.shapes.title.text = slide['title']
-            
-        # Set content
+
+        # Set content: one paragraph per bullet point, in a single assignment
         if len(s.placeholders) > 1:
             body = s.placeholders[1]
             if body.has_text_frame:
-                text_frame = body.text_frame  # type: ignore
-                text_frame.clear()  # Clear any existing text
-                
-                for i, point in enumerate(slide['content']):
-                    if i == 0:
-                        text_frame.text = f"• {point}"
-                    else:
-                        p = text_frame.add_paragraph()
-                        p.text = f"• {point}"
-
-    path = "output/slides.pptx"
+                lines = slide_body_lines(slide['content'])
+                # A line feed inside a point would start a new bullet; keep it a line break
+                body.text_frame.text = "\n".join(line.replace("\n", "\v") for line in lines)  # type: ignore
+
+    if output is not None:
+        prs.save(output)
+        output.seek(0)
+        return output
+
+    # Ensure output directory exists
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, "slides.pptx")
     prs.save(path)
-    return path
\ No newline at end of file
+    return path
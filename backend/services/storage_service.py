@@ -0,0 +1,181 @@
+import os
+import shutil
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+
+from config.config import (STORAGE_BACKEND, STORAGE_LOCAL_DIR, STORAGE_LOCAL_BASE_URL, S3_ENDPOINT_URL,
+                           S3_BUCKET, S3_REGION, S3_ACCESS_KEY, S3_SECRET_KEY, S3_PUBLIC_BASE_URL,
+                           UPLOAD_CONCURRENCY, UPLOAD_FOLDER)
+from services.upload_service import file_digest
+from utils.metrics_utils import span
+
+CONTENT_TYPES = {
+    ".png": "image/png", ".jpg": "image/jpeg", ".jpeg": "image/jpeg", ".gif": "image/gif",
+    ".webp": "image/webp", ".mp4": "video/mp4", ".webm": "video/webm", ".mov": "video/quicktime",
+    ".mp3": "audio/mpeg", ".wav": "audio/wav", ".json": "application/json",
+    ".pptx": "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+}
+
+
+def stored_name(file_path, digest=None):
+    """Content-addressed name of a file: a hash of its bytes plus its extension."""
+    digest = digest or file_digest(file_path)
+    return digest[:32] + os.path.splitext(file_path)[1].lower()
+
+
+class StorageBackend(ABC):
+    """
+    Where generated artifacts are published.
+
+    Backends implement _store(), which stores a local file and returns its
+    public URL (None on failure); callers use save(), which times it. Names are derived from the file's bytes,
+    so saving the same content twice stores it once. submit() runs save()
+    on a shared thread pool so uploads can overlap with other work.
+    """
+
+    name = None
+
+    def __init__(self, max_workers=UPLOAD_CONCURRENCY):
+        self._executor = ThreadPoolExecutor(max_workers=max(max_workers, 1))
+
+    def save(self, file_path, resource_type="auto"):
+        with span("storage_save"):
+            return self._store(file_path, resource_type)
+
+    @abstractmethod
+    def _store(self, file_path, resource_type):
+        """Store a local file; returns its public URL, or None on failure."""
+
+    def submit(self, file_path, resource_type="auto"):
+        """
+        Queue a save.
+
+        Returns:
+            concurrent.futures.Future: Resolves to the public URL, or None
+        """
+        return self._executor.submit(self._save_or_none, file_path, resource_type)
+
+    def _save_or_none(self, file_path, resource_type):
+        try:
+            return self.save(file_path, resource_type)
+        except Exception as e:
+            print(f"Error storing {file_path} with the {self.name} backend: {e}")
+            return None
+
+    def local_path(self, name):
+        """Path of a stored file on this host, or None if the backend is remote."""
+        return None
+
+
+class LocalStorage(StorageBackend):
+    """Keeps artifacts on local disk; they are served by the /files route."""
+
+    name = "local"
+
+    def __init__(self, directory=STORAGE_LOCAL_DIR, base_url=STORAGE_LOCAL_BASE_URL, **kwargs):
+        super().__init__(**kwargs)
+        self.directory = directory
+        self.base_url = base_url.rstrip("/")
+        os.makedirs(directory, exist_ok=True)
+
+    def _store(self, file_path, resource_type):
+        name = stored_name(file_path)
+        path = os.path.join(self.directory, name)
+        if not os.path.exists(path):
+            # Copy rather than link: workspace files may be rewritten later
+            tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+            shutil.copyfile(file_path, tmp_path)
+            os.replace(tmp_path, path)
+        return f"{self.base_url}/{name}"
+
+    def local_path(self, name):
+        # Stored names never contain a separator; reject anything else
+        if not name or name != os.path.basename(name) or name.startswith("."):
+            return None
+        path = os.path.join(self.directory, name)
+        return path if os.path.isfile(path) else None
+
+
+class CloudinaryStorage(StorageBackend):
+    """Publishes artifacts to Cloudinary through the pooled upload manager."""
+
+    name = "cloudinary"
+
+    def _store(self, file_path, resource_type):
+        from services.cloud_service import upload_file
+
+        result = upload_file(file_path, resource_type=resource_type)
+        return result["secure_url"] if result else None
+
+
+class S3Storage(StorageBackend):
+    """
+    Publishes artifacts to an S3-compatible bucket (AWS S3, MinIO, ...).
+
+    Needs boto3, which is only imported when this backend is selected.
+    Large files are sent as multipart uploads by boto3's transfer manager.
+    """
+
+    name = "s3"
+
+    def __init__(self, endpoint_url=S3_ENDPOINT_URL, bucket=S3_BUCKET, region=S3_REGION,
+                 access_key=S3_ACCESS_KEY, secret_key=S3_SECRET_KEY, public_base_url=S3_PUBLIC_BASE_URL,
+                 prefix=UPLOAD_FOLDER, **kwargs):
+        try:
+            import boto3
+        except ImportError as e:
+            raise RuntimeError("The s3 storage backend requires boto3 (pip install boto3)") from e
+        super().__init__(**kwargs)
+        self.bucket = bucket
+        self.prefix = prefix
+        self.client = boto3.client(
+            "s3",
+            endpoint_url=endpoint_url,
+            region_name=region,
+            aws_access_key_id=access_key,
+            aws_secret_access_key=secret_key
+        )
+        if public_base_url:
+            self.base_url = public_base_url.rstrip("/")
+        elif endpoint_url:
+            self.base_url = f"{endpoint_url.rstrip('/')}/{bucket}"
+        else:
+            self.base_url = f"https://{bucket}.s3.{region}.amazonaws.com"
+
+    def _store(self, file_path, resource_type):
+        from botocore.exceptions import ClientError
+
+        name = stored_name(file_path)
+        key = f"{self.prefix}/{name}" if self.prefix else name
+        try:
+            self.client.head_object(Bucket=self.bucket, Key=key)
+        except ClientError:
+            ext = os.path.splitext(file_path)[1].lower()
+            self.client.upload_file(file_path, self.bucket, key, ExtraArgs={
+                "ContentType": CONTENT_TYPES.get(ext, "application/octet-stream"),
+                "CacheControl": "public, max-age=31536000, immutable"
+            })
+        return f"{self.base_url}/{key}"
+
+
+BACKENDS = {
+    "local": LocalStorage,
+    "cloudinary": CloudinaryStorage,
+    "s3": S3Storage,
+}
+
+_storage = None
+_storage_lock = threading.Lock()
+
+
+def get_storage():
+    """Return the process-wide storage backend selected by STORAGE_BACKEND."""
+    global _storage
+    with _storage_lock:
+        if _storage is None:
+            if STORAGE_BACKEND not in BACKENDS:
+                raise ValueError(f"Unknown STORAGE_BACKEND {STORAGE_BACKEND!r}, expected one of {list(BACKENDS)}")
+            _storage = BACKENDS[STORAGE_BACKEND]()
+        return _storage
@@ -0,0 +1,235 @@
+import hashlib
+import threading
+import time
+import uuid
+from io import BytesIO
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config.config import (SUMMARIZER_URL, SUMMARIZER_CONNECT_TIMEOUT, SUMMARIZER_READ_TIMEOUT,
+                           SUMMARIZER_FAILURE_THRESHOLD, SUMMARIZER_RESET_TIMEOUT,
+                           SUMMARY_CACHE_ENABLED, SUMMARY_CACHE_DIR, SUMMARY_CACHE_MAX_BYTES)
+from utils import metrics_utils
+from utils.cache_utils import FileCache, content_key
+
+BLOCK_SIZE = 64 * 1024
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the summarizer while the circuit is open."""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Summarizer unavailable, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class SummarizerError(Exception):
+    """Raised when the summarizer answers with an error status."""
+
+
+class CircuitBreaker:
+    """
+    Fails fast after `failure_threshold` consecutive failures. Once
+    `reset_timeout` seconds have passed a single trial call is let through
+    (half-open): success closes the circuit, failure opens it again.
+    """
+
+    def __init__(self, failure_threshold=SUMMARIZER_FAILURE_THRESHOLD, reset_timeout=SUMMARIZER_RESET_TIMEOUT):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            if self.opened_at is None:
+                return "closed"
+            return "half_open" if time.monotonic() - self.opened_at >= self.reset_timeout else "open"
+
+    def before_call(self):
+        """Raise CircuitOpenError unless a call may go through now."""
+        with self._lock:
+            if self.opened_at is None:
+                return
+            waited = time.monotonic() - self.opened_at
+            if waited < self.reset_timeout or self._trial:
+                raise CircuitOpenError(max(self.reset_timeout - waited, 1))
+            self._trial = True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._trial = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            if self._trial or self.failures >= self.failure_threshold:
+                if self.opened_at is None or self._trial:
+                    print(f"Summarizer circuit opened after {self.failures} failures")
+                self.opened_at = time.monotonic()
+            self._trial = False
+
+
+class MultipartFile:
+    """
+    A multipart/form-data body holding one file field, read from the file
+    object block by block as it is sent, with a known Content-Length.
+    """
+
+    def __init__(self, field, filename, fileobj, size, content_type=None):
+        self.boundary = uuid.uuid4().hex
+        filename = (filename or "upload").replace('"', "%22")
+        head = (f"--{self.boundary}\r\n"
+                f'Content-Disposition: form-data; name="{field}"; filename="{filename}"\r\n'
+                f"Content-Type: {content_type or 'application/octet-stream'}\r\n\r\n").encode("utf-8")
+        tail = f"\r\n--{self.boundary}--\r\n".encode("ascii")
+        self._parts = [BytesIO(head), fileobj, BytesIO(tail)]
+        self._length = len(head) + size + len(tail)
+
+    @property
+    def content_type(self):
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self):
+        return self._length
+
+    def read(self, size=-1):
+        chunks = []
+        while self._parts and (size < 0 or size > 0):
+            data = self._parts[0].read(size)
+            if not data:
+                self._parts.pop(0)
+                continue
+            chunks.append(data)
+            if size > 0:
+                size -= len(data)
+        return b"".join(chunks)
+
+    def __iter__(self):
+        return iter(lambda: self.read(BLOCK_SIZE), b"")
+
+
+def stream_digest(fileobj):
+    """Return the SHA-256 hex digest and size of a seekable stream, rewinding it."""
+    digest = hashlib.sha256()
+    size = 0
+    fileobj.seek(0)
+    for block in iter(lambda: fileobj.read(BLOCK_SIZE), b""):
+        digest.update(block)
+        size += len(block)
+    fileobj.seek(0)
+    return digest.hexdigest(), size
+
+
+class SummarizerClient:
+    """
+    Client of the external notes summarizer.
+
+    Requests share a pooled session with connect/read timeouts and go
+    through a circuit breaker. Uploaded files are streamed upstream from
+    wherever the WSGI server spooled them, and successful summaries are
+    cached by hash of the file or text, so repeats never leave the process.
+    """
+
+    def __init__(self, url=SUMMARIZER_URL, connect_timeout=SUMMARIZER_CONNECT_TIMEOUT,
+                 read_timeout=SUMMARIZER_READ_TIMEOUT, breaker=None, cache=None):
+        self.url = url
+        self.timeout = (connect_timeout, read_timeout)
+        self.breaker = breaker or CircuitBreaker()
+        self.cache = cache
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=16)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    def summarize_file(self, fileobj, filename, mimetype=None):
+        """
+        Summarize an uploaded file.
+
+        Returns:
+            tuple: (body, content_type, cached) where body is bytes on a
+                cache hit and an iterator of bytes otherwise
+        """
+        digest, size = stream_digest(fileobj)
+        key = content_key("file", digest)
+
+        def send():
+            body = MultipartFile("file", filename, fileobj, size, mimetype)
+            return self._post(data=body, headers={"Content-Type": body.content_type})
+        return self._cached(key, send)
+
+    def summarize_text(self, text):
+        """Summarize pasted notes; returns the same tuple as summarize_file."""
+        key = content_key("text", text)
+        # The service expects multipart/form-data for text as well
+        return self._cached(key, lambda: self._post(files={"notes_text": (None, text)}))
+
+    def _cached(self, key, send):
+        hit = self.cache.get_bytes(key) if self.cache else None
+        if hit is not None:
+            data, meta = hit
+            return data, meta.get("content_type", "application/json"), True
+        response = send()
+        return self._relay(response, key), response.headers.get("Content-Type", "application/json"), False
+
+    def _post(self, **kwargs):
+        self.breaker.before_call()
+        try:
+            with metrics_utils.span("summarize"):
+                response = self.session.post(self.url, timeout=self.timeout, stream=True, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            self.breaker.record_failure()
+            raise
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        if response.status_code >= 400:
+            detail = response.text[:200]
+            response.close()
+            raise SummarizerError(f"HTTP {response.status_code}: {detail}")
+        return response
+
+    def _relay(self, response, key):
+        """Pass the summary through as it arrives and cache it once complete."""
+        content_type = response.headers.get("Content-Type", "application/json")
+        chunks = []
+        try:
+            for chunk in response.iter_content(BLOCK_SIZE):
+                chunks.append(chunk)
+                yield chunk
+        finally:
+            response.close()
+        if self.cache:
+            self.cache.put_bytes(key, b"".join(chunks), {"content_type": content_type})
+
+
+def _circuit_metrics():
+    if _client is None:
+        return []
+    return [("summarizer_circuit_open", "1 while /summarize fails fast",
+             {(): 0 if _client.breaker.state == "closed" else 1}, ())]
+
+
+metrics_utils.register_collector(_circuit_metrics)
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_summarizer():
+    """Return the process-wide SummarizerClient, creating it on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            cache = FileCache(SUMMARY_CACHE_DIR, SUMMARY_CACHE_MAX_BYTES, ext=".summary") \
+                if SUMMARY_CACHE_ENABLED else None
+            _client = SummarizerClient(cache=cache)
+        return _client
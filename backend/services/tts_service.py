@@ -0,0 +1,176 @@
+import json
+import os
+import subprocess
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+
+from config.config import TTS_ENGINE, PIPER_BINARY, PIPER_MODEL, ESPEAK_BINARY, ESPEAK_VOICE
+from utils import metrics_utils
+from utils.metrics_utils import run_subprocess
+
+
+class TTSEngine(ABC):
+    """
+    A text-to-speech backend.
+
+    `ext` is the container the engine writes. Engines with `batched` set
+    synthesize a list of clips more cheaply in one synthesize_batch() call
+    than clip by clip; the others are run concurrently per clip.
+    """
+
+    name = None
+    ext = ".mp3"
+    batched = False
+
+    @property
+    def cache_id(self):
+        """Identifies the engine and its voice in TTS cache keys."""
+        return self.name
+
+    @abstractmethod
+    def synthesize(self, text, path, lang="en", slow=False):
+        """Write the clip of text to path; returns the path."""
+
+    def synthesize_batch(self, items, lang="en", slow=False):
+        """Write every (text, path) clip in items; returns the paths."""
+        return [self.synthesize(text, path, lang=lang, slow=slow) for text, path in items]
+
+    def close(self):
+        pass
+
+
+class GTTSEngine(TTSEngine):
+    """Google Translate's TTS over HTTP: one network round trip per clip, MP3 output."""
+
+    name = "gtts"
+    ext = ".mp3"
+
+    def synthesize(self, text, path, lang="en", slow=False):
+        from gtts import gTTS
+
+        gTTS(text=text, lang=lang, slow=slow).save(path)
+        return path
+
+
+class PiperEngine(TTSEngine):
+    """
+    Offline neural TTS with piper (https://github.com/rhasspy/piper).
+
+    One piper process per engine is kept running with --json-input, so the
+    voice model is loaded once; each clip is a JSON line on its stdin and
+    piper answers with the path of the WAV it wrote. A batch is written in
+    one go and its answers read back afterwards. The language and pace
+    are those of the voice model, so `lang` and `slow` are ignored.
+    """
+
+    name = "piper"
+    ext = ".wav"
+    batched = True
+
+    def __init__(self, binary=PIPER_BINARY, model=PIPER_MODEL):
+        if not model:
+            raise ValueError("PIPER_MODEL must point to a piper voice (.onnx)")
+        self.binary = binary
+        self.model = model
+        self._process = None
+        self._scratch = None
+        self._lock = threading.Lock()
+
+    @property
+    def cache_id(self):
+        return f"{self.name}:{os.path.basename(self.model)}"
+
+    def _start(self):
+        if self._process is not None and self._process.poll() is None:
+            return self._process
+        self._scratch = self._scratch or tempfile.mkdtemp(prefix="piper-")
+        metrics_utils.SUBPROCESSES.inc(command=os.path.basename(self.binary))
+        # --output_dir is only a fallback, every request names its output_file
+        self._process = subprocess.Popen(
+            [self.binary, "--model", self.model, "--json-input", "--output_dir", self._scratch],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+            text=True, bufsize=1
+        )
+        return self._process
+
+    def synthesize(self, text, path, lang="en", slow=False):
+        return self.synthesize_batch([(text, path)], lang=lang, slow=slow)[0]
+
+    def synthesize_batch(self, items, lang="en", slow=False):
+        if not items:
+            return []
+        with self._lock:
+            process = self._start()
+            try:
+                for text, path in items:
+                    request = {"text": text, "output_file": os.path.abspath(path)}
+                    process.stdin.write(json.dumps(request) + "\n")
+                process.stdin.flush()
+                for _ in items:
+                    if not process.stdout.readline():
+                        raise RuntimeError(f"piper stopped answering (exit code {process.poll()})")
+            except (OSError, RuntimeError):
+                # Start a fresh process for the next call (and the caller's retry)
+                self._stop()
+                raise
+        return [path for _, path in items]
+
+    def _stop(self):
+        if self._process is None:
+            return
+        try:
+            self._process.stdin.close()
+        except OSError:
+            pass
+        try:
+            self._process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self._process.kill()
+        self._process = None
+
+    def close(self):
+        with self._lock:
+            self._stop()
+
+
+class EspeakEngine(TTSEngine):
+    """Offline formant TTS with espeak-ng: a short-lived process per clip, WAV output."""
+
+    name = "espeak"
+    ext = ".wav"
+
+    def __init__(self, binary=ESPEAK_BINARY, voice=ESPEAK_VOICE):
+        self.binary = binary
+        self.voice = voice
+
+    @property
+    def cache_id(self):
+        return f"{self.name}:{self.voice}"
+
+    def synthesize(self, text, path, lang="en", slow=False):
+        # The script goes through stdin so text starting with "-" is not read as an option
+        cmd = [self.binary, "-v", self.voice or lang, "-s", "130" if slow else "170", "-w", path, "--stdin"]
+        run_subprocess(cmd, input=text, text=True, capture_output=True, check=True)
+        return path
+
+
+ENGINES = {
+    "gtts": GTTSEngine,
+    "piper": PiperEngine,
+    "espeak": EspeakEngine,
+}
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+def get_tts_engine():
+    """Return the process-wide TTS engine selected by TTS_ENGINE, creating it on first use."""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            if TTS_ENGINE not in ENGINES:
+                raise ValueError(f"Unknown TTS_ENGINE {TTS_ENGINE!r} (expected one of {', '.join(ENGINES)})")
+            _engine = ENGINES[TTS_ENGINE]()
+        return _engine
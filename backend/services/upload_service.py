@@ -0,0 +1,211 @@
+import hashlib
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config.config import (CLOUDINARY_CLOUD_NAME, CLOUDINARY_API_KEY, CLOUDINARY_API_SECRET,
+                           CLOUDINARY_API_BASE, CLOUDINARY_DELIVERY_BASE, UPLOAD_CONCURRENCY,
+                           UPLOAD_RETRIES, UPLOAD_TIMEOUT, UPLOAD_CHUNK_THRESHOLD, UPLOAD_CHUNK_SIZE,
+                           UPLOAD_FOLDER)
+
+RESOURCE_TYPES = {
+    ".png": "image", ".jpg": "image", ".jpeg": "image", ".gif": "image", ".webp": "image",
+    ".mp4": "video", ".mov": "video", ".webm": "video", ".mp3": "video", ".wav": "video",
+}
+
+# Responses worth retrying: throttling and server-side failures
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+# Uploads remembered for deduplication; the least recently used are forgotten
+DEDUP_ENTRIES = 4096
+
+
+class UploadError(Exception):
+    """Raised when an upload still fails after all retries."""
+
+
+def file_digest(path, block_size=1024 * 1024):
+    """Return the SHA-256 hex digest of a file's bytes."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class UploadManager:
+    """
+    Cloudinary uploader over a pooled HTTP session.
+
+    upload() is synchronous and safe to call from many threads at once; the
+    storage backend's thread pool (StorageBackend.submit) is what runs
+    uploads concurrently, and the session keeps enough connections for
+    `max_workers` of them. Failed requests are retried with exponential
+    backoff. Each file's public ID is a hash of its bytes, so identical
+    content is uploaded once: repeats (including ones started while the
+    first upload is still running) share its result through a bounded
+    in-process map, or are answered by a HEAD request on the delivery URL.
+    Files above the chunk threshold use Cloudinary's chunked upload protocol.
+    """
+
+    def __init__(self, cloud_name=CLOUDINARY_CLOUD_NAME, api_key=CLOUDINARY_API_KEY,
+                 api_secret=CLOUDINARY_API_SECRET, api_base=CLOUDINARY_API_BASE,
+                 delivery_base=CLOUDINARY_DELIVERY_BASE, max_workers=UPLOAD_CONCURRENCY,
+                 retries=UPLOAD_RETRIES, timeout=UPLOAD_TIMEOUT,
+                 chunk_threshold=UPLOAD_CHUNK_THRESHOLD, chunk_size=UPLOAD_CHUNK_SIZE,
+                 folder=UPLOAD_FOLDER):
+        self.cloud_name = cloud_name
+        self.api_key = api_key
+        self.api_secret = api_secret
+        self.api_base = api_base.rstrip("/")
+        self.delivery_base = delivery_base.rstrip("/")
+        self.retries = retries
+        self.timeout = timeout
+        self.chunk_threshold = chunk_threshold
+        self.chunk_size = chunk_size
+        self.folder = folder
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=max(max_workers, 1) * 2)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # dedup key -> Future of the upload result, in least recently used order
+        self._uploaded = OrderedDict()
+        self._lock = threading.Lock()
+
+    def upload(self, file_path, resource_type="auto", public_id=None):
+        """Upload a file; returns the result dict (with "secure_url") or None."""
+        return self._upload_or_none(file_path, resource_type, public_id)
+
+    def _upload_or_none(self, file_path, resource_type, public_id):
+        try:
+            return self._upload(file_path, resource_type, public_id)
+        except Exception as e:
+            print(f"Error uploading {file_path}: {e}")
+            return None
+
+    def _upload(self, file_path, resource_type, public_id):
+        ext = os.path.splitext(file_path)[1].lower()
+        if resource_type == "auto":
+            resource_type = RESOURCE_TYPES.get(ext, "raw")
+        digest = file_digest(file_path)
+        if public_id is None:
+            public_id = f"{self.folder}/{digest[:32]}" if self.folder else digest[:32]
+
+        dedup_key = (resource_type, public_id, digest)
+        with self._lock:
+            shared = self._uploaded.get(dedup_key)
+            if shared is not None:
+                self._uploaded.move_to_end(dedup_key)
+            else:
+                future = self._uploaded[dedup_key] = Future()
+                while len(self._uploaded) > DEDUP_ENTRIES:
+                    self._uploaded.popitem(last=False)
+        if shared is not None:
+            # Uploaded already or in flight on another thread
+            return shared.result()
+
+        try:
+            result = self._existing(resource_type, public_id, ext)
+            if result is None:
+                size = os.path.getsize(file_path)
+                if size > self.chunk_threshold:
+                    result = self._upload_chunked(file_path, resource_type, public_id, size)
+                else:
+                    with open(file_path, "rb") as f:
+                        data = f.read()
+                    result = self._post(resource_type, public_id, data, os.path.basename(file_path))
+        except Exception as e:
+            # Forget the failure so a later upload tries again
+            with self._lock:
+                if self._uploaded.get(dedup_key) is future:
+                    del self._uploaded[dedup_key]
+            future.set_exception(e)
+            raise
+        future.set_result(result)
+        return result
+
+    def _existing(self, resource_type, public_id, ext):
+        """Return a result for an already-uploaded public ID, or None."""
+        if resource_type == "raw":
+            return None
+        url = f"{self.delivery_base}/{self.cloud_name}/{resource_type}/upload/{public_id}{ext}"
+        try:
+            response = self.session.head(url, timeout=self.timeout, allow_redirects=True)
+        except requests.RequestException:
+            return None
+        if response.status_code == 200:
+            return {"secure_url": url, "public_id": public_id, "existing": True}
+        return None
+
+    def _signed_params(self, public_id):
+        params = {"public_id": public_id, "timestamp": str(int(time.time())), "overwrite": "false"}
+        to_sign = "&".join(f"{key}={params[key]}" for key in sorted(params))
+        params["signature"] = hashlib.sha1((to_sign + self.api_secret).encode("utf-8")).hexdigest()
+        params["api_key"] = self.api_key
+        return params
+
+    def _upload_url(self, resource_type):
+        return f"{self.api_base}/v1_1/{self.cloud_name}/{resource_type}/upload"
+
+    def _post(self, resource_type, public_id, data, filename, headers=None):
+        """POST one upload request, retrying transient failures with backoff."""
+        for attempt in range(self.retries + 1):
+            try:
+                response = self.session.post(
+                    self._upload_url(resource_type),
+                    data=self._signed_params(public_id),
+                    files={"file": (filename, data)},
+                    headers=headers,
+                    timeout=self.timeout
+                )
+                if response.status_code not in RETRY_STATUSES:
+                    response.raise_for_status()
+                    return response.json()
+                error = UploadError(f"HTTP {response.status_code}: {response.text[:200]}")
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = e
+            if attempt < self.retries:
+                delay = 0.5 * 2 ** attempt
+                print(f"Upload of {filename} failed ({error}), retrying in {delay}s")
+                time.sleep(delay)
+        raise UploadError(f"Upload of {filename} failed after {self.retries + 1} attempts: {error}")
+
+    def _upload_chunked(self, file_path, resource_type, public_id, size):
+        """Send a large file as byte-range chunks sharing one upload ID."""
+        upload_id = uuid.uuid4().hex
+        filename = os.path.basename(file_path)
+        result = None
+        with open(file_path, "rb") as f:
+            start = 0
+            while start < size:
+                data = f.read(self.chunk_size)
+                end = start + len(data) - 1
+                headers = {
+                    "X-Unique-Upload-Id": upload_id,
+                    "Content-Range": f"bytes {start}-{end}/{size}"
+                }
+                result = self._post(resource_type, public_id, data, filename, headers=headers)
+                start = end + 1
+        return result
+
+    def close(self):
+        self.session.close()
+
+
+_manager = None
+_manager_lock = threading.Lock()
+
+
+def get_upload_manager():
+    """Return the process-wide UploadManager, creating it on first use."""
+    global _manager
+    with _manager_lock:
+        if _manager is None:
+            _manager = UploadManager()
+        return _manager
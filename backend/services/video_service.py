@@ -1,64 +1,515 @@
 import os
 import subprocess
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
+from config.config import (VIDEO_FPS, VIDEO_PRESET, VIDEO_TUNE, VIDEO_CRF, VIDEO_THREADS, JOB_WORKERS,
+                           VIDEO_SEGMENT_THREADS, SEGMENT_CACHE_ENABLED, SEGMENT_CACHE_DIR,
+                           SEGMENT_CACHE_MAX_BYTES)
+from services.audio_service import AudioTrack
+from services.upload_service import file_digest
+from utils.audio_utils import probe_duration
+from utils.cache_utils import FileCache, content_key
+from utils.encode_utils import get_encode_slots
+from utils import metrics_utils
+from utils.metrics_utils import timed, run_subprocess
 
-def create_video(slide_images, audio_path, durations=None):
+# Bump when encode_segment changes so cached segments are not reused
+SEGMENT_VERSION = 2
+
+_segment_cache = None
+_segment_cache_lock = threading.Lock()
+
+def get_segment_cache():
+    """Return the shared segment cache, or None when disabled."""
+    global _segment_cache
+    if not SEGMENT_CACHE_ENABLED:
+        return None
+    with _segment_cache_lock:
+        if _segment_cache is None:
+            _segment_cache = FileCache(SEGMENT_CACHE_DIR, SEGMENT_CACHE_MAX_BYTES, ext=".mp4")
+        return _segment_cache
+
+def encoder_threads():
+    """Threads per encode: VIDEO_THREADS, or this job's share of the cores."""
+    return VIDEO_THREADS or max(1, (os.cpu_count() or 1) // max(JOB_WORKERS, 1))
+
+def encoder_args(threads=None, audio=True):
+    """
+    Return the libx264/AAC output options shared by every video encode
+    (without an audio stream when audio is False).
+    """
+    threads = threads or encoder_threads()
+    args = [
+        "-c:v", "libx264",
+        "-preset", VIDEO_PRESET,
+        "-crf", str(VIDEO_CRF),
+        "-pix_fmt", "yuv420p",
+    ]
+    if VIDEO_TUNE:
+        args += ["-tune", VIDEO_TUNE]
+    args += ["-threads", str(threads)]
+    args += ["-c:a", "aac"] if audio else ["-an"]
+    return args + ["-movflags", "+faststart"]
+
+def upload_video(path):
+    """Upload a rendered video; return the create_video result for it."""
+    try:
+        from services.storage_service import get_storage
+        url = get_storage().save(path, resource_type="video")
+        if url:
+            return {"cloud_url": url, "local_path": path}
+    except Exception as e:
+        print(f"Video upload failed: {e}")
+
+    return path
+
+@timed("create_video")
+def create_video(slide_images, audio_path, durations=None, output_path=None):
     """
     Create a video from slide images and audio using FFmpeg.
+
+    audio_path is the narration file, or an AudioTrack that is piped to
+    ffmpeg's stdin (its slide durations then take precedence).
     """
     try:
-        if not os.path.exists(audio_path):
+        track = audio_path if isinstance(audio_path, AudioTrack) else None
+        if track is None and not os.path.exists(audio_path):
             raise FileNotFoundError(f"Audio file not found: {audio_path}")
 
         existing_images = [img for img in slide_images if os.path.exists(img)]
         if not existing_images:
             raise FileNotFoundError("No valid slide images found")
 
-        if durations is None:
+        if track is not None:
+            durations = track.durations
+        elif durations is None:
             durations = [25] * len(existing_images)
 
-        # Create a temporary file for ffmpeg concat demuxer
-        with open("slides.txt", "w") as f:
+        path = output_path or "output/lecture.mp4"
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Create a temporary file for ffmpeg concat demuxer next to the output
+        list_path = os.path.join(os.path.dirname(path), "slides.txt")
+        with open(list_path, "w") as f:
             for img, dur in zip(existing_images, durations):
-                f.write(f"file '{img}'\n")
+                f.write(f"file '{os.path.abspath(img)}'\n")
                 f.write(f"duration {dur}\n")
 
-        path = "output/lecture.mp4"
-        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with get_encode_slots().acquire(encoder_threads()) as threads:
+            # FFmpeg command to create video from images and add audio
+            cmd = [
+                "ffmpeg",
+                "-f", "concat",
+                "-safe", "0",
+                "-i", list_path,
+                *(track.input_args() if track is not None else ["-i", audio_path]),
+                *encoder_args(threads),
+                "-y",
+                path
+            ]
+
+            if track is not None:
+                run_subprocess(cmd, input=track.buffer(), check=True)
+            else:
+                run_subprocess(cmd, check=True)
+
+        # Clean up the temporary file
+        os.remove(list_path)
+
+        return upload_video(path)
+    except Exception as e:
+        import traceback
+        print(f"Error creating video: {e}")
+        traceback.print_exc()
+        return None
+
+def build_single_pass_command(slide_images, audio_paths, durations, output_path, fps=VIDEO_FPS, threads=None):
+    """
+    Build one ffmpeg command that renders slides and their clips into an MP4.
+
+    Every slide image is looped for exactly its duration and its clip is
+    padded or trimmed to the same length, so slide boundaries stay exact
+    without an intermediate concatenated audio file. audio_paths may also
+    be an AudioTrack, which is read from stdin as the whole narration.
+    """
+    n = len(slide_images)
+    cmd = ["ffmpeg", "-hide_banner", "-loglevel", "error"]
+    for img, dur in zip(slide_images, durations):
+        cmd += ["-loop", "1", "-framerate", str(fps), "-t", f"{dur:.3f}", "-i", img]
+
+    filters = []
+    pairs = []
+    if isinstance(audio_paths, AudioTrack):
+        cmd += audio_paths.input_args()
+        for i in range(n):
+            filters.append(f"[{i}:v]scale=1280:720,setsar=1,format=yuv420p[v{i}]")
+            pairs.append(f"[v{i}]")
+        filters.append(f"{''.join(pairs)}concat=n={n}:v=1:a=0[v]")
+        audio_map = f"{n}:a"
+    else:
+        for clip in audio_paths:
+            cmd += ["-i", clip]
+        for i, dur in enumerate(durations):
+            filters.append(f"[{i}:v]scale=1280:720,setsar=1,format=yuv420p[v{i}]")
+            filters.append(
+                f"[{n + i}:a]aresample=44100,aformat=channel_layouts=mono,"
+                f"apad,atrim=0:{dur:.3f},asetpts=PTS-STARTPTS[a{i}]"
+            )
+            pairs.append(f"[v{i}][a{i}]")
+        filters.append(f"{''.join(pairs)}concat=n={n}:v=1:a=1[v][a]")
+        audio_map = "[a]"
+
+    cmd += [
+        "-filter_complex", ";".join(filters),
+        "-map", "[v]", "-map", audio_map,
+        "-r", str(fps),
+        *encoder_args(threads),
+        "-y", output_path
+    ]
+    return cmd
+
+@timed("create_video_single_pass")
+def create_video_single_pass(slide_images, audio_paths, durations, output_path):
+    """
+    Create a video from slide images and per-slide voiceover clips in one
+    ffmpeg invocation (no combine_audio pass).
+
+    Args:
+        slide_images (list): Slide image paths, in order
+        audio_paths (list or AudioTrack): Voiceover clip of each slide, in
+            order, or the assembled narration piped to ffmpeg
+        durations (list): Duration of each slide in seconds
+        output_path (str): Path of the MP4 to write
+
+    Returns:
+        dict or str: Cloud URL and local path, the local path if the upload
+            failed, or None if the encode failed
+    """
+    try:
+        if not (len(slide_images) == len(audio_paths) == len(durations)):
+            raise ValueError("slide_images, audio_paths and durations must have the same length")
+        track = audio_paths if isinstance(audio_paths, AudioTrack) else None
+        inputs = list(slide_images) + ([] if track is not None else list(audio_paths))
+        missing = [p for p in inputs if not os.path.exists(p)]
+        if missing:
+            raise FileNotFoundError(f"Missing video inputs: {missing}")
+        if not slide_images:
+            raise FileNotFoundError("No valid slide images found")
+
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        with get_encode_slots().acquire(encoder_threads()) as threads:
+            cmd = build_single_pass_command(slide_images, audio_paths, durations, output_path, threads=threads)
+            if track is not None:
+                run_subprocess(cmd, input=track.buffer(), check=True)
+            else:
+                run_subprocess(cmd, check=True)
+
+        return upload_video(output_path)
+    except Exception as e:
+        import traceback
+        print(f"Error creating video: {e}")
+        traceback.print_exc()
+        return None
+
+def frame_counts(durations, fps=VIDEO_FPS):
+    """
+    Number of video frames of each slide. Slide ends are rounded on the
+    running total, so rounding never drifts from the audio.
+    """
+    counts = []
+    elapsed = 0.0
+    for dur in durations:
+        start = round(elapsed * fps)
+        elapsed += dur
+        counts.append(max(round(elapsed * fps) - start, 0))
+    return counts
+
+def _hold_expression(starts):
+    """
+    setpts expression giving input frame N the timestamp starts[N] (in
+    frames), built as a balanced tree of if()s so it stays shallow for
+    long decks.
+    """
+    def build(lo, hi):
+        if hi - lo == 1:
+            return str(starts[lo])
+        mid = (lo + hi) // 2
+        return f"if(lt(N,{mid}),{build(lo, mid)},{build(mid, hi)})"
+    return build(0, len(starts))
+
+def _write_pipe(fd, data):
+    # Runs on its own thread so ffmpeg can read audio and frames in any order
+    try:
+        with open(fd, "wb") as f:
+            f.write(data)
+    except BrokenPipeError:
+        pass  # ffmpeg exited early; its return code reports why
+
+@timed("create_video_from_frames")
+def create_video_from_frames(frames, audio, durations, output_path, fps=VIDEO_FPS, size=(1280, 720)):
+    """
+    Create a video from in-memory slide frames, without image files.
+
+    Every slide is written to ffmpeg's stdin once, as raw RGB; setpts
+    moves it to the frame its slide starts on and the fps filter repeats
+    it until the next one, so the pipe carries one frame per slide rather
+    than one per video frame. An AudioTrack goes through a second pipe
+    passed to ffmpeg as an extra file descriptor.
+
+    Args:
+        frames (iterable): PIL images of the slides, in order; consumed
+            lazily, so only one is held at a time
+        audio (AudioTrack or str): The narration, or the path of an audio file
+        durations (list): Duration of each slide in seconds
+        output_path (str): Path of the MP4 to write
+
+    Returns:
+        dict or str: Cloud URL and local path, the local path if the upload
+            failed, or None if the encode failed
+    """
+    try:
+        track = audio if isinstance(audio, AudioTrack) else None
+        if track is None and not os.path.exists(audio):
+            raise FileNotFoundError(f"Audio file not found: {audio}")
+        if not durations:
+            raise ValueError("No slides to encode")
+
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        width, height = size
+        counts = frame_counts(durations, fps)
+        # Start frame of every slide that gets any frames, then the end, where
+        # the last slide is written a second time to hold it until then
+        starts = []
+        elapsed = 0
+        for count in counts:
+            if count:
+                starts.append(elapsed)
+            elapsed += count
+        starts.append(elapsed)
+        with get_encode_slots().acquire(encoder_threads()) as threads:
+            read_fd = None
+            if track is not None:
+                read_fd, write_fd = os.pipe()
+                audio_args = track.input_args(f"pipe:{read_fd}")
+            else:
+                audio_args = ["-i", audio]
+            cmd = [
+                "ffmpeg", "-hide_banner", "-loglevel", "error",
+                "-f", "rawvideo", "-pix_fmt", "rgb24", "-s", f"{width}x{height}",
+                "-framerate", str(fps), "-i", "pipe:0",
+                *audio_args,
+                "-map", "0:v", "-map", "1:a",
+                "-vf", f"setpts='{_hold_expression(starts)}',fps={fps}",
+                "-frames:v", str(elapsed),
+                "-r", str(fps),
+                *encoder_args(threads),
+                "-y", output_path
+            ]
+
+            metrics_utils.SUBPROCESSES.inc(command="ffmpeg")
+            try:
+                process = subprocess.Popen(cmd, stdin=subprocess.PIPE,
+                                           pass_fds=(read_fd,) if read_fd is not None else ())
+            except BaseException:
+                if read_fd is not None:
+                    os.close(write_fd)
+                raise
+            finally:
+                # ffmpeg holds its own copy of the read end
+                if read_fd is not None:
+                    os.close(read_fd)
+            writer = None
+            if track is not None:
+                writer = threading.Thread(target=_write_pipe, args=(write_fd, track.buffer()), daemon=True)
+                writer.start()
+
+            try:
+                frame = None
+                for image, count in zip(frames, counts):
+                    if not count:
+                        continue
+                    if image.size != size or image.mode != "RGB":
+                        image = image.convert("RGB").resize(size)
+                    frame = image.tobytes()
+                    process.stdin.write(frame)
+                if frame is not None:
+                    process.stdin.write(frame)
+            except BrokenPipeError:
+                pass
+            finally:
+                # Also on errors, so ffmpeg never waits for frames that will not come
+                try:
+                    process.stdin.close()
+                except BrokenPipeError:
+                    pass
+                returncode = process.wait()
+                if writer is not None:
+                    writer.join()
+            if returncode != 0:
+                raise subprocess.CalledProcessError(returncode, cmd[0])
+
+        return upload_video(output_path)
+    except Exception as e:
+        import traceback
+        print(f"Error creating video: {e}")
+        traceback.print_exc()
+        return None
 
-        # FFmpeg command to create video from images and add audio
+@timed("encode_segment")
+def encode_segment(slide_image, duration, output_path, fps=VIDEO_FPS, threads=None):
+    """
+    Encode one slide into a standalone, video-only MP4 segment of
+    round(duration * fps) frames. Segments share encoder settings so they
+    can be joined with stream copy; the narration is added once by
+    concat_segments(), since per-segment AAC streams would each bring their
+    own encoder priming and drift at every slide boundary.
+
+    Returns:
+        str: output_path
+    """
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    with get_encode_slots().acquire(threads or encoder_threads()) as granted:
         cmd = [
-            "ffmpeg",
-            "-f", "concat",
-            "-safe", "0",
-            "-i", "slides.txt",
-            "-i", audio_path,
-            "-c:v", "libx264",
-            "-c:a", "aac",
-            "-y",
-            path
+            "ffmpeg", "-hide_banner", "-loglevel", "error",
+            "-loop", "1", "-framerate", str(fps), "-i", slide_image,
+            "-vf", "scale=1280:720,setsar=1,format=yuv420p",
+            "-frames:v", str(max(1, round(duration * fps))),
+            "-r", str(fps),
+            *encoder_args(granted, audio=False),
+            "-y", output_path
         ]
+        run_subprocess(cmd, check=True)
+    return output_path
 
-        subprocess.run(cmd, check=True)
+def segment_key(slide_image, duration, fps=VIDEO_FPS):
+    """Content hash identifying the encoded segment of a slide."""
+    return content_key(file_digest(slide_image), max(1, round(duration * fps)),
+                       fps, VIDEO_PRESET, VIDEO_TUNE, VIDEO_CRF, SEGMENT_VERSION)
 
-        # Clean up the temporary file
-        os.remove("slides.txt")
+def cached_segment(slide_image, duration, output_path, threads=None):
+    """
+    encode_segment() through the segment cache: an identical slide encoded
+    by any lecture is linked into place instead of being encoded again.
 
-        try:
-            from services.cloud_service import upload_file
-            upload_result = upload_file(path, resource_type="video")
-            if upload_result:
-                return {"cloud_url": upload_result["secure_url"], "local_path": path}
-        except Exception as e:
-            print(f"Cloudinary upload failed: {e}")
+    Returns:
+        str: output_path
+    """
+    cache = get_segment_cache()
+    key = segment_key(slide_image, duration) if cache else None
+    if cache and cache.get(key, output_path) is not None:
+        return output_path
+    encode_segment(slide_image, duration, output_path, threads=threads)
+    if cache:
+        cache.put(key, output_path)
+    return output_path
+
+@timed("create_video_segmented")
+def create_video_segmented(slide_images, audio, durations, output_path, segment_paths=None):
+    """
+    Create a video by encoding every slide as its own video-only segment,
+    several at a time, joining the segments with stream copy and adding
+    the narration in that same final pass.
 
-        return path
+    The job encodes up to its share of the cores (encoder_threads()) worth
+    of VIDEO_SEGMENT_THREADS-thread segments at once; the host-wide encode
+    slots keep concurrent jobs from oversubscribing the machine.
+
+    Segments are written to segment_paths and kept when it is given (so
+    lecture edits can reuse them); otherwise they go to a scratch
+    directory that is removed after the join.
+
+    Args:
+        slide_images (list): Slide image paths, in order
+        audio (AudioTrack or str): The narration (its slide durations then
+            take precedence), or the path of an audio file
+        durations (list): Duration of each slide in seconds
+        output_path (str): Path of the MP4 to write
+        segment_paths (list, optional): Where to keep the segment of each slide
+
+    Returns:
+        dict or str: Cloud URL and local path, the local path if the upload
+            failed, or None if the encode failed
+    """
+    try:
+        track = audio if isinstance(audio, AudioTrack) else None
+        if track is not None:
+            durations = track.durations
+        elif not os.path.exists(audio):
+            raise FileNotFoundError(f"Audio file not found: {audio}")
+        if len(slide_images) != len(durations):
+            raise ValueError("slide_images and durations must have the same length")
+        missing = [p for p in slide_images if not os.path.exists(p)]
+        if missing:
+            raise FileNotFoundError(f"Missing video inputs: {missing}")
+        if not slide_images:
+            raise FileNotFoundError("No valid slide images found")
+
+        segment_dir = None
+        segments = segment_paths
+        if segments is None:
+            segment_dir = os.path.join(os.path.dirname(output_path), "segments")
+            segments = [os.path.join(segment_dir, f"segment_{i}.mp4") for i in range(len(slide_images))]
+        threads = max(1, VIDEO_SEGMENT_THREADS)
+        workers = max(1, min(encoder_threads() // threads, len(segments)))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # list() surfaces the first failed segment
+            list(executor.map(lambda args: cached_segment(*args, threads=threads),
+                              zip(slide_images, durations, segments)))
+
+        concat_segments(segments, output_path, audio=audio)
+        if segment_dir is not None:
+            # The cache keeps its own link to every segment
+            for segment in segments:
+                os.remove(segment)
+            os.rmdir(segment_dir)
+
+        return upload_video(output_path)
     except Exception as e:
         import traceback
         print(f"Error creating video: {e}")
         traceback.print_exc()
         return None
 
+@timed("concat_segments")
+def concat_segments(segment_paths, output_path, audio=None):
+    """
+    Join MP4 segments into one video without re-encoding them (-c:v copy).
+
+    audio is the narration of the whole video, an AudioTrack piped to
+    ffmpeg's stdin or the path of an audio file; it is encoded once here,
+    so the slide boundaries carry no per-segment AAC priming.
+
+    Returns:
+        str: output_path
+    """
+    list_path = output_path + ".txt"
+    with open(list_path, "w") as f:
+        for segment in segment_paths:
+            f.write(f"file '{os.path.abspath(segment)}'\n")
+
+    track = audio if isinstance(audio, AudioTrack) else None
+    cmd = [
+        "ffmpeg", "-hide_banner", "-loglevel", "error",
+        "-f", "concat",
+        "-safe", "0",
+        "-i", list_path
+    ]
+    if audio is None:
+        cmd += ["-c", "copy"]
+    else:
+        cmd += [
+            *(track.input_args() if track is not None else ["-i", audio]),
+            "-map", "0:v", "-map", "1:a",
+            "-c:v", "copy", "-c:a", "aac"
+        ]
+    cmd += ["-movflags", "+faststart", "-y", output_path]
+    try:
+        run_subprocess(cmd, input=track.buffer() if track is not None else None, check=True)
+    finally:
+        os.remove(list_path)
+    return output_path
+
 def create_video_without_audio(slide_images, output_path=None):
     """
     Create a video from slide images without audio using FFmpeg.
@@ -72,27 +523,29 @@ def create_video_without_audio(slide_images, output_path=None):
             output_path = "output/lecture_no_audio.mp4"
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
 
-        # Create a temporary file for ffmpeg concat demuxer
-        with open("slides_no_audio.txt", "w") as f:
+        # Create a temporary file for ffmpeg concat demuxer next to the output
+        list_path = os.path.join(os.path.dirname(output_path), "slides_no_audio.txt")
+        with open(list_path, "w") as f:
             for img in existing_images:
-                f.write(f"file '{img}'\n")
+                f.write(f"file '{os.path.abspath(img)}'\n")
                 f.write("duration 5\n")
 
-        # FFmpeg command to create video from images
-        cmd = [
-            "ffmpeg",
-            "-f", "concat",
-            "-safe", "0",
-            "-i", "slides_no_audio.txt",
-            "-c:v", "libx264",
-            "-y",
-            output_path
-        ]
+        with get_encode_slots().acquire(encoder_threads()) as threads:
+            # FFmpeg command to create video from images
+            cmd = [
+                "ffmpeg",
+                "-f", "concat",
+                "-safe", "0",
+                "-i", list_path,
+                *encoder_args(threads),
+                "-y",
+                output_path
+            ]
 
-        subprocess.run(cmd, check=True)
+            run_subprocess(cmd, check=True)
 
         # Clean up the temporary file
-        os.remove("slides_no_audio.txt")
+        os.remove(list_path)
 
         return output_path
     except Exception as e:
@@ -101,13 +554,75 @@ def create_video_without_audio(slide_images, output_path=None):
         traceback.print_exc()
         return None
 
+@timed("get_media_duration")
 def get_media_duration(file_path):
     """
-    Get the duration of a media file using FFmpeg.
+    Get the duration of a media file.
+
+    MP3 and WAV files are measured in-process from their headers; other
+    formats fall back to ffprobe and then ffmpeg.
     
     Args:
         file_path (str): Path to the media file
         
+    Returns:
+        float: Duration in seconds, or None if there's an error
+    """
+    try:
+        # Check if file exists
+        if not os.path.exists(file_path):
+            print(f"File not found: {file_path}")
+            return None
+
+        duration = probe_duration(file_path)
+        if duration:
+            return duration
+        return get_duration_with_ffprobe(file_path)
+    except Exception as e:
+        print(f"Error getting media duration: {e}")
+        return None
+
+def get_media_durations(file_paths, max_workers=4):
+    """
+    Get the durations of several media files in one call.
+
+    Files understood by the native probe are measured in-process; only the
+    remaining ones spawn ffprobe, concurrently.
+
+    Args:
+        file_paths (list): Paths to the media files
+        max_workers (int): Maximum number of concurrent subprocess probes
+
+    Returns:
+        list: Duration in seconds (or None) for each path, in order
+    """
+    durations = []
+    pending = []
+    for i, file_path in enumerate(file_paths):
+        duration = None
+        try:
+            if os.path.exists(file_path):
+                duration = probe_duration(file_path)
+        except Exception as e:
+            print(f"Native duration probe failed for {file_path}: {e}")
+        durations.append(duration)
+        if not duration and os.path.exists(file_path):
+            pending.append(i)
+
+    if pending:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pending)))) as executor:
+            for i, duration in zip(pending, executor.map(get_duration_with_ffprobe,
+                                                         [file_paths[i] for i in pending])):
+                durations[i] = duration
+    return durations
+
+def get_duration_with_ffprobe(file_path):
+    """
+    Get the duration of a media file using ffprobe.
+
+    Args:
+        file_path (str): Path to the media file
+
     Returns:
         float: Duration in seconds, or None if there's an error
     """
@@ -125,7 +640,7 @@ def get_media_duration(file_path):
             file_path
         ]
         
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        result = run_subprocess(cmd, capture_output=True, text=True, timeout=30)
         if result.returncode == 0:
             duration = result.stdout.strip()
             if duration:
@@ -160,14 +675,15 @@ def get_duration_with_ffmpeg_fallback(file_path):
         if not os.path.exists(file_path):
             return None
             
+        # Without an output ffmpeg only reads the container header and prints
+        # the input info (exiting non-zero), so nothing gets decoded
         cmd = [
             "ffmpeg",
-            "-i", file_path,
-            "-f", "null",
-            "-"
+            "-hide_banner",
+            "-i", file_path
         ]
         
-        result = subprocess.run(cmd, capture_output=True, text=True, timeout=30)
+        result = run_subprocess(cmd, capture_output=True, text=True, timeout=30)
         # Parse duration from ffmpeg output
         import re
         duration_match = re.search(r"Duration: (\d{2}):(\d{2}):(\d{2}\.\d{2})", result.stderr)
@@ -1,15 +1,248 @@
-from gtts import gTTS
-import subprocess
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from config.config import (VOICE_CONCURRENCY, VOICE_RETRIES,
+                           TTS_CACHE_ENABLED, TTS_CACHE_DIR, TTS_CACHE_MAX_BYTES)
+from services.tts_service import get_tts_engine
+from utils.cache_utils import FileCache, content_key
+from utils.metrics_utils import timed, run_subprocess
 
-def generate_voiceover(script_text, path):
-    tts = gTTS(text=script_text, lang='en', slow=False)
-    tts.save(path)
-    return path
+_tts_cache = None
+_tts_cache_lock = threading.Lock()
+
+def get_tts_cache():
+    """Return the process-wide TTS clip cache, or None when disabled."""
+    global _tts_cache
+    if not TTS_CACHE_ENABLED:
+        return None
+    with _tts_cache_lock:
+        if _tts_cache is None:
+            _tts_cache = FileCache(TTS_CACHE_DIR, TTS_CACHE_MAX_BYTES, ext=get_tts_engine().ext)
+        return _tts_cache
+
+@timed("generate_voiceover")
+def generate_voiceover(script_text, path, lang='en', slow=False):
+    return get_tts_engine().synthesize(script_text, path, lang=lang, slow=slow)
+
+@timed("generate_voiceover_batch")
+def generate_voiceover_batch(items, lang='en', slow=False):
+    """Synthesize every (script_text, path) clip of items in one engine call."""
+    return get_tts_engine().synthesize_batch(items, lang=lang, slow=slow)
+
+def voiceover_ext():
+    """File extension of the clips written by the configured TTS engine."""
+    return get_tts_engine().ext
+
+def _with_retries(label, retries, call):
+    for attempt in range(retries + 1):
+        try:
+            return call()
+        except Exception as e:
+            if attempt == retries:
+                raise
+            delay = 2 ** attempt
+            print(f"Voiceover for {label} failed ({e}), retrying in {delay}s")
+            time.sleep(delay)
+
+def _clip_key(script_text, lang, slow):
+    return content_key(script_text, lang, slow, get_tts_engine().cache_id)
+
+def synthesize_voiceover(script_text, path, lang='en', slow=False, retries=0):
+    """
+    Write the voiceover of script_text to path and return its duration.
+
+    Clips are served from the TTS cache when the same text was synthesized
+    before, which skips both the TTS engine and the duration probe.
+
+    Returns:
+        float: Duration in seconds, or None if it could not be measured
+    """
+    from services.video_service import get_media_duration
+
+    cache = get_tts_cache()
+    key = _clip_key(script_text, lang, slow)
+    if cache:
+        meta = cache.get(key, path)
+        if meta is not None:
+            return meta.get("duration")
+
+    # The path may be a hard link into the TTS cache, never write through it
+    if os.path.exists(path):
+        os.remove(path)
+
+    _with_retries(path, retries, lambda: generate_voiceover(script_text, path, lang=lang, slow=slow))
+
+    duration = get_media_duration(path)
+    if cache and duration:
+        cache.put(key, path, {"duration": duration})
+    return duration
+
+def synthesize_voiceovers(items, lang='en', slow=False, retries=0):
+    """
+    Batched synthesize_voiceover(): write every (script_text, path) clip of
+    items and return their durations in order. Cache hits are linked in
+    directly and the misses go to the TTS engine in a single batch.
+    """
+    from services.video_service import get_media_durations
+
+    cache = get_tts_cache()
+    durations = [None] * len(items)
+    missing = []
+    for i, (script_text, path) in enumerate(items):
+        key = _clip_key(script_text, lang, slow)
+        meta = cache.get(key, path) if cache else None
+        if meta is not None:
+            durations[i] = meta.get("duration")
+            continue
+        if os.path.exists(path):
+            os.remove(path)
+        missing.append((i, key, script_text, path))
+
+    if missing:
+        batch = [(script_text, path) for _, _, script_text, path in missing]
+        _with_retries(f"{len(batch)} clips", retries, lambda: generate_voiceover_batch(batch, lang=lang, slow=slow))
+        measured = get_media_durations([path for _, _, _, path in missing])
+        for (i, key, _, path), duration in zip(missing, measured):
+            durations[i] = duration
+            if cache and durations[i]:
+                cache.put(key, path, {"duration": durations[i]})
+    return durations
+
+def _synthesize_slide(script_text, path, retries):
+    """Synthesize one clip with retries and return (path, duration)."""
+    return path, synthesize_voiceover(script_text, path, retries=retries)
+
+class VoiceoverBatch:
+    """
+    Concurrent voiceover synthesis for slides that may arrive one at a time.
+
+    Scripts are submitted as soon as they are known (for example while the
+    lecture is still being streamed from the LLM) and synthesized on a
+    bounded thread pool; results() waits for all of them in slide order.
+
+    With a batched TTS engine a single worker synthesizes instead, each
+    time taking every script queued since its previous batch, so slides
+    that arrive together share one engine call.
+    """
+
+    def __init__(self, output_dir, max_workers=VOICE_CONCURRENCY, retries=VOICE_RETRIES, on_clip=None):
+        self.output_dir = output_dir
+        self.retries = retries
+        self.on_clip = on_clip
+        engine = get_tts_engine()
+        self.ext = engine.ext
+        self.batched = engine.batched
+        self._executor = ThreadPoolExecutor(max_workers=1 if self.batched else max(1, max_workers))
+        self._futures = {}
+        self._pending = []
+        self._pending_lock = threading.Lock()
+
+    def submit(self, index, script):
+        """Start synthesizing the clip of slide `index` (no-op if unchanged)."""
+        if self._queue(index, script) and self.batched:
+            self._executor.submit(self._drain)
+
+    def submit_all(self, scripts):
+        """Submit the clip of every slide; a batched engine gets them as one batch."""
+        queued = [self._queue(i, script) for i, script in enumerate(scripts)]
+        if any(queued) and self.batched:
+            self._executor.submit(self._drain)
+
+    def _queue(self, index, script):
+        previous = self._futures.get(index)
+        if previous is not None:
+            if previous[0] == script:
+                return False
+            # The script changed: let the stale clip finish before overwriting it
+            if not previous[1].cancel():
+                previous[1].exception()
+
+        path = os.path.join(self.output_dir, f"voiceover_{index}{self.ext}")
+        if self.batched:
+            future = Future()
+            with self._pending_lock:
+                self._pending.append((script, path, future))
+        else:
+            future = self._executor.submit(_synthesize_slide, script, path, self.retries)
+        if self.on_clip:
+            future.add_done_callback(
+                lambda f: f.cancelled() or f.exception() or self.on_clip(index, path, f.result()[1])
+            )
+        self._futures[index] = (script, future)
+        return True
+
+    def _drain(self):
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+        # Clips replaced or abandoned while queued are already cancelled
+        pending = [item for item in pending if item[2].set_running_or_notify_cancel()]
+        if not pending:
+            return
+        try:
+            durations = synthesize_voiceovers([(script, path) for script, path, _ in pending],
+                                              retries=self.retries)
+        except Exception as e:
+            for _, _, future in pending:
+                future.set_exception(e)
+            return
+        for (_, path, future), duration in zip(pending, durations):
+            future.set_result((path, duration))
+
+    def close(self):
+        """Abandon clips that have not started yet (used when the pipeline fails)."""
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        with self._pending_lock:
+            pending, self._pending = self._pending, []
+        for _, _, future in pending:
+            future.cancel()
+
+    def results(self, count):
+        """
+        Wait for clips 0..count-1.
+
+        Returns:
+            tuple: (voice_paths, durations) in slide order
+        """
+        try:
+            results = [self._futures[i][1].result() for i in range(count)]
+        except BaseException:
+            self.close()
+            raise
+        self._executor.shutdown(wait=True)
+        return [path for path, _ in results], [duration for _, duration in results]
+
+def generate_voiceovers(scripts, output_dir, max_workers=VOICE_CONCURRENCY, retries=VOICE_RETRIES,
+                        on_clip=None):
+    """
+    Synthesize the voiceover of every slide concurrently.
+
+    Args:
+        scripts (list): Narration script of each slide, in slide order
+        output_dir (str): Directory the clips are written to
+        max_workers (int): Maximum number of clips synthesized at once
+        retries (int): Extra attempts for a clip whose synthesis fails
+        on_clip (callable, optional): Called as on_clip(index, path, duration)
+            as soon as each clip is ready, in completion order
+
+    Returns:
+        tuple: (voice_paths, durations) in slide order; a duration is None
+            when it could not be measured
+    """
+    if not scripts:
+        return [], []
+
+    batch = VoiceoverBatch(output_dir, max_workers=min(max_workers, len(scripts)),
+                           retries=retries, on_clip=on_clip)
+    batch.submit_all(scripts)
+    return batch.results(len(scripts))
 
 def combine_audio(audio_paths, output_path):
-    with open("concat_list.txt", "w") as f:
+    # Keep the concat list next to the output so concurrent runs don't share it
+    list_path = os.path.join(os.path.dirname(output_path), "concat_list.txt")
+    with open(list_path, "w") as f:
         for path in audio_paths:
-            f.write(f"file '{path}'\n")
+            f.write(f"file '{os.path.abspath(path)}'\n")
 
     command = [
         "ffmpeg",
@@ -18,11 +251,11 @@ def combine_audio(audio_paths, output_path):
         "-safe",
         "0",
         "-i",
-        "concat_list.txt",
+        list_path,
         "-c",
         "copy",
         output_path,
         "-y"
     ]
-    subprocess.run(command, check=True)
-    return output_path
\ No newline at end of file
+    run_subprocess(command, check=True)
+    return output_path
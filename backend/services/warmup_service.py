@@ -0,0 +1,116 @@
+import threading
+import time
+
+from config.config import WARMUP, TTS_ENGINE, AUDIO_PCM
+
+THEMES = ("Minimalist", "Chalkboard", "Corporate")
+# Font sizes used by the slide renderer (title, body)
+FONT_SIZES = (36, 24)
+
+_state = {"status": "pending", "started_at": None, "finished_at": None, "steps": {}, "errors": {}}
+_lock = threading.Lock()
+_started = False
+
+
+def _import_pipeline():
+    # The modules behind /generate pull in python-pptx, Pillow and gTTS
+    import controllers.generate_controller  # noqa: F401
+    import controllers.batch_controller  # noqa: F401
+    import controllers.lecture_controller  # noqa: F401
+    if TTS_ENGINE == "gtts":
+        import gtts  # noqa: F401
+    if AUDIO_PCM:
+        import numpy  # noqa: F401
+
+
+def _load_fonts():
+    from services.render_service import FONT_FILES, get_font, _theme_style
+
+    for theme in THEMES:
+        _theme_style(theme)
+    for name in FONT_FILES:
+        for size in FONT_SIZES:
+            get_font(name, size)
+
+
+def _load_theme_templates():
+    from services.slide_service import get_template
+
+    for theme in THEMES:
+        get_template(theme)
+
+
+def _create_clients():
+    from services.ai_service import get_client
+    from services.storage_service import get_storage
+    from services.summarizer_service import get_summarizer
+    from services.tts_service import get_tts_engine
+    from services.upload_service import get_upload_manager
+
+    get_client()
+    get_upload_manager()
+    get_storage()
+    get_summarizer()
+    # Only the engine object: a piper process started before fork would be shared by the workers
+    get_tts_engine()
+
+
+STEPS = [
+    ("imports", _import_pipeline),
+    ("fonts", _load_fonts),
+    ("theme_templates", _load_theme_templates),
+    ("clients", _create_clients),
+]
+
+
+def warm_up():
+    """
+    Load everything the first request would otherwise wait for. A failing
+    step is recorded and skipped; the work it would have done then happens
+    lazily on first use, as without warm-up.
+
+    Returns:
+        dict: The warm-up state (see get_state)
+    """
+    with _lock:
+        _state.update(status="warming_up", started_at=time.time())
+    for name, step in STEPS:
+        start = time.perf_counter()
+        try:
+            step()
+        except Exception as e:
+            print(f"Warm-up step {name} failed: {e}")
+            _state["errors"][name] = str(e)
+        _state["steps"][name] = round(time.perf_counter() - start, 3)
+    with _lock:
+        _state.update(status="ready", finished_at=time.time())
+    print(f"Warm-up finished in {_state['finished_at'] - _state['started_at']:.2f}s")
+    return get_state()
+
+
+def start_warmup(mode=WARMUP):
+    """Warm up according to WARMUP ("off", "background" or "blocking"); runs once per process."""
+    global _started
+    with _lock:
+        if _started or mode == "off":
+            return
+        _started = True
+    if mode == "blocking":
+        warm_up()
+    else:
+        threading.Thread(target=warm_up, name="warmup", daemon=True).start()
+
+
+def is_ready():
+    return WARMUP == "off" or _state["status"] == "ready"
+
+
+def get_state():
+    with _lock:
+        return {
+            "status": "ready" if is_ready() else _state["status"],
+            "mode": WARMUP,
+            "steps": dict(_state["steps"]),
+            "errors": dict(_state["errors"]),
+            "seconds": round(_state["finished_at"] - _state["started_at"], 3) if _state["finished_at"] else None
+        }
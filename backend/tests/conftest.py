@@ -0,0 +1,25 @@
+import os
+import sys
+
+import pytest
+
+# Tests import the backend packages the way app.py does, from backend/
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def fake_cloudinary():
+    from benchmarks.fake_cloudinary import FakeCloudinary
+
+    fake = FakeCloudinary().start()
+    yield fake
+    fake.stop()
+
+
+@pytest.fixture
+def mock_summarizer():
+    from benchmarks.mock_summarizer import MockSummarizer
+
+    mock = MockSummarizer().start()
+    yield mock
+    mock.stop()
@@ -0,0 +1,43 @@
+import struct
+
+import pytest
+
+from utils.audio_utils import mp3_duration
+
+# MPEG-1 Layer III, 128 kbps, 44.1 kHz, no padding, stereo: 417-byte frames of 1152 samples
+HEADER = b"\xff\xfb\x90\x44"
+FRAME = HEADER + b"\x00" * 413
+
+
+def _xing_frame(frames):
+    # Xing tag after the 32 bytes of stereo MPEG-1 side info, with the frame count flag
+    body = b"\x00" * 32 + b"Xing" + struct.pack(">II", 1, frames)
+    return HEADER + body + b"\x00" * (413 - len(body))
+
+
+def _id3(payload):
+    size = len(payload)
+    syncsafe = bytes([(size >> 21) & 0x7F, (size >> 14) & 0x7F, (size >> 7) & 0x7F, size & 0x7F])
+    return b"ID3\x04\x00\x00" + syncsafe + payload
+
+
+def test_mp3_duration_sums_frames():
+    assert mp3_duration(FRAME * 100) == pytest.approx(100 * 1152 / 44100)
+
+
+def test_mp3_duration_skips_id3_tags():
+    data = _id3(b"\xff\xfb" * 50) + FRAME * 10 + b"TAG" + b"\x00" * 125
+    assert mp3_duration(data) == pytest.approx(10 * 1152 / 44100)
+
+
+def test_mp3_duration_trusts_the_xing_frame_count():
+    # Only two audio frames follow, but the Xing header speaks for the whole stream
+    assert mp3_duration(_xing_frame(500) + FRAME * 2) == pytest.approx(500 * 1152 / 44100)
+
+
+def test_mp3_duration_resynchronises_after_garbage():
+    assert mp3_duration(b"\x00\xff\x12" * 7 + FRAME * 5) == pytest.approx(5 * 1152 / 44100)
+
+
+def test_mp3_duration_without_frames():
+    assert mp3_duration(b"RIFF" + b"\x00" * 100) is None
@@ -0,0 +1,77 @@
+import json
+
+import pytest
+
+from utils.json_utils import SlideStreamParser, loads_lenient, repair_truncated_json
+
+LECTURE = {
+    "slides": [
+        {"title": "Intro", "content": ["a {brace} in text", "quote \" inside"], "script": "One"},
+        {"title": "Middle", "content": ["[nested]"], "script": "Two"},
+        {"title": "End", "content": [], "script": "Three"},
+    ],
+    "quiz": [{"question": "Q?", "options": ["x", "y"], "answer": 0}],
+}
+
+
+def _stream(text, size):
+    parser = SlideStreamParser()
+    slides = []
+    for start in range(0, len(text), size):
+        slides.extend(parser.feed(text[start:start + size]))
+    return parser, slides
+
+
+@pytest.mark.parametrize("size", [1, 2, 7, 64, 10000])
+def test_stream_parser_yields_every_slide_once_in_order(size):
+    text = "```json\n" + json.dumps(LECTURE, indent=2) + "\n```"
+    parser, slides = _stream(text, size)
+    assert [index for index, _ in slides] == [0, 1, 2]
+    assert [slide for _, slide in slides] == LECTURE["slides"]
+    assert "".join(parser.text) == text
+
+
+def test_stream_parser_indexes_several_slides_completed_by_one_chunk():
+    text = json.dumps(LECTURE)
+    cut = text.index('"End"')
+    parser = SlideStreamParser()
+    first = parser.feed(text[:cut])
+    rest = parser.feed(text[cut:])
+    assert [index for index, _ in first] == [0, 1]
+    assert [index for index, _ in rest] == [2]
+
+
+def test_stream_parser_ignores_objects_outside_the_slides_array():
+    parser, slides = _stream(json.dumps({"quiz": [{"title": "not a slide"}], "slides": []}), 5)
+    assert slides == []
+
+
+def test_repair_truncated_json_drops_the_partial_element():
+    text = json.dumps(LECTURE)
+    truncated = text[:text.index('"End"') + 3]
+    repaired = json.loads(repair_truncated_json(truncated))
+    assert repaired["slides"] == LECTURE["slides"][:2]
+
+
+def test_repair_truncated_json_returns_complete_documents_unchanged():
+    text = json.dumps(LECTURE)
+    assert repair_truncated_json(text + " trailing") == text
+
+
+def test_repair_truncated_json_without_a_complete_element():
+    assert repair_truncated_json('{"slides": [{"title": "cut') is None
+
+
+def test_loads_lenient_skips_prose_and_fences():
+    reply = "Here is your lecture:\n```json\n" + json.dumps(LECTURE) + "\n```\nEnjoy!"
+    assert loads_lenient(reply) == LECTURE
+
+
+def test_loads_lenient_repairs_truncation():
+    text = json.dumps(LECTURE)
+    assert loads_lenient(text[:text.index('"quiz"')])["slides"] == LECTURE["slides"]
+
+
+def test_loads_lenient_rejects_replies_without_json():
+    with pytest.raises(ValueError):
+        loads_lenient("Sorry, I can't help with that.")
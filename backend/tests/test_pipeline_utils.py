@@ -0,0 +1,54 @@
+import threading
+
+import pytest
+
+from utils.pipeline_utils import Pipeline, Stage
+
+
+def test_pipeline_passes_stage_results_to_dependents():
+    pipeline = Pipeline([
+        Stage("double", lambda x: x * 2, inputs=("x",)),
+        Stage("total", lambda x, double: x + double, inputs=("x", "double")),
+    ])
+    values, timings = pipeline.run({"x": 3})
+    assert values["total"] == 9
+    assert set(timings) == {"double", "total"}
+
+
+def test_pipeline_runs_independent_stages_concurrently():
+    barrier = threading.Barrier(2, timeout=5)
+    pipeline = Pipeline([
+        Stage("a", lambda: barrier.wait()),
+        Stage("b", lambda: barrier.wait()),
+    ])
+    pipeline.run({})
+
+
+def test_pipeline_failure_stops_new_stages_and_reraises():
+    events = []
+    started = threading.Event()
+
+    def fail():
+        started.wait(5)
+        raise RuntimeError("boom")
+
+    pipeline = Pipeline([
+        Stage("slow", lambda: started.set() or "slow"),
+        Stage("fail", fail),
+        Stage("after", lambda fail: events.append("after ran"), inputs=("fail",)),
+    ])
+    with pytest.raises(RuntimeError, match="boom"):
+        pipeline.run({}, on_stage=lambda name, status: events.append((name, status)))
+    assert ("fail", "failed") in events
+    assert ("after", "running") not in events
+    assert "after ran" not in events
+
+
+def test_pipeline_rejects_unsatisfiable_inputs():
+    with pytest.raises(ValueError, match="missing"):
+        Pipeline([Stage("a", lambda missing: None, inputs=("missing",))]).run({})
+
+
+def test_pipeline_rejects_duplicate_stages():
+    with pytest.raises(ValueError):
+        Pipeline([Stage("a", lambda: None), Stage("a", lambda: None)])
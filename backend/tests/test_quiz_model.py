@@ -0,0 +1,38 @@
+import pytest
+
+from models.quiz_model import Quiz, resolve_answer
+
+OPTIONS = ["Mitochondria", "Chloroplasts", "Nucleus", "Cell membrane"]
+
+
+@pytest.mark.parametrize("answer, expected", [
+    (1, 1),
+    ("Chloroplasts", 1),
+    ("  chloroplasts. ", 1),
+    ("B) Chloroplasts", 1),
+    ("c", 2),
+    ("(D)", 3),
+    ("Option A", 0),
+])
+def test_resolve_answer(answer, expected):
+    assert resolve_answer(answer, OPTIONS) == expected
+
+
+def test_resolve_answer_strips_lettered_options():
+    assert resolve_answer("Nucleus", ["A) Mitochondria", "B) Nucleus"]) == 1
+
+
+@pytest.mark.parametrize("answer", [4, -1, True, "Ribosome", "e", None])
+def test_resolve_answer_rejects_unknown_answers(answer):
+    with pytest.raises(ValueError):
+        resolve_answer(answer, OPTIONS)
+
+
+def test_quiz_from_dict_accepts_the_correct_key():
+    quiz = Quiz.from_dict({"question": "Where?", "options": OPTIONS, "correct": "Nucleus"})
+    assert quiz.to_dict() == {"question": "Where?", "options": OPTIONS, "correct": 2}
+
+
+def test_quiz_from_dict_needs_two_options():
+    with pytest.raises(ValueError):
+        Quiz.from_dict({"question": "Where?", "options": ["Only"], "answer": 0})
@@ -0,0 +1,106 @@
+import io
+import json
+
+import pytest
+
+from services import summarizer_service
+from services.summarizer_service import (CircuitBreaker, CircuitOpenError, SummarizerClient,
+                                         SummarizerError)
+from utils.cache_utils import FileCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(summarizer_service.time, "monotonic", clock)
+    return clock
+
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+    breaker.record_failure()
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+
+def test_breaker_success_resets_the_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == "closed"
+
+
+def test_breaker_lets_one_trial_through_when_half_open(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.state == "half_open"
+    breaker.before_call()
+    # Only one trial at a time
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_breaker_failed_trial_opens_again(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now += 31
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == "open"
+
+
+def _summary(body):
+    data = body if isinstance(body, bytes) else b"".join(body)
+    return json.loads(data)["result"]["raw_output"]
+
+
+def test_client_summarizes_text_and_files(mock_summarizer):
+    client = SummarizerClient(url=mock_summarizer.url)
+    text = "photosynthesis notes"
+    body, content_type, cached = client.summarize_text(text)
+    assert f"{len(text)} bytes" in _summary(body) and not cached
+    assert content_type == "application/json"
+
+    notes = b"x" * 200000
+    body, _, _ = client.summarize_file(io.BytesIO(notes), "notes.pdf", "application/pdf")
+    assert f"{len(notes)} bytes" in _summary(body)
+    assert mock_summarizer.requests == 2
+
+
+def test_client_serves_repeats_from_the_cache(mock_summarizer, tmp_path):
+    client = SummarizerClient(url=mock_summarizer.url, cache=FileCache(str(tmp_path), 10 ** 6))
+    first, _, cached = client.summarize_text("same notes")
+    first = b"".join(first)
+    assert not cached
+    second, _, cached = client.summarize_text("same notes")
+    assert cached and second == first
+    assert mock_summarizer.requests == 1
+
+
+def test_client_fails_fast_once_the_circuit_opens(mock_summarizer):
+    mock_summarizer.fail_every = 1
+    client = SummarizerClient(url=mock_summarizer.url,
+                              breaker=CircuitBreaker(failure_threshold=2, reset_timeout=60))
+    for _ in range(2):
+        with pytest.raises(SummarizerError):
+            client.summarize_text("notes")
+    with pytest.raises(CircuitOpenError):
+        client.summarize_text("notes")
+    assert mock_summarizer.requests == 2
@@ -0,0 +1,76 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from services.upload_service import UploadManager
+
+
+@pytest.fixture
+def manager(fake_cloudinary):
+    manager = UploadManager(cloud_name="demo", api_key="key", api_secret="secret",
+                            api_base=fake_cloudinary.base_url, delivery_base=fake_cloudinary.base_url,
+                            retries=0, chunk_threshold=1024, chunk_size=400, folder="tests")
+    yield manager
+    manager.close()
+
+
+@pytest.fixture
+def image(tmp_path):
+    path = tmp_path / "slide.png"
+    path.write_bytes(b"\x89PNG" + b"\x01" * 100)
+    return str(path)
+
+
+def test_upload_returns_the_delivery_url(manager, fake_cloudinary, image):
+    result = manager.upload(image)
+    assert result["secure_url"].startswith(fake_cloudinary.base_url + "/demo/image/upload/tests/")
+    assert result["secure_url"].endswith(".png")
+    assert fake_cloudinary.uploads == 1
+
+
+def test_identical_content_is_uploaded_once(manager, fake_cloudinary, image, tmp_path):
+    copy = tmp_path / "copy.png"
+    copy.write_bytes(open(image, "rb").read())
+    first = manager.upload(image)
+    assert manager.upload(str(copy))["secure_url"] == first["secure_url"]
+    assert fake_cloudinary.uploads == 1
+
+
+def test_content_uploaded_by_another_process_is_found_with_head(manager, fake_cloudinary, image):
+    manager.upload(image)
+    other = UploadManager(cloud_name="demo", api_key="key", api_secret="secret",
+                          api_base=fake_cloudinary.base_url, delivery_base=fake_cloudinary.base_url,
+                          folder="tests")
+    assert other.upload(image)["existing"] is True
+    assert fake_cloudinary.uploads == 1
+
+
+def test_concurrent_uploads_of_one_file_share_the_request(manager, fake_cloudinary, image):
+    fake_cloudinary.latency = 0.2
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        results = list(executor.map(lambda _: manager.upload(image), range(4)))
+    assert len({result["secure_url"] for result in results}) == 1
+    assert fake_cloudinary.uploads == 1
+
+
+def test_large_files_are_uploaded_in_chunks(manager, fake_cloudinary, tmp_path):
+    video = tmp_path / "lecture.mp4"
+    data = bytes(range(256)) * 10
+    video.write_bytes(data)
+    result = manager.upload(str(video))
+    assert "/video/upload/" in result["secure_url"]
+    assert fake_cloudinary.assets[result["public_id"]] == data
+    assert fake_cloudinary.bytes_received == len(data)
+
+
+def test_failed_uploads_are_retried_later(manager, fake_cloudinary, image):
+    real_post = manager._post
+
+    def failing_post(*args, **kwargs):
+        raise ConnectionError("network down")
+
+    manager._post = failing_post
+    assert manager.upload(image) is None
+    manager._post = real_post
+    assert manager.upload(image) is not None
+    assert fake_cloudinary.uploads == 1
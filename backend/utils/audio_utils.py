@@ -0,0 +1,207 @@
+import os
+import struct
+import wave
+
+# Bitrates in kbps indexed by [version_is_mpeg1][layer][bitrate_index]
+_BITRATES = {
+    True: {
+        1: [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+        2: [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+        3: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    },
+    False: {
+        1: [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+        2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+        3: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    },
+}
+
+# Sample rates indexed by the two version bits of the frame header
+_SAMPLE_RATES = {
+    0b11: [44100, 48000, 32000],  # MPEG 1
+    0b10: [22050, 24000, 16000],  # MPEG 2
+    0b00: [11025, 12000, 8000],   # MPEG 2.5
+}
+
+
+def _parse_frame_header(data, pos):
+    """
+    Parse the MPEG audio frame header at data[pos:pos + 4].
+
+    Returns:
+        tuple: (frame_length, samples_per_frame, sample_rate, side_info_size,
+            is_mpeg1) or None if the bytes are not a valid header
+    """
+    if pos + 4 > len(data):
+        return None
+    b1, b2, b3 = data[pos + 1], data[pos + 2], data[pos + 3]
+    if data[pos] != 0xFF or (b1 & 0xE0) != 0xE0:
+        return None
+
+    version = (b1 >> 3) & 0b11
+    layer = 4 - ((b1 >> 1) & 0b11)
+    bitrate_index = b2 >> 4
+    rate_index = (b2 >> 2) & 0b11
+    if version == 0b01 or layer == 4 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+
+    is_mpeg1 = version == 0b11
+    bitrate = _BITRATES[is_mpeg1][layer][bitrate_index] * 1000
+    sample_rate = _SAMPLE_RATES[version][rate_index]
+    padding = (b2 >> 1) & 1
+    mono = (b3 >> 6) == 0b11
+
+    if layer == 1:
+        samples = 384
+        length = (12 * bitrate // sample_rate + padding) * 4
+    elif layer == 2 or is_mpeg1:
+        samples = 1152
+        length = 144 * bitrate // sample_rate + padding
+    else:
+        samples = 576
+        length = 72 * bitrate // sample_rate + padding
+
+    if is_mpeg1:
+        side_info = 17 if mono else 32
+    else:
+        side_info = 9 if mono else 17
+    return length, samples, sample_rate, side_info, is_mpeg1
+
+
+def _skip_id3v2(data, pos):
+    """Return the position just after an ID3v2 tag at pos, or pos if there is none."""
+    if data[pos:pos + 3] != b"ID3" or pos + 10 > len(data):
+        return pos
+    flags = data[pos + 5]
+    size = 0
+    for byte in data[pos + 6:pos + 10]:
+        size = (size << 7) | (byte & 0x7F)
+    footer = 10 if flags & 0x10 else 0
+    return pos + 10 + size + footer
+
+
+def mp3_duration(data):
+    """
+    Compute the duration of MP3 data without decoding it.
+
+    Uses the Xing/Info or VBRI header when the first frame carries one,
+    otherwise walks every frame header and sums their sample counts, which
+    is exact for both CBR and VBR streams.
+
+    Args:
+        data (bytes): Contents of the MP3 file
+
+    Returns:
+        float: Duration in seconds, or None if no MPEG audio frame was found
+    """
+    pos = _skip_id3v2(data, 0)
+    end = len(data)
+    if data[-128:-125] == b"TAG":
+        end -= 128
+
+    total_samples = 0
+    sample_rate = None
+    first_frame = True
+
+    while pos < end - 4:
+        header = _parse_frame_header(data, pos)
+        if header is None or header[0] <= 0:
+            # Skip embedded tags and resynchronise on the next frame
+            tag_end = _skip_id3v2(data, pos)
+            if tag_end != pos:
+                pos = tag_end
+                continue
+            pos = data.find(b"\xff", pos + 1, end)
+            if pos < 0:
+                break
+            continue
+
+        length, samples, rate, side_info, is_mpeg1 = header
+        # A lone false sync inside frame data must be followed by another frame
+        if pos + length < end - 4 and _parse_frame_header(data, pos + length) is None \
+                and data[pos + length:pos + length + 3] not in (b"ID3", b"TAG"):
+            pos = data.find(b"\xff", pos + 1, end)
+            if pos < 0:
+                break
+            continue
+
+        if first_frame:
+            first_frame = False
+            frames = _vbr_frame_count(data, pos, side_info)
+            if frames is not None:
+                return frames * samples / rate
+
+        if sample_rate is None:
+            sample_rate = rate
+        total_samples += samples
+        pos += length
+
+    if sample_rate is None:
+        return None
+    return total_samples / sample_rate
+
+
+def _vbr_frame_count(data, pos, side_info):
+    """Return the frame count stored in a Xing/Info or VBRI header, if present."""
+    xing = pos + 4 + side_info
+    if data[xing:xing + 4] in (b"Xing", b"Info"):
+        flags = struct.unpack(">I", data[xing + 4:xing + 8])[0]
+        if flags & 0x1:
+            # The Xing/Info frame itself carries no audio
+            return struct.unpack(">I", data[xing + 8:xing + 12])[0]
+        return None
+    vbri = pos + 4 + 32
+    if data[vbri:vbri + 4] == b"VBRI":
+        return struct.unpack(">I", data[vbri + 14:vbri + 18])[0]
+    return None
+
+
+def wav_duration(path):
+    """Return the duration of a PCM WAV file, or None if it can't be read."""
+    try:
+        with wave.open(path, "rb") as f:
+            return f.getnframes() / float(f.getframerate())
+    except (wave.Error, EOFError):
+        return None
+
+
+def read_wav(path):
+    """
+    Decode a PCM WAV file, mixing multi-channel audio down to mono.
+
+    Returns:
+        tuple: (samples, sample_rate) with samples a float32 NumPy array
+            in [-1, 1]
+    """
+    import numpy as np
+
+    with wave.open(path, "rb") as f:
+        channels, width, rate = f.getnchannels(), f.getsampwidth(), f.getframerate()
+        data = f.readframes(f.getnframes())
+    if width == 1:
+        samples = (np.frombuffer(data, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif width == 2:
+        samples = np.frombuffer(data, dtype="<i2").astype(np.float32) / 32768
+    elif width == 4:
+        samples = np.frombuffer(data, dtype="<i4").astype(np.float32) / 2 ** 31
+    else:
+        raise wave.Error(f"Unsupported WAV sample width: {width * 8} bits")
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return samples, rate
+
+
+def probe_duration(path):
+    """
+    Measure the duration of an audio file in-process.
+
+    Returns:
+        float: Duration in seconds, or None if the format is not supported
+    """
+    ext = os.path.splitext(path)[1].lower()
+    if ext == ".wav":
+        return wav_duration(path)
+    if ext == ".mp3":
+        with open(path, "rb") as f:
+            return mp3_duration(f.read())
+    return None
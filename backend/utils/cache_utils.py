@@ -0,0 +1,457 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+import zlib
+
+from utils.metrics_utils import CACHE_LOOKUPS
+
+
+def content_key(*parts):
+    """Return a stable SHA-256 hex key for a tuple of JSON-serialisable parts."""
+    payload = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class FileCache:
+    """
+    Persistent content-addressed cache of files on disk.
+
+    Each entry is stored as <key><ext> with a <key>.json sidecar holding its
+    metadata. Hits bump the file's mtime, and the least recently used
+    entries are evicted once the cache grows beyond `max_bytes`. The
+    directory can be shared by several processes; hit/miss counters are
+    per process and also exported as metrics labelled with `name`
+    (the directory name by default).
+    """
+
+    def __init__(self, directory, max_bytes, ext="", name=None):
+        self.directory = directory
+        self.name = name or os.path.basename(os.path.normpath(directory))
+        self.max_bytes = max_bytes
+        self.ext = ext
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._bytes = sum(size for _, _, size in self._entries())
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + self.ext)
+
+    def _meta_path(self, key):
+        return os.path.join(self.directory, key + ".json")
+
+    def get(self, key, dest_path):
+        """
+        Materialise a cached file at dest_path.
+
+        Returns:
+            dict: Entry metadata on a hit, or None on a miss
+        """
+        path = self._path(key)
+        try:
+            with open(self._meta_path(key)) as f:
+                meta = json.load(f)
+            _link_or_copy(path, dest_path)
+            os.utime(path)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            CACHE_LOOKUPS.inc(cache=self.name, result="miss")
+            return None
+        with self._lock:
+            self.hits += 1
+        CACHE_LOOKUPS.inc(cache=self.name, result="hit")
+        return meta
+
+    def get_bytes(self, key):
+        """
+        Read a cached entry into memory, for small entries.
+
+        Returns:
+            tuple: (data, meta) on a hit, or None on a miss
+        """
+        path = self._path(key)
+        try:
+            with open(self._meta_path(key)) as f:
+                meta = json.load(f)
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            CACHE_LOOKUPS.inc(cache=self.name, result="miss")
+            return None
+        with self._lock:
+            self.hits += 1
+        CACHE_LOOKUPS.inc(cache=self.name, result="hit")
+        return data, meta
+
+    def put(self, key, src_path, meta=None):
+        """Store a copy of src_path under key with optional metadata."""
+        self._store(key, lambda tmp_path: shutil.copyfile(src_path, tmp_path), meta)
+
+    def put_bytes(self, key, data, meta=None):
+        """Store data under key with optional metadata."""
+        def write(tmp_path):
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+        self._store(key, write, meta)
+
+    def _store(self, key, write, meta):
+        path = self._path(key)
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        try:
+            write(tmp_path)
+            with open(tmp_path + ".json", "w") as f:
+                json.dump(meta or {}, f)
+            os.replace(tmp_path, path)
+            os.replace(tmp_path + ".json", self._meta_path(key))
+        except OSError as e:
+            print(f"Could not store cache entry {key}: {e}")
+            for leftover in (tmp_path, tmp_path + ".json"):
+                if os.path.exists(leftover):
+                    os.remove(leftover)
+            return
+
+        with self._lock:
+            self._bytes += os.path.getsize(path)
+            if self._bytes > self.max_bytes:
+                self._evict()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes
+            }
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(self.ext) or name.endswith((".json", ".tmp")):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, name[:len(name) - len(self.ext)] if self.ext else name, stat.st_size))
+        return entries
+
+    def _evict(self):
+        # Rescan so entries added by other processes are accounted for
+        entries = sorted(self._entries())
+        total = sum(size for _, _, size in entries)
+        for _, key, size in entries:
+            if total <= self.max_bytes:
+                break
+            for path in (self._path(key), self._meta_path(key)):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            total -= size
+        self._bytes = total
+
+
+def _link_or_copy(src, dest):
+    """Hard-link src to dest when possible, otherwise copy it."""
+    if os.path.exists(dest):
+        os.remove(dest)
+    try:
+        os.link(src, dest)
+    except OSError:
+        shutil.copyfile(src, dest)
+
+
+def normalize_prompt(prompt):
+    """Lowercase a prompt and collapse whitespace and trailing punctuation."""
+    return " ".join(prompt.lower().split()).strip(" .!?")
+
+
+def embed_text(text, dim=512):
+    """
+    Embed text locally as an L2-normalised hashed bag of character trigrams
+    and words. Cheap, deterministic and good enough to catch near-duplicate
+    prompts (typos, word order, extra filler words).
+
+    Returns:
+        numpy.ndarray: Vector of length dim
+    """
+    import numpy as np
+
+    vector = np.zeros(dim, dtype=np.float32)
+    padded = f"  {text}  "
+    features = [padded[i:i + 3] for i in range(len(padded) - 2)] + text.split()
+    for feature in features:
+        h = zlib.crc32(feature.encode("utf-8"))
+        vector[h % dim] += 1.0 if (h >> 31) & 1 else -1.0
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+class LectureCache:
+    """
+    Cache of validated lectures (Lecture.to_compact() lists) keyed on the
+    normalised prompt.
+
+    The exact tier matches normalise(prompt) + model + temperature. The
+    optional similarity tier (similarity > 0, needs NumPy) also returns the
+    closest cached prompt whose embedding cosine similarity reaches the
+    threshold, using a brute-force matrix product over an in-memory index
+    that is read from disk on first use and then kept up to date by put()
+    and eviction (entries added by other processes are seen after a
+    restart). Every key
+    includes a hash of the system prompt so entries are invalidated when it
+    changes. Entries expire `ttl` seconds after they were stored and the
+    least recently used ones are evicted beyond `max_entries`. An entry
+    file's mtime is its creation time and its atime, set explicitly on
+    every hit, its last use, so reads and eviction share one clock.
+    """
+
+    def __init__(self, directory, system_prompt, model, temperature,
+                 ttl=7 * 24 * 3600, max_entries=5000, similarity=0.0):
+        self.directory = directory
+        self.model = model
+        self.temperature = temperature
+        self.system_hash = content_key(system_prompt)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.similarity = similarity
+        self.exact_hits = 0
+        self.similar_hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # Similarity index: row i of _matrix embeds the prompt of _keys[i]
+        self._index_loaded = False
+        self._keys = []
+        self._rows = {}
+        self._matrix = None
+        os.makedirs(directory, exist_ok=True)
+        self._invalidate_if_prompt_changed()
+
+        if similarity > 0:
+            try:
+                import numpy  # noqa: F401
+            except ImportError:
+                print("NumPy not installed, disabling the lecture cache similarity tier")
+                self.similarity = 0.0
+
+    def _invalidate_if_prompt_changed(self):
+        # A marker records the system prompt the entries were generated with
+        marker = os.path.join(self.directory, "SYSTEM_PROMPT_HASH")
+        try:
+            with open(marker) as f:
+                current = f.read().strip()
+        except OSError:
+            current = None
+        if current == self.system_hash:
+            return
+        if current is not None:
+            print("System prompt changed, clearing the lecture cache")
+            for name in self._entry_files():
+                try:
+                    os.remove(os.path.join(self.directory, name))
+                except OSError:
+                    pass
+        with open(marker, "w") as f:
+            f.write(self.system_hash)
+
+    def _key(self, normalized):
+        return content_key(normalized, self.model, self.temperature, self.system_hash)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + ".json")
+
+    def _read(self, key):
+        path = self._path(key)
+        try:
+            created = os.path.getmtime(path)
+            with open(path) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if entry.get("system_hash") != self.system_hash or time.time() - created > self.ttl:
+            self._remove(path)
+            return None
+        try:
+            # Record the hit in atime only; mtime stays the creation time
+            os.utime(path, (time.time(), created))
+        except OSError:
+            pass
+        return entry
+
+    def get(self, prompt):
+        """
+        Look up a lecture for prompt.
+
+        Returns:
+            list: The cached lecture as stored by put(), to be loaded with
+                Lecture.from_compact() (entries cached by earlier versions
+                are {"slides", "quiz"} dicts, which it also accepts), or
+                None on a miss
+        """
+        normalized = normalize_prompt(prompt)
+        entry = self._read(self._key(normalized))
+        if entry is not None:
+            with self._lock:
+                self.exact_hits += 1
+            CACHE_LOOKUPS.inc(cache="lectures", result="exact")
+            return entry["value"]
+
+        if self.similarity > 0:
+            match = self._nearest(normalized)
+            if match is not None:
+                entry = self._read(match)
+                if entry is not None:
+                    print(f"Lecture cache similarity hit: {prompt!r} ~ {entry['prompt']!r}")
+                    with self._lock:
+                        self.similar_hits += 1
+                    CACHE_LOOKUPS.inc(cache="lectures", result="similar")
+                    return entry["value"]
+
+        with self._lock:
+            self.misses += 1
+        CACHE_LOOKUPS.inc(cache="lectures", result="miss")
+        return None
+
+    def put(self, prompt, value):
+        """Store the lecture generated for prompt, as Lecture.to_compact()."""
+        normalized = normalize_prompt(prompt)
+        key = self._key(normalized)
+        entry = {
+            "prompt": prompt,
+            "normalized": normalized,
+            "model": self.model,
+            "temperature": self.temperature,
+            "system_hash": self.system_hash,
+            "created_at": time.time(),
+            "value": value
+        }
+        tmp_path = f"{self._path(key)}.{uuid.uuid4().hex}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(entry, f)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            print(f"Could not store lecture cache entry: {e}")
+            return
+        if self.similarity > 0:
+            with self._lock:
+                # Before the first lookup the index is still to be read from disk
+                if self._index_loaded:
+                    self._index_add(key, normalized)
+        self._evict()
+
+    def stats(self):
+        with self._lock:
+            hits = self.exact_hits + self.similar_hits
+            lookups = hits + self.misses
+            return {
+                "exact_hits": self.exact_hits,
+                "similar_hits": self.similar_hits,
+                "misses": self.misses,
+                "hit_rate": round(hits / lookups, 4) if lookups else 0.0
+            }
+
+    def _entry_files(self):
+        return [name for name in os.listdir(self.directory) if name.endswith(".json")]
+
+    def _remove(self, path):
+        """Delete an entry file and drop it from the similarity index."""
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+        if self.similarity > 0:
+            with self._lock:
+                self._index_remove(os.path.basename(path)[:-len(".json")])
+
+    def _nearest(self, normalized):
+        import numpy as np
+
+        with self._lock:
+            if not self._index_loaded:
+                self._load_index()
+            if not self._keys:
+                return None
+            scores = self._matrix[:len(self._keys)] @ embed_text(normalized)
+            best = int(np.argmax(scores))
+            if scores[best] >= self.similarity:
+                return self._keys[best]
+        return None
+
+    def _index_add(self, key, normalized):
+        # Caller holds self._lock
+        import numpy as np
+
+        vector = embed_text(normalized)
+        row = self._rows.get(key)
+        if row is None:
+            row = len(self._keys)
+            if self._matrix is None or row == len(self._matrix):
+                # Grow geometrically so appends stay amortised O(1)
+                grown = np.zeros((max(64, 2 * row), len(vector)), dtype=np.float32)
+                if self._matrix is not None:
+                    grown[:row] = self._matrix
+                self._matrix = grown
+            self._keys.append(key)
+            self._rows[key] = row
+        self._matrix[row] = vector
+
+    def _index_remove(self, key):
+        # Caller holds self._lock; the last row moves into the freed one
+        row = self._rows.pop(key, None)
+        if row is None:
+            return
+        last = len(self._keys) - 1
+        if row != last:
+            moved = self._keys[last]
+            self._keys[row] = moved
+            self._rows[moved] = row
+            self._matrix[row] = self._matrix[last]
+        self._keys.pop()
+
+    def _load_index(self):
+        # Caller holds self._lock
+        self._keys, self._rows, self._matrix = [], {}, None
+        for name in self._entry_files():
+            try:
+                with open(os.path.join(self.directory, name)) as f:
+                    entry = json.load(f)
+            except (OSError, ValueError):
+                continue
+            if entry.get("system_hash") != self.system_hash:
+                continue
+            if entry.get("model") != self.model or entry.get("temperature") != self.temperature:
+                continue
+            self._index_add(name[:-len(".json")], entry["normalized"])
+        self._index_loaded = True
+
+    def _evict(self):
+        now = time.time()
+        entries = []
+        for name in self._entry_files():
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            if now - stat.st_mtime > self.ttl:
+                self._remove(path)
+                continue
+            entries.append((stat.st_atime, path))
+        # Least recently used first
+        entries.sort()
+        for _, path in entries[:max(0, len(entries) - self.max_entries)]:
+            self._remove(path)
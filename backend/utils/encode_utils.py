@@ -0,0 +1,81 @@
+import fcntl
+import os
+import random
+import threading
+import time
+from contextlib import contextmanager
+
+from config.config import ENCODE_THREAD_BUDGET, ENCODE_SLOTS_DIR
+from utils.metrics_utils import span
+
+
+class EncodeSlots:
+    """
+    Host-wide budget of ffmpeg encoder threads shared by every process.
+
+    The budget is a directory of `budget` slot files; holding an exclusive
+    flock on a slot grants one encoder thread. Locks belong to the open
+    file, so they are released when the holder exits or crashes, and
+    threads of one process compete for slots like separate processes do.
+    """
+
+    def __init__(self, budget=ENCODE_THREAD_BUDGET, directory=ENCODE_SLOTS_DIR, poll_interval=0.05):
+        self.budget = max(1, budget or os.cpu_count() or 1)
+        self.directory = directory
+        self.poll_interval = poll_interval
+        os.makedirs(directory, exist_ok=True)
+
+    def _try_slot(self, index):
+        f = open(os.path.join(self.directory, f"slot_{index}"), "a")
+        try:
+            fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return None
+        return f
+
+    def _grab(self, wanted):
+        # Start at a random slot so waiting processes don't all probe the same files
+        offset = random.randrange(self.budget)
+        held = []
+        for i in range(self.budget):
+            if len(held) == wanted:
+                break
+            slot = self._try_slot((offset + i) % self.budget)
+            if slot is not None:
+                held.append(slot)
+        return held
+
+    @contextmanager
+    def acquire(self, threads):
+        """
+        Wait for at least one free slot and take up to `threads` of them.
+        Yields the number of threads granted, which is what the encode
+        should pass to -threads. Never blocking while holding slots keeps
+        concurrent callers from deadlocking.
+        """
+        wanted = min(max(1, threads), self.budget)
+        with span("encode_slot_wait"):
+            held = self._grab(wanted)
+            while not held:
+                time.sleep(self.poll_interval)
+                held = self._grab(wanted)
+        try:
+            yield len(held)
+        finally:
+            for slot in held:
+                fcntl.flock(slot, fcntl.LOCK_UN)
+                slot.close()
+
+
+_slots = None
+_slots_lock = threading.Lock()
+
+
+def get_encode_slots():
+    """Return this process's handle on the host-wide encoder thread budget."""
+    global _slots
+    with _slots_lock:
+        if _slots is None:
+            _slots = EncodeSlots()
+        return _slots
@@ -1,8 +1,5 @@
 import os
 import shutil
-from pptx import Presentation
-from PIL import Image, ImageDraw, ImageFont
-from io import BytesIO
 
 OUTPUT_DIR = "output/"
 
@@ -32,82 +29,49 @@ def list_output_files():
     ensure_output_dir()
     return os.listdir(OUTPUT_DIR)
 
-def convert_pptx_to_images(pptx_path):
+def slide_body_lines(content):
+    """Return the body lines shown for a slide's bullet points."""
+    return [f"• {point}" for point in content]
+
+def start_image_uploads(image_paths, on_image=None):
     """
-    Converts slides in a PowerPoint file to images.
-    This implementation renders basic slide content to images.
+    Queue slide image uploads on the storage backend and return immediately,
+    so the uploads overlap with later stages (such as the video encode).
+    on_image, if given, is called as on_image(index, local_path, url) as
+    each upload finishes.
+
+    Returns:
+        list: One future per image, resolving to the public URL or None
     """
-    ensure_output_dir()  # Ensure output directory exists
-    prs = Presentation(pptx_path)
-    slide_images = []
+    from services.storage_service import get_storage
+
+    storage = get_storage()
+    futures = []
+    for i, img_path in enumerate(image_paths):
+        future = storage.submit(img_path, resource_type="image")
+        if on_image:
+            future.add_done_callback(
+                lambda f, i=i, img_path=img_path: on_image(i, img_path, _upload_url(f.result(), img_path))
+            )
+        futures.append(future)
+    return futures
 
-    # Use a better font and size for readability
-    try:
-        # Try to use a better font if available
-        font_title = ImageFont.truetype("arial.ttf", 36)
-        font_content = ImageFont.truetype("arial.ttf", 24)
-    except:
-        # Fallback to default font if specific font is not available
-        font_title = ImageFont.load_default()
-        font_content = ImageFont.load_default()
+def _upload_url(url, local_path):
+    # Fallback to local path if cloud upload fails
+    return url or local_path
 
-    for i, slide in enumerate(prs.slides):
-        img_path = os.path.join(OUTPUT_DIR, f"slide_{i+1}.png")
-        
-        # Create an image with slide dimensions
-        width, height = 1280, 720  # Standard HD resolution
-        img = Image.new("RGB", (width, height), color=(255, 255, 255))  # White background
-        draw = ImageDraw.Draw(img)
-        
-        # Try to add some basic text from the slide
-        y_offset = 50
-        
-        # Add title if exists
-        if slide.shapes.title and hasattr(slide.shapes.title, 'text'):
-            title_text = slide.shapes.title.text.strip()
-            if title_text:
-                draw.text((50, y_offset), title_text, fill=(0, 0, 0), font=font_title)
-                y_offset += 80  # Increased spacing for title
-        
-        # Add content from placeholders
-        for shape in slide.shapes:
-            # Check if shape has text frame
-            if hasattr(shape, 'has_text_frame') and shape.has_text_frame:
-                # Get text content (ignore linter warning as this works at runtime)
-                text_frame = shape.text_frame  # type: ignore
-                if hasattr(text_frame, 'text'):
-                    text = text_frame.text.strip()  # type: ignore
-                    if text and shape != slide.shapes.title:  # Skip title as we already handled it
-                        try:
-                            # Draw other text content with better formatting
-                            lines = text.split('\n')
-                            for line in lines:
-                                if line.strip():
-                                    draw.text((70, y_offset), line, fill=(50, 50, 50), font=font_content)
-                                    y_offset += 40  # Increased spacing for better readability
-                        except:
-                            # Fallback if there are font issues
-                            draw.text((50, y_offset), text[:100], fill=(0, 0, 0), font=font_content)  # Limit text length
-                            y_offset += 40
-        
-        img.save(img_path)
-        slide_images.append(img_path)
-        print(f"Saved slide image: {img_path}, exists: {os.path.exists(img_path)}")
+def collect_image_uploads(image_paths, futures):
+    """
+    Wait for uploads started by start_image_uploads().
+
+    Returns:
+        dict: {"local_paths": [...], "cloud_urls": [...]}; an image whose
+            upload failed keeps its local path as URL
+    """
+    cloud_images = [_upload_url(future.result(), img_path) for img_path, future in zip(image_paths, futures)]
+    # Return both local paths (for video creation) and cloud URLs (for response)
+    return {"local_paths": image_paths, "cloud_urls": cloud_images}
 
-    # Upload images to Cloudinary
-    try:
-        from services.cloud_service import upload_file
-        cloud_images = []
-        for img_path in slide_images:
-            upload_result = upload_file(img_path, resource_type="image")
-            if upload_result:
-                cloud_images.append(upload_result["secure_url"])
-            else:
-                # Fallback to local path if cloud upload fails
-                cloud_images.append(img_path)
-        # Return both local paths (for video creation) and cloud URLs (for response)
-        return {"local_paths": slide_images, "cloud_urls": cloud_images}
-    except Exception as e:
-        print(f"Cloudinary upload failed: {e}")
-        # Fallback to local paths if cloud upload fails
-        return {"local_paths": slide_images, "cloud_urls": slide_images}
+def upload_images(image_paths, on_image=None):
+    """Upload slide images concurrently and wait for all of them."""
+    return collect_image_uploads(image_paths, start_image_uploads(image_paths, on_image=on_image))
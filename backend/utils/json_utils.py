@@ -0,0 +1,148 @@
+import json
+
+
+def repair_truncated_json(text):
+    """
+    Close a JSON document that was cut off mid-way.
+
+    The text is cut back to just after the last complete object or array
+    inside the document (so a half-written trailing element is dropped)
+    and the containers still open at that point are closed.
+
+    Returns:
+        str: The repaired text, or None if nothing complete was found
+    """
+    stack = []
+    cut = None
+    in_string = escape = False
+    for pos, char in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+            continue
+        if char == '"':
+            in_string = True
+        elif char in "{[":
+            stack.append("}" if char == "{" else "]")
+        elif char in "}]":
+            if not stack or stack[-1] != char:
+                break
+            stack.pop()
+            if not stack:
+                return text[:pos + 1]
+            cut = (pos + 1, list(stack))
+    if cut is None:
+        return None
+    end, still_open = cut
+    return text[:end] + "".join(reversed(still_open))
+
+
+def loads_lenient(text):
+    """
+    Decode the JSON object in an LLM reply: surrounding prose and markdown
+    fences are ignored and a truncated document is repaired.
+
+    Raises:
+        ValueError: If no JSON object can be recovered
+    """
+    start = text.find("{")
+    if start < 0:
+        raise ValueError("No JSON object found")
+    text = text[start:]
+    try:
+        # raw_decode stops at the end of the object, ignoring anything after it
+        return json.JSONDecoder().raw_decode(text)[0]
+    except json.JSONDecodeError as e:
+        repaired = repair_truncated_json(text)
+        if repaired is None:
+            raise ValueError(f"Invalid JSON: {e}")
+        print(f"Repaired truncated JSON ({e})")
+        try:
+            return json.loads(repaired)
+        except json.JSONDecodeError:
+            raise ValueError(f"Invalid JSON: {e}")
+
+
+class SlideStreamParser:
+    """
+    Incremental parser for streamed lecture JSON.
+
+    Feed it text chunks as they arrive; every time an object inside the
+    top-level "slides" array is complete it is decoded and returned, so
+    downstream work can start before the rest of the document exists.
+    Anything before the first "{" (such as a ```json fence) is ignored.
+    """
+
+    def __init__(self, array_key="slides"):
+        self.array_key = array_key
+        self.text = []
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._last_key = None
+        self._in_array = False
+        self._item_start = None
+        self.count = 0
+
+    def feed(self, chunk):
+        """
+        Consume a chunk of text.
+
+        Returns:
+            list: (index, slide) pairs for the slide objects completed by
+                this chunk, in order; index counts slides across all chunks
+        """
+        self.text.append(chunk)
+        self._buffer += chunk
+        completed = []
+        buffer = self._buffer
+
+        for pos in range(self._pos, len(buffer)):
+            char = buffer[pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_key = buffer[self._string_start + 1:pos]
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = pos
+            elif char in "{[":
+                self._depth += 1
+                if self._depth == 2 and char == "[" and self._last_key == self.array_key:
+                    self._in_array = True
+                elif self._depth == 3 and self._in_array and char == "{":
+                    self._item_start = pos
+            elif char in "}]":
+                if self._depth == 3 and self._item_start is not None and char == "}":
+                    completed.append((self.count, json.loads(buffer[self._item_start:pos + 1])))
+                    self._item_start = None
+                    self.count += 1
+                elif self._depth == 2 and self._in_array:
+                    self._in_array = False
+                self._depth -= 1
+
+        # Drop text that can no longer be part of an unfinished slide object
+        keep_from = self._item_start if self._item_start is not None else len(buffer)
+        if self._in_string and self._string_start is not None:
+            keep_from = min(keep_from, self._string_start)
+        self._buffer = buffer[keep_from:]
+        if self._item_start is not None:
+            self._item_start -= keep_from
+        if self._string_start is not None:
+            self._string_start -= keep_from
+        self._pos = len(self._buffer)
+        return completed
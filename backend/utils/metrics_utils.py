@@ -0,0 +1,245 @@
+import os
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+NAMESPACE = "shikshaflow"
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+BYTES_BUCKETS = (1024, 16 * 1024, 128 * 1024, 1024 ** 2, 8 * 1024 ** 2, 64 * 1024 ** 2, 512 * 1024 ** 2)
+COUNT_BUCKETS = (0, 1, 2, 5, 10, 25, 50, 100, 250)
+
+
+class Counter:
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+
+    def inc(self, amount=1, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def _snapshot(self):
+        return dict(self.values)
+
+    def _merge(self, data, sign=1):
+        for key, value in data.items():
+            self.values[key] = self.values.get(key, 0) + sign * value
+
+
+class Histogram:
+    def __init__(self, name, help_text, labelnames=(), buckets=SECONDS_BUCKETS):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self.values = {}
+
+    def observe(self, value, **labels):
+        key = tuple(str(labels.get(name, "")) for name in self.labelnames)
+        with _lock:
+            series = self.values.setdefault(key, [0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def _snapshot(self):
+        return {key: list(series) for key, series in self.values.items()}
+
+    def _merge(self, data, sign=1):
+        for key, series in data.items():
+            current = self.values.setdefault(key, [0] * len(series))
+            for i, value in enumerate(series):
+                current[i] += sign * value
+
+
+_lock = threading.RLock()
+_metrics = {}
+_collectors = []
+
+
+def _register(metric):
+    _metrics[metric.name] = metric
+    return metric
+
+
+def counter(name, help_text, labelnames=()):
+    return _register(Counter(f"{NAMESPACE}_{name}", help_text, labelnames))
+
+
+def histogram(name, help_text, labelnames=(), buckets=SECONDS_BUCKETS):
+    return _register(Histogram(f"{NAMESPACE}_{name}", help_text, labelnames, buckets))
+
+
+def register_collector(collect):
+    """
+    Add a callable evaluated on every scrape. It returns a list of
+    (name, help, {labels_tuple: value}, labelnames) gauge families.
+    """
+    _collectors.append(collect)
+
+
+SPAN_SECONDS = histogram("span_seconds", "Duration of instrumented service calls", ("span",))
+SPAN_ERRORS = counter("span_errors_total", "Instrumented service calls that raised", ("span",))
+STAGE_SECONDS = histogram("stage_seconds", "Duration of pipeline stages", ("stage",))
+ARTIFACT_BYTES = histogram("artifact_bytes", "Size of generated artifacts", ("kind",), BYTES_BUCKETS)
+SUBPROCESSES = counter("subprocesses_total", "External processes started", ("command",))
+JOB_SUBPROCESSES = histogram("job_subprocesses", "External processes started per pipeline run",
+                             buckets=COUNT_BUCKETS)
+CACHE_LOOKUPS = counter("cache_lookups_total", "Cache lookups", ("cache", "result"))
+
+
+@contextmanager
+def span(name):
+    """Time a block into the span_seconds histogram."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        SPAN_ERRORS.inc(span=name)
+        raise
+    finally:
+        SPAN_SECONDS.observe(time.perf_counter() - start, span=name)
+
+
+def timed(name):
+    """Decorator form of span()."""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def run_subprocess(cmd, **kwargs):
+    """subprocess.run() that is counted in subprocesses_total."""
+    SUBPROCESSES.inc(command=os.path.basename(cmd[0]))
+    return subprocess.run(cmd, **kwargs)
+
+
+def record_bytes(kind, paths):
+    """Observe the size of each existing file in paths."""
+    for path in paths:
+        if path and os.path.exists(path):
+            ARTIFACT_BYTES.observe(os.path.getsize(path), kind=kind)
+
+
+def snapshot():
+    """Return a picklable copy of every metric in this process."""
+    with _lock:
+        return {name: metric._snapshot() for name, metric in _metrics.items()}
+
+
+def diff(before, after):
+    """Return what was recorded between two snapshots."""
+    delta = {}
+    for name, series in after.items():
+        previous = before.get(name, {})
+        changed = {}
+        for key, value in series.items():
+            if isinstance(value, list):
+                old = previous.get(key, [0] * len(value))
+                if value != old:
+                    changed[key] = [a - b for a, b in zip(value, old)]
+            elif value != previous.get(key, 0):
+                changed[key] = value - previous.get(key, 0)
+        if changed:
+            delta[name] = changed
+    return delta
+
+
+def merge(data):
+    """Add a snapshot or diff recorded by another process (e.g. a job worker)."""
+    with _lock:
+        for name, series in data.items():
+            if name in _metrics:
+                _metrics[name]._merge(series)
+
+
+def breakdown(data):
+    """
+    Summarise a diff as {"spans": {name: {"count", "seconds"}}, ...} for
+    a per-request timing report.
+    """
+    report = {}
+    for metric, label in ((SPAN_SECONDS, "spans"), (STAGE_SECONDS, "stages")):
+        entries = {}
+        for key, series in data.get(metric.name, {}).items():
+            entries[key[0]] = {"count": sum(series[:-1]), "seconds": round(series[-1], 3)}
+        report[label] = entries
+    report["subprocesses"] = sum(data.get(SUBPROCESSES.name, {}).values())
+    report["bytes_written"] = sum(series[-1] for series in data.get(ARTIFACT_BYTES.name, {}).values())
+    return report
+
+
+def _format_labels(labelnames, key, extra=None):
+    pairs = list(zip(labelnames, key)) + (list(extra.items()) if extra else [])
+    if not pairs:
+        return ""
+    escaped = (str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+def _format_value(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render():
+    """Render every metric in the Prometheus text exposition format (0.0.4)."""
+    lines = []
+    with _lock:
+        for metric in _metrics.values():
+            if isinstance(metric, Counter):
+                lines += [f"# HELP {metric.name} {metric.help}", f"# TYPE {metric.name} counter"]
+                for key, value in sorted(metric.values.items()):
+                    lines.append(f"{metric.name}{_format_labels(metric.labelnames, key)} {_format_value(value)}")
+                continue
+
+            lines += [f"# HELP {metric.name} {metric.help}", f"# TYPE {metric.name} histogram"]
+            for key, series in sorted(metric.values.items()):
+                cumulative = 0
+                for bound, count in zip(metric.buckets + ("+Inf",), series[:-1]):
+                    cumulative += count
+                    le = bound if bound == "+Inf" else _format_value(float(bound))
+                    lines.append(f"{metric.name}_bucket{_format_labels(metric.labelnames, key, {'le': le})} {cumulative}")
+                labels = _format_labels(metric.labelnames, key)
+                lines.append(f"{metric.name}_sum{labels} {_format_value(float(series[-1]))}")
+                lines.append(f"{metric.name}_count{labels} {cumulative}")
+
+    for collect in _collectors:
+        try:
+            families = collect()
+        except Exception as e:
+            print(f"Metrics collector failed: {e}")
+            continue
+        for name, help_text, values, labelnames in families:
+            name = f"{NAMESPACE}_{name}"
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+            for key, value in sorted(values.items()):
+                lines.append(f"{name}{_format_labels(labelnames, key)} {_format_value(value)}")
+    return "\n".join(lines) + "\n"
+
+
+def _cache_hit_ratio():
+    lookups = {}
+    with _lock:
+        for (cache, result), value in CACHE_LOOKUPS.values.items():
+            hits, total = lookups.get(cache, (0, 0))
+            lookups[cache] = (hits + (value if result != "miss" else 0), total + value)
+    ratios = {(cache,): round(hits / total, 4) for cache, (hits, total) in lookups.items() if total}
+    return [("cache_hit_ratio", "Share of cache lookups that hit", ratios, ("cache",))]
+
+
+register_collector(_cache_hit_ratio)
@@ -0,0 +1,96 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+class Stage:
+    """
+    One step of a pipeline.
+
+    func is called with one keyword argument per name in inputs, each being
+    either an initial pipeline value or the return value of another stage;
+    its own return value is published under the stage name.
+    """
+
+    def __init__(self, name, func, inputs=()):
+        self.name = name
+        self.func = func
+        self.inputs = tuple(inputs)
+
+    def __repr__(self):
+        return f"Stage({self.name!r}, inputs={self.inputs})"
+
+
+class Pipeline:
+    """
+    A DAG of stages, run as soon as their inputs are ready.
+
+    Independent stages execute concurrently on a thread pool; stages that
+    are CPU-bound fan out further to their own process pools. The
+    first stage to fail stops the scheduling of new stages and its
+    exception is re-raised once the running ones have finished.
+    """
+
+    def __init__(self, stages):
+        self.stages = list(stages)
+        names = [stage.name for stage in self.stages]
+        duplicates = {name for name in names if names.count(name) > 1}
+        if duplicates:
+            raise ValueError(f"Duplicate pipeline stages: {sorted(duplicates)}")
+
+    def run(self, values, max_workers=None, on_stage=None):
+        """
+        Execute every stage.
+
+        Args:
+            values (dict): Initial values stages can take as inputs
+            max_workers (int, optional): Stage threads; defaults to one per stage
+            on_stage (callable, optional): Called as on_stage(name, status)
+                with status "running", "done" or "failed"
+
+        Returns:
+            tuple: (values, timings) where values also holds every stage
+                result and timings maps stage names to wall-clock seconds
+
+        Raises:
+            ValueError: If some stage inputs can never be satisfied
+        """
+        values = dict(values)
+        timings = {}
+        pending = list(self.stages)
+        running = {}
+        notify = on_stage or (lambda name, status: None)
+
+        with ThreadPoolExecutor(max_workers=max_workers or max(len(pending), 1)) as executor:
+            while pending or running:
+                for stage in [stage for stage in pending if all(name in values for name in stage.inputs)]:
+                    pending.remove(stage)
+                    notify(stage.name, "running")
+                    kwargs = {name: values[name] for name in stage.inputs}
+                    running[executor.submit(_timed, stage.func, kwargs)] = stage
+
+                if not running:
+                    missing = {stage.name: [name for name in stage.inputs if name not in values]
+                               for stage in pending}
+                    raise ValueError(f"Pipeline stages with unsatisfiable inputs: {missing}")
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    stage = running.pop(future)
+                    try:
+                        value, elapsed = future.result()
+                    except Exception:
+                        notify(stage.name, "failed")
+                        # Let the stages already running finish, but start no new ones
+                        pending.clear()
+                        raise
+                    values[stage.name] = value
+                    timings[stage.name] = round(elapsed, 3)
+                    notify(stage.name, "done")
+
+        return values, timings
+
+
+def _timed(func, kwargs):
+    start = time.perf_counter()
+    value = func(**kwargs)
+    return value, time.perf_counter() - start
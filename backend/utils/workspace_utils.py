@@ -0,0 +1,118 @@
+import os
+import shutil
+import threading
+import time
+import uuid
+
+from config.config import WORKSPACE_TTL, WORKSPACE_MAX_BYTES, WORKSPACE_JANITOR_INTERVAL
+from utils.file_utils import OUTPUT_DIR
+
+WORKSPACE_ROOT = os.path.join(OUTPUT_DIR, "workspaces")
+ACTIVE_MARKER = ".active"
+
+
+def create_workspace():
+    """
+    Create an isolated scratch directory for one pipeline run.
+
+    Returns:
+        str: Path of the new workspace (output/workspaces/<id>)
+    """
+    workspace = os.path.join(WORKSPACE_ROOT, uuid.uuid4().hex)
+    os.makedirs(workspace)
+    # Marks the workspace as in use so the janitor never evicts it mid-run
+    open(os.path.join(workspace, ACTIVE_MARKER), "w").close()
+    return workspace
+
+
+def release_workspace(workspace):
+    """Mark a workspace as finished; it now only lives until the janitor evicts it."""
+    try:
+        os.remove(os.path.join(workspace, ACTIVE_MARKER))
+    except FileNotFoundError:
+        pass
+
+
+def workspace_id(workspace):
+    """Return the ID (directory name) of a workspace path."""
+    return os.path.basename(os.path.normpath(workspace))
+
+
+def _dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def cleanup_workspaces(ttl=WORKSPACE_TTL, max_bytes=WORKSPACE_MAX_BYTES):
+    """
+    Evict old workspaces.
+
+    Workspaces last modified more than `ttl` seconds ago are removed. If the
+    remaining workspaces still use more than `max_bytes`, the least recently
+    modified inactive ones are removed until the total fits.
+
+    Returns:
+        list: IDs of the removed workspaces
+    """
+    if not os.path.isdir(WORKSPACE_ROOT):
+        return []
+
+    now = time.time()
+    removed = []
+    entries = []
+    for name in os.listdir(WORKSPACE_ROOT):
+        path = os.path.join(WORKSPACE_ROOT, name)
+        if not os.path.isdir(path):
+            continue
+        try:
+            mtime = os.path.getmtime(path)
+        except OSError:
+            continue
+        if now - mtime > ttl:
+            shutil.rmtree(path, ignore_errors=True)
+            removed.append(name)
+            continue
+        active = os.path.exists(os.path.join(path, ACTIVE_MARKER))
+        entries.append((mtime, name, path, active, _dir_size(path)))
+
+    total = sum(entry[4] for entry in entries)
+    for mtime, name, path, active, size in sorted(entries):
+        if total <= max_bytes:
+            break
+        if active:
+            continue
+        shutil.rmtree(path, ignore_errors=True)
+        removed.append(name)
+        total -= size
+
+    if removed:
+        print(f"Workspace janitor removed {len(removed)} workspace(s)")
+    return removed
+
+
+_janitor = None
+
+
+def start_janitor(interval=WORKSPACE_JANITOR_INTERVAL):
+    """Start the background janitor thread (once per process)."""
+    global _janitor
+    if _janitor is not None or interval <= 0:
+        return _janitor
+
+    def loop():
+        while True:
+            try:
+                cleanup_workspaces()
+            except Exception as e:
+                print(f"Workspace janitor failed: {e}")
+            time.sleep(interval)
+
+    _janitor = threading.Thread(target=loop, daemon=True)
+    _janitor.start()
+    return _janitor